@@ -1,9 +1,14 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import users, auth
+from app.api.v1.endpoints import users, async_users, auth, async_auth
+from app.core.config import settings
 
 
 api_router = APIRouter()
 
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(auth.router, prefix="/token", tags=["auth"])
+api_router.include_router(
+    async_users.router if settings.DATABASE_ASYNC else users.router, prefix="/users", tags=["users"]
+)
+api_router.include_router(
+    async_auth.router if settings.DATABASE_ASYNC else auth.router, prefix="/token", tags=["auth"]
+)
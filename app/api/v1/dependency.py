@@ -1,43 +1,173 @@
+from datetime import datetime
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import SecretStr
 
 from app.exceptions.exception import NoContentError
 from app.usecases.users.data import UserOutputData
+from app.core.config import settings
 from app.core.logger import logger
-from app.lib.jwt import get_id_from_token
-from app.usecases.users.user_get_usercase import UserGetInteractor
-from app.depends.usecase_module import user_get_interactor_injector
+from app.lib.jwt import (
+    get_claims_from_token,
+    is_token_revoked,
+    is_token_confirmed,
+    confirm_token_version,
+    token_version,
+)
+from app.usecases.users.user_get_usercase import UserGetInteractor, AsyncUserGetInteractor
+from app.depends.usecase_module import (
+    user_get_interactor_injector,
+    uncached_user_get_interactor_injector,
+    async_user_get_interactor_injector,
+    async_uncached_user_get_interactor_injector,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/token/login")
 
+# トークンにパスワードは含めないため、レスポンス上は同じくマスクされる値で代用する
+MASKED_PASSWORD = SecretStr("**********")
+
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     user_get_interactor: UserGetInteractor = Depends(user_get_interactor_injector),
+    uncached_user_get_interactor: UserGetInteractor = Depends(uncached_user_get_interactor_injector),
 ) -> UserOutputData:
     """
     get_current_user
     """
 
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    # 同期的にDBを参照するため、同期関数としてスレッドプール上で実行させる。
+    # イベントループ上で実行すると、DBの応答を待つ間、他のリクエストの処理も止まってしまう。
+
+    claims = _get_claims(token)
+
+    if _can_skip_db(claims):
+        return _to_user(claims)
+
+    # バージョンを照合するトークンは、キャッシュされた古い行で確認済みとしないようDBから直接読む
+    if "ver" in claims:
+        user_get_interactor = uncached_user_get_interactor
 
     try:
-        id = get_id_from_token(token)
-    except Exception as e:
+        user = user_get_interactor.handle(int(claims["sub"]))
+    except NoContentError as e:
         logger.info(f"Could not validate credentials: {e}")
-        raise credentials_exception
+        raise _credentials_exception()
+    except Exception as e:
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    _verify_token_version(claims, user)
+
+    return user
+
+
+async def async_get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_get_interactor: AsyncUserGetInteractor = Depends(async_user_get_interactor_injector),
+    uncached_user_get_interactor: AsyncUserGetInteractor = Depends(async_uncached_user_get_interactor_injector),
+) -> UserOutputData:
+    """
+    async_get_current_user
+    """
+
+    claims = _get_claims(token)
+
+    if _can_skip_db(claims):
+        return _to_user(claims)
+
+    if "ver" in claims:
+        user_get_interactor = uncached_user_get_interactor
 
     try:
-        user = user_get_interactor.handle(int(id))
+        user = await user_get_interactor.handle(int(claims["sub"]))
     except NoContentError as e:
         logger.info(f"Could not validate credentials: {e}")
-        raise credentials_exception
+        raise _credentials_exception()
     except Exception as e:
         logger.exception(e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    _verify_token_version(claims, user)
+
     return user
+
+
+def _credentials_exception() -> HTTPException:
+    """
+    _credentials_exception
+    """
+
+    return HTTPException(
+        status_code=401,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _get_claims(token: str) -> dict:
+    """
+    _get_claims
+    """
+
+    try:
+        claims = get_claims_from_token(token)
+        int(claims["sub"])
+    except Exception as e:
+        logger.info(f"Could not validate credentials: {e}")
+        raise _credentials_exception()
+
+    return claims
+
+
+def _can_skip_db(claims: dict) -> bool:
+    """
+    DBを参照せず、トークンのクレームのみで認証するかを返す。
+    """
+
+    if not settings.JWT_CLAIMS_ONLY_AUTH or "ver" not in claims:
+        return False
+
+    id = int(claims["sub"])
+
+    # ユーザの更新・削除により失効したトークンは受け付けない
+    if is_token_revoked(id, claims["ver"]):
+        logger.info(f"Could not validate credentials: token of user(id={id}) is revoked.")
+        raise _credentials_exception()
+
+    return is_token_confirmed(id, claims["ver"])
+
+
+def _verify_token_version(claims: dict, user: UserOutputData) -> None:
+    """
+    クレームを含むトークンのバージョンをDB上のユーザの最終更新日時と比較する。
+    他のプロセスで更新されたユーザのトークンも、ここで失効させる。
+    """
+
+    if "ver" not in claims:
+        return
+
+    version = token_version(user.updated_at)
+
+    if claims["ver"] < version:
+        logger.info(f"Could not validate credentials: token of user(id={user.id}) is revoked.")
+        raise _credentials_exception()
+
+    confirm_token_version(user.id, version)
+
+
+def _to_user(claims: dict) -> UserOutputData:
+    """
+    DBを参照せず、トークンのクレームからユーザを復元する。
+    """
+
+    return UserOutputData.model_construct(
+        id=int(claims["sub"]),
+        name=claims["name"],
+        password=MASKED_PASSWORD,
+        email=claims["email"],
+        created_at=datetime.fromisoformat(claims["created_at"]),
+        updated_at=datetime.fromisoformat(claims["updated_at"]),
+    )
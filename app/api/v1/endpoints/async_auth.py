@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.usecases.auth.auth_usecase import Token
+from app.core.logger import logger
+from app.usecases.auth.auth_usecase import AsyncAuthInteractor
+from app.depends.usecase_module import async_auth_interactor_injector
+
+router = APIRouter()
+
+
+@router.post(
+    "/login",
+    response_model=Token,
+    responses={
+        401: {
+            "description": "Incorrect username or password",
+            "content": {"application/json": {"example": {"detail": "Incorrect username or password"}}},
+        },
+    },
+)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    user_get_interactor: AsyncAuthInteractor = Depends(async_auth_interactor_injector),
+) -> Token:
+    try:
+        token: Token = await user_get_interactor.handle(form_data.__dict__)
+    except ValueError as e:
+        logger.info(e)
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    except Exception as e:
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    return token
@@ -0,0 +1,399 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import APIRouter, status, Body, Header, Path, Query, Depends, Request, Response
+from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.v1.dependency import async_get_current_user
+from app.api.v1.endpoints.users import (
+    ExportFormat,
+    FIELDS_QUERY_TITLE,
+    READ_USERS_RESPONSES,
+    EXPORT_USERS_RESPONSES,
+    SEARCH_USERS_RESPONSES,
+    READ_USERS_ME_RESPONSES,
+    READ_USER_RESPONSES,
+    CREATE_USER_RESPONSES,
+    CREATE_USERS_RESPONSES,
+    UPDATE_USERS_RESPONSES,
+    DELETE_USERS_RESPONSES,
+    UPDATE_USER_RESPONSES,
+    DELETE_USER_RESPONSES,
+    cache_headers,
+    decode_after,
+    export_response,
+    http_errors,
+    parse_fields,
+    set_next_link,
+)
+from app.usecases.users.data import UserOutputData, UserBulkOutputData
+from app.usecases.users.user_get_usercase import AsyncUserGetInteractor
+from app.usecases.users.user_create_usecase import UserCreateInputData, AsyncUserCreateInteractor
+from app.usecases.users.user_bulk_create_usecase import AsyncUserBulkCreateInteractor
+from app.usecases.users.user_update_usecase import UserUpdateInputData, AsyncUserUpdateInteractor
+from app.usecases.users.user_bulk_update_usecase import UserBulkUpdateInputData, AsyncUserBulkUpdateInteractor
+from app.usecases.users.user_delete_usecase import AsyncUserDeleteInteractor
+from app.usecases.users.user_bulk_delete_usecase import AsyncUserBulkDeleteInteractor
+from app.usecases.users.user_export_usecase import AsyncUserExportInteractor
+from app.usecases.users.user_search_usecase import UserSearchInputData, AsyncUserSearchInteractor
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.exceptions.exception import DuplicateError, NoContentError
+from app.lib.etag import make_etag, etag_matches, expected_updated_at
+from app.depends.usecase_module import (
+    async_user_get_interactor_injector,
+    async_user_create_interactor_injector,
+    async_user_bulk_create_interactor_injector,
+    async_user_update_interactor_injector,
+    async_user_bulk_update_interactor_injector,
+    async_user_delete_interactor_injector,
+    async_user_bulk_delete_interactor_injector,
+    async_user_export_interactor_injector,
+    async_user_search_interactor_injector,
+)
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=list[UserOutputData],
+    response_model_exclude_unset=True,
+    responses=READ_USERS_RESPONSES,
+)
+async def read_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(
+        settings.USERS_PAGE_DEFAULT_LIMIT,
+        title="The maximum number of users in a page.",
+        ge=1,
+        le=settings.USERS_PAGE_MAX_LIMIT,
+    ),
+    after: str | None = Query(None, title="The cursor of the page, given by the Link header of the previous page."),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    user_get_interactor: AsyncUserGetInteractor = Depends(async_user_get_interactor_injector),
+) -> list[UserOutputData]:
+    """
+    read_users
+    """
+
+    with http_errors():
+        page = await user_get_interactor.handle(limit=limit, after=decode_after(after), fields=parse_fields(fields))
+
+    set_next_link(request, response, limit, page.next_after)
+
+    return page.users
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses=EXPORT_USERS_RESPONSES,
+)
+async def export_users(
+    format: ExportFormat = Query(ExportFormat.ndjson, title="The format of the exported users."),
+    user_export_interactor: AsyncUserExportInteractor = Depends(async_user_export_interactor_injector),
+) -> StreamingResponse:
+    """
+    export_users
+    """
+
+    users = user_export_interactor.handle()
+
+    content = _users_to_csv(users) if format == ExportFormat.csv else _users_to_ndjson(users)
+
+    return export_response(content, format)
+
+
+@router.get(
+    "/search",
+    response_model=list[UserOutputData],
+    response_model_exclude_unset=True,
+    responses=SEARCH_USERS_RESPONSES,
+)
+async def search_users(
+    request: Request,
+    response: Response,
+    name: str | None = Query(None, title="The prefix of the name.", min_length=1),
+    email: str | None = Query(None, title="The email.", min_length=1),
+    created_from: datetime | None = Query(None, title="Users created at or after this datetime."),
+    created_to: datetime | None = Query(None, title="Users created before this datetime."),
+    q: str | None = Query(None, title="A substring of the name or the email (case-insensitive).", min_length=1),
+    limit: int = Query(
+        settings.USERS_PAGE_DEFAULT_LIMIT,
+        title="The maximum number of users in a page.",
+        ge=1,
+        le=settings.USERS_PAGE_MAX_LIMIT,
+    ),
+    after: str | None = Query(None, title="The cursor of the page, given by the Link header of the previous page."),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    user_search_interactor: AsyncUserSearchInteractor = Depends(async_user_search_interactor_injector),
+) -> list[UserOutputData]:
+    """
+    search_users
+    """
+
+    after_id = decode_after(after)
+    conditions = UserSearchInputData(name=name, email=email, created_from=created_from, created_to=created_to, q=q)
+
+    with http_errors():
+        page = await user_search_interactor.handle(conditions, limit=limit, after=after_id, fields=parse_fields(fields))
+
+    set_next_link(request, response, limit, page.next_after)
+
+    return page.users
+
+
+@router.get(
+    "/me",
+    response_model=UserOutputData,
+    responses=READ_USERS_ME_RESPONSES,
+)
+async def read_users_me(
+    response: Response,
+    if_none_match: str | None = Header(None, description="ETag of the user given by the previous response."),
+    user: UserOutputData = Depends(async_get_current_user),
+) -> UserOutputData | Response:
+    """
+    read_user_me
+    """
+
+    etag = make_etag(user.id, user.updated_at)
+
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    response.headers.update(cache_headers(etag))
+
+    return user
+
+
+@router.get(
+    "/{id}",
+    response_model=UserOutputData,
+    response_model_exclude_unset=True,
+    responses=READ_USER_RESPONSES,
+)
+async def read_user(
+    response: Response,
+    id: int = Path(
+        ...,
+        title="The ID of the user.",
+        ge=settings.ID_MIN,
+    ),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    if_none_match: str | None = Header(None, description="ETag of the user given by the previous response."),
+    user_get_interactor: AsyncUserGetInteractor = Depends(async_user_get_interactor_injector),
+) -> UserOutputData | Response:
+    """
+    read_user
+    """
+
+    field_list = parse_fields(fields)
+
+    with http_errors():
+        # If-None-Matchが指定された場合は、まずupdated_atのみを取得してETagを比較し、
+        # 変更されていなければユーザ全体の取得とシリアライズを省略する
+        if if_none_match is not None:
+            version = await user_get_interactor.handle(id, fields=["updated_at"])
+            etag = make_etag(version.id, version.updated_at, field_list)
+
+            if etag_matches(etag, if_none_match):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+        content = await user_get_interactor.handle(id, fields=field_list)
+
+    response.headers.update(cache_headers(make_etag(content.id, content.updated_at, field_list)))
+
+    return content
+
+
+@router.post(
+    "/",
+    response_model=UserOutputData,
+    status_code=status.HTTP_201_CREATED,
+    responses=CREATE_USER_RESPONSES,
+)
+async def create_user(
+    user: UserCreateInputData,
+    response: Response,
+    user_create_interactor: AsyncUserCreateInteractor = Depends(async_user_create_interactor_injector),
+) -> UserOutputData | Response:
+    """
+    create_user
+    """
+
+    try:
+        content = await user_create_interactor.handle(user)
+    except DuplicateError as e:
+        logger.info(f"DuplicateError: {e}")
+        raise HTTPException(status_code=409, detail=f"User or email is already exists: {user}")
+    except NoContentError:
+        logger.warning(f"NoContentError: User({user}) is created, but data fetch is failed.")
+        # ステータスコード204はmessage bodyを含めることができない。
+        # https://github.com/tiangolo/fastapi/issues/2253
+        return Response(status_code=204)
+    except Exception as e:
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    response.headers["ETag"] = make_etag(content.id, content.updated_at)
+
+    return content
+
+
+@router.post(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=CREATE_USERS_RESPONSES,
+)
+async def create_users(
+    users: list[UserCreateInputData],
+    user_bulk_create_interactor: AsyncUserBulkCreateInteractor = Depends(async_user_bulk_create_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    create_users
+    """
+
+    with http_errors():
+        content = await user_bulk_create_interactor.handle(users)
+
+    return content
+
+
+@router.patch(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=UPDATE_USERS_RESPONSES,
+)
+async def update_users(
+    users: list[UserBulkUpdateInputData],
+    user_bulk_update_interactor: AsyncUserBulkUpdateInteractor = Depends(async_user_bulk_update_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    update_users
+    """
+
+    with http_errors():
+        content = await user_bulk_update_interactor.handle(users)
+
+    return content
+
+
+@router.delete(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=DELETE_USERS_RESPONSES,
+)
+async def delete_users(
+    ids: list[int] = Body(..., title="The IDs of the users.", example=[1, 2]),
+    user_bulk_delete_interactor: AsyncUserBulkDeleteInteractor = Depends(async_user_bulk_delete_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    delete_users
+    """
+
+    with http_errors():
+        content = await user_bulk_delete_interactor.handle(ids)
+
+    return content
+
+
+@router.put(
+    "/{id}",
+    response_model=UserOutputData,
+    responses=UPDATE_USER_RESPONSES,
+)
+async def update_user(
+    user: UserUpdateInputData,
+    response: Response,
+    id: int = Path(..., title="The ID of the user.", ge=settings.ID_MIN),
+    if_match: str | None = Header(None, description="ETag of the user to be updated."),
+    user_update_interactor: AsyncUserUpdateInteractor = Depends(async_user_update_interactor_injector),
+) -> UserOutputData:
+    """
+    update_user
+    """
+
+    with http_errors(
+        not_found=f"User not found: id={id}",
+        duplicate=f"User or email is already exists: {user}",
+        modified=f"User has been modified: id={id}",
+    ):
+        content = await user_update_interactor.handle(id, user, expected_updated_at(id, if_match))
+
+    response.headers["ETag"] = make_etag(content.id, content.updated_at)
+
+    return content
+
+
+@router.delete(
+    "/{id}",
+    response_model=UserOutputData,
+    responses=DELETE_USER_RESPONSES,
+)
+async def delete_user(
+    id: int = Path(..., title="The ID of the user.", ge=settings.ID_MIN),
+    user_delete_interactor: AsyncUserDeleteInteractor = Depends(async_user_delete_interactor_injector),
+) -> UserOutputData:
+    """
+    delete_user
+    """
+
+    with http_errors(not_found=f"User not found: id={id}"):
+        content = await user_delete_interactor.handle(id)
+
+    return content
+
+
+async def _users_to_ndjson(users: AsyncIterator[UserOutputData]) -> AsyncIterator[str]:
+    """
+    ユーザを1行1JSONに変換し、USERS_EXPORT_BATCH_SIZE行ごとにまとめて返す。
+    """
+
+    lines = []
+
+    async for user in users:
+        lines.append(user.model_dump_json() + "\n")
+
+        if len(lines) >= settings.USERS_EXPORT_BATCH_SIZE:
+            yield "".join(lines)
+            lines.clear()
+
+    if lines:
+        yield "".join(lines)
+
+
+async def _users_to_csv(users: AsyncIterator[UserOutputData]) -> AsyncIterator[str]:
+    """
+    ユーザをCSVに変換し、ヘッダ行の後にUSERS_EXPORT_BATCH_SIZE行ごとにまとめて返す。
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(UserOutputData.model_fields)
+    # 最初のバイトをすぐに返すため、ヘッダ行は単独で返す
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    rows = 0
+
+    async for user in users:
+        writer.writerow(user.model_dump(mode="json").values())
+        rows += 1
+
+        if rows >= settings.USERS_EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    if rows:
+        yield buffer.getvalue()
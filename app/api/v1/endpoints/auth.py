@@ -19,10 +19,11 @@ router = APIRouter()
         },
     },
 )
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     user_get_interactor: AuthInteractor = Depends(auth_interactor_injector),
 ) -> Token:
+    # 同期的にDBを参照するため、同期関数としてスレッドプール上で実行させる
     try:
         token: Token = user_get_interactor.handle(form_data.__dict__)
     except ValueError as e:
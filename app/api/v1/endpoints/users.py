@@ -1,105 +1,426 @@
-from fastapi import APIRouter, status, Path, Depends, Response
+import csv
+import io
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+
+from fastapi import APIRouter, status, Body, Header, Path, Query, Depends, Request, Response
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.api.v1.dependency import get_current_user
-from app.usecases.users.data import UserOutputData
+from app.usecases.users.data import UserOutputData, UserBulkOutputData
 from app.usecases.users.user_get_usercase import UserGetInteractor
 from app.usecases.users.user_create_usecase import UserCreateInputData, UserCreateInteractor
+from app.usecases.users.user_bulk_create_usecase import UserBulkCreateInteractor
 from app.usecases.users.user_update_usecase import UserUpdateInputData, UserUpdateInteractor
+from app.usecases.users.user_bulk_update_usecase import UserBulkUpdateInputData, UserBulkUpdateInteractor
 from app.usecases.users.user_delete_usecase import UserDeleteInteractor
+from app.usecases.users.user_bulk_delete_usecase import UserBulkDeleteInteractor
+from app.usecases.users.user_export_usecase import UserExportInteractor
+from app.usecases.users.user_search_usecase import UserSearchInputData, UserSearchInteractor
 
 from app.core.config import settings
 from app.core.logger import logger
-from app.exceptions.exception import DuplicateError, NoContentError
+from app.exceptions.exception import DuplicateError, NoContentError, PreconditionFailedError
+from app.lib.cursor import encode_cursor, decode_cursor
+from app.lib.etag import make_etag, etag_matches, expected_updated_at
 from app.depends.usecase_module import (
     user_get_interactor_injector,
     user_create_interactor_injector,
+    user_bulk_create_interactor_injector,
     user_update_interactor_injector,
+    user_bulk_update_interactor_injector,
     user_delete_interactor_injector,
+    user_bulk_delete_interactor_injector,
+    user_export_interactor_injector,
+    user_search_interactor_injector,
 )
 
 router = APIRouter()
 
 
-# TODO: offsetとlimitの指定
-@router.get(
-    "/",
-    response_model=list[UserOutputData],
-    responses={
-        404: {
-            "description": "Users not found",
-            "content": {"application/json": {"example": {"detail": "Users not found"}}},
-        },
+class ExportFormat(str, Enum):
+    """
+    ExportFormat
+    """
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+FIELDS_QUERY_TITLE = "Comma-separated fields to be included in the response. All fields if omitted."
+
+# ルートごとのレスポンスの説明。同期版と非同期版(async_users)のルータで共通
+READ_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "Users. If there is a next page, its URL is set to the Link header (rel=\"next\").",
     },
-)
-def read_users(
-    user_get_interactor: UserGetInteractor = Depends(user_get_interactor_injector),
-) -> UserOutputData:
+    400: {
+        "description": "Invalid cursor or fields",
+        "content": {"application/json": {"example": {"detail": "Invalid cursor: cursor"}}},
+    },
+    404: {
+        "description": "Users not found",
+        "content": {"application/json": {"example": {"detail": "Users not found"}}},
+    },
+}
+
+EXPORT_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "All users, streamed as NDJSON or CSV.",
+        "content": {"application/x-ndjson": {}, "text/csv": {}},
+    },
+}
+
+SEARCH_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "Users matching all the conditions. "
+        "If there is a next page, its URL is set to the Link header (rel=\"next\").",
+    },
+    400: {
+        "description": "Invalid conditions, cursor or fields",
+        "content": {"application/json": {"example": {"detail": "Specify at least one condition: name"}}},
+    },
+}
+
+READ_USERS_ME_RESPONSES: dict[int | str, dict] = {
+    304: {
+        "description": "Not modified. The ETag given by the If-None-Match header is up to date.",
+    },
+    401: {
+        "description": "Incorrect username or password",
+        "content": {"application/json": {"example": {"detail": "Incorrect username or password"}}},
+    },
+}
+
+READ_USER_RESPONSES: dict[int | str, dict] = {
+    304: {
+        "description": "Not modified. The ETag given by the If-None-Match header is up to date.",
+    },
+    400: {
+        "description": "Invalid fields",
+        "content": {"application/json": {"example": {"detail": "Unknown fields: field"}}},
+    },
+    404: {
+        "description": "User not found",
+        "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
+    },
+}
+
+CREATE_USER_RESPONSES: dict[int | str, dict] = {
+    204: {
+        "description": "User is created, but data fetch is failed.",
+    },
+    409: {
+        "description": "User of email is already exists.",
+        "content": {"application/json": {"example": {"detail": "User or email is already exists: name"}}},
+    },
+}
+
+CREATE_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "Results of each user in the order of the request. "
+        "status is 201 if created, 409 if the user or email is already exists.",
+    },
+    400: {
+        "description": "Bad Request.",
+        "content": {"application/json": {"example": {"detail": "Too many users."}}},
+    },
+}
+
+UPDATE_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "Results of each user in the order of the request. "
+        "status is 200 if updated, 404 if the user is not found, 409 if the user or email is already exists.",
+    },
+    400: {
+        "description": "Bad Request.",
+        "content": {"application/json": {"example": {"detail": "Each user must be specified only once."}}},
+    },
+    409: {
+        "description": "User of email was concurrently changed to the same value. No user is updated.",
+        "content": {"application/json": {"example": {"detail": "User or email is already exists."}}},
+    },
+}
+
+DELETE_USERS_RESPONSES: dict[int | str, dict] = {
+    200: {
+        "description": "Results of each user in the order of the request. "
+        "status is 200 if deleted, 404 if the user is not found.",
+    },
+    400: {
+        "description": "Bad Request.",
+        "content": {"application/json": {"example": {"detail": "Too many users."}}},
+    },
+}
+
+UPDATE_USER_RESPONSES: dict[int | str, dict] = {
+    400: {
+        "description": "Bad Request.",
+        "content": {"application/json": {"example": {"detail": "Invalid request body."}}},
+    },
+    404: {
+        "description": "User not found",
+        "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
+    },
+    409: {
+        "description": "User of email is already exists.",
+        "content": {"application/json": {"example": {"detail": "User or email is already exists: name"}}},
+    },
+    412: {
+        "description": "User has been modified since the ETag specified in If-Match was issued.",
+        "content": {"application/json": {"example": {"detail": "User has been modified: id=id"}}},
+    },
+}
+
+DELETE_USER_RESPONSES: dict[int | str, dict] = {
+    404: {
+        "description": "User not found",
+        "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
+    },
+}
+
+
+def cache_headers(etag: str) -> dict[str, str]:
     """
-    read_users
+    ユーザの取得結果に付与するETagとCache-Controlヘッダ
+    """
+
+    headers = {"ETag": etag}
+
+    if settings.USERS_CACHE_CONTROL:
+        headers["Cache-Control"] = settings.USERS_CACHE_CONTROL
+
+    return headers
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    """
+    カンマ区切りのfieldsクエリパラメータをフィールドのリストに変換する。
+    """
+
+    return None if fields is None else [field.strip() for field in fields.split(",")]
+
+
+def decode_after(after: str | None) -> int:
+    """
+    afterクエリパラメータのカーソルをidに変換する。
     """
 
     try:
-        content = user_get_interactor.handle()
+        return decode_cursor(after) if after else 0
+    except ValueError as e:
+        logger.info(f"ValueError: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def set_next_link(request: Request, response: Response, limit: int, next_after: int | None) -> None:
+    """
+    次のページがある場合、そのURLをLinkヘッダに設定する。
+    """
+
+    if next_after is not None:
+        next_url = request.url.include_query_params(limit=limit, after=encode_cursor(next_after))
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+def export_response(content: Iterator[str] | AsyncIterator[str], format: ExportFormat) -> StreamingResponse:
+    """
+    export_response
+    """
+
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format.value}"'},
+    )
+
+
+@contextmanager
+def http_errors(
+    not_found: str | None = None,
+    duplicate: str = "User or email is already exists.",
+    modified: str | None = None,
+) -> Iterator[None]:
+    """
+    ユースケースの例外をHTTPのエラーレスポンスに変換する。detailを省略した場合は例外のメッセージとする。
+    """
+
+    try:
+        yield
+    except HTTPException:
+        raise
+    except DuplicateError as e:
+        logger.info(f"DuplicateError: {e}")
+        raise HTTPException(status_code=409, detail=duplicate)
     except NoContentError as e:
         logger.info(f"NoContentError: {e}")
-        raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=404, detail=not_found or str(e))
+    except PreconditionFailedError as e:
+        logger.info(f"PreconditionFailedError: {e}")
+        raise HTTPException(status_code=412, detail=modified or str(e))
+    except ValueError as e:
+        logger.info(f"ValueError: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception(e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    return content
+
+@router.get(
+    "/",
+    response_model=list[UserOutputData],
+    response_model_exclude_unset=True,
+    responses=READ_USERS_RESPONSES,
+)
+def read_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(
+        settings.USERS_PAGE_DEFAULT_LIMIT,
+        title="The maximum number of users in a page.",
+        ge=1,
+        le=settings.USERS_PAGE_MAX_LIMIT,
+    ),
+    after: str | None = Query(None, title="The cursor of the page, given by the Link header of the previous page."),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    user_get_interactor: UserGetInteractor = Depends(user_get_interactor_injector),
+) -> list[UserOutputData]:
+    """
+    read_users
+    """
+
+    with http_errors():
+        page = user_get_interactor.handle(limit=limit, after=decode_after(after), fields=parse_fields(fields))
+
+    set_next_link(request, response, limit, page.next_after)
+
+    return page.users
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses=EXPORT_USERS_RESPONSES,
+)
+def export_users(
+    format: ExportFormat = Query(ExportFormat.ndjson, title="The format of the exported users."),
+    user_export_interactor: UserExportInteractor = Depends(user_export_interactor_injector),
+) -> StreamingResponse:
+    """
+    export_users
+    """
+
+    users = user_export_interactor.handle()
+
+    content = _users_to_csv(users) if format == ExportFormat.csv else _users_to_ndjson(users)
+
+    return export_response(content, format)
+
+
+@router.get(
+    "/search",
+    response_model=list[UserOutputData],
+    response_model_exclude_unset=True,
+    responses=SEARCH_USERS_RESPONSES,
+)
+def search_users(
+    request: Request,
+    response: Response,
+    name: str | None = Query(None, title="The prefix of the name.", min_length=1),
+    email: str | None = Query(None, title="The email.", min_length=1),
+    created_from: datetime | None = Query(None, title="Users created at or after this datetime."),
+    created_to: datetime | None = Query(None, title="Users created before this datetime."),
+    q: str | None = Query(None, title="A substring of the name or the email (case-insensitive).", min_length=1),
+    limit: int = Query(
+        settings.USERS_PAGE_DEFAULT_LIMIT,
+        title="The maximum number of users in a page.",
+        ge=1,
+        le=settings.USERS_PAGE_MAX_LIMIT,
+    ),
+    after: str | None = Query(None, title="The cursor of the page, given by the Link header of the previous page."),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    user_search_interactor: UserSearchInteractor = Depends(user_search_interactor_injector),
+) -> list[UserOutputData]:
+    """
+    search_users
+    """
+
+    after_id = decode_after(after)
+    conditions = UserSearchInputData(name=name, email=email, created_from=created_from, created_to=created_to, q=q)
+
+    with http_errors():
+        page = user_search_interactor.handle(conditions, limit=limit, after=after_id, fields=parse_fields(fields))
+
+    set_next_link(request, response, limit, page.next_after)
+
+    return page.users
 
 
 @router.get(
     "/me",
     response_model=UserOutputData,
-    responses={
-        401: {
-            "description": "Incorrect username or password",
-            "content": {"application/json": {"example": {"detail": "Incorrect username or password"}}},
-        },
-    },
+    responses=READ_USERS_ME_RESPONSES,
 )
 def read_users_me(
+    response: Response,
+    if_none_match: str | None = Header(None, description="ETag of the user given by the previous response."),
     user: UserOutputData = Depends(get_current_user),
-) -> UserOutputData:
+) -> UserOutputData | Response:
     """
     read_user_me
     """
+
+    etag = make_etag(user.id, user.updated_at)
+
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    response.headers.update(cache_headers(etag))
+
     return user
 
 
 @router.get(
     "/{id}",
     response_model=UserOutputData,
-    responses={
-        404: {
-            "description": "User not found",
-            "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
-        },
-    },
+    response_model_exclude_unset=True,
+    responses=READ_USER_RESPONSES,
 )
 def read_user(
+    response: Response,
     id: int = Path(
         ...,
         title="The ID of the user.",
         ge=settings.ID_MIN,
     ),
+    fields: str | None = Query(None, title=FIELDS_QUERY_TITLE),
+    if_none_match: str | None = Header(None, description="ETag of the user given by the previous response."),
     user_get_interactor: UserGetInteractor = Depends(user_get_interactor_injector),
-) -> UserOutputData:
+) -> UserOutputData | Response:
     """
     read_user
     """
 
-    try:
-        content = user_get_interactor.handle(id)
-    except NoContentError as e:
-        logger.info(f"NoContentError: {e}")
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        logger.exception(e)
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    field_list = parse_fields(fields)
+
+    with http_errors():
+        # If-None-Matchが指定された場合は、まずupdated_atのみを取得してETagを比較し、
+        # 変更されていなければユーザ全体の取得とシリアライズを省略する
+        if if_none_match is not None:
+            version = user_get_interactor.handle(id, fields=["updated_at"])
+            etag = make_etag(version.id, version.updated_at, field_list)
+
+            if etag_matches(etag, if_none_match):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+        content = user_get_interactor.handle(id, fields=field_list)
+
+    response.headers.update(cache_headers(make_etag(content.id, content.updated_at, field_list)))
 
     return content
 
@@ -108,18 +429,11 @@ def read_user(
     "/",
     response_model=UserOutputData,
     status_code=status.HTTP_201_CREATED,
-    responses={
-        204: {
-            "description": "User is created, but data fetch is failed.",
-        },
-        409: {
-            "description": "User of email is already exists.",
-            "content": {"application/json": {"example": {"detail": "User or email is already exists: name"}}},
-        },
-    },
+    responses=CREATE_USER_RESPONSES,
 )
 def create_user(
     user: UserCreateInputData,
+    response: Response,
     user_create_interactor: UserCreateInteractor = Depends(user_create_interactor_injector),
 ) -> UserOutputData | Response:
     """
@@ -140,57 +454,92 @@ def create_user(
         logger.exception(e)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+    response.headers["ETag"] = make_etag(content.id, content.updated_at)
+
+    return content
+
+
+@router.post(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=CREATE_USERS_RESPONSES,
+)
+def create_users(
+    users: list[UserCreateInputData],
+    user_bulk_create_interactor: UserBulkCreateInteractor = Depends(user_bulk_create_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    create_users
+    """
+
+    with http_errors():
+        content = user_bulk_create_interactor.handle(users)
+
+    return content
+
+
+@router.patch(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=UPDATE_USERS_RESPONSES,
+)
+def update_users(
+    users: list[UserBulkUpdateInputData],
+    user_bulk_update_interactor: UserBulkUpdateInteractor = Depends(user_bulk_update_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    update_users
+    """
+
+    with http_errors():
+        content = user_bulk_update_interactor.handle(users)
+
+    return content
+
+
+@router.delete(
+    "/bulk",
+    response_model=list[UserBulkOutputData],
+    responses=DELETE_USERS_RESPONSES,
+)
+def delete_users(
+    ids: list[int] = Body(..., title="The IDs of the users.", example=[1, 2]),
+    user_bulk_delete_interactor: UserBulkDeleteInteractor = Depends(user_bulk_delete_interactor_injector),
+) -> list[UserBulkOutputData]:
+    """
+    delete_users
+    """
+
+    with http_errors():
+        content = user_bulk_delete_interactor.handle(ids)
+
     return content
 
 
 @router.put(
     "/{id}",
     response_model=UserOutputData,
-    responses={
-        204: {
-            "description": "User is updated, but data fetch is failed.",
-        },
-        400: {
-            "description": "Bad Request.",
-            "content": {"application/json": {"example": {"detail": "Invalid request body."}}},
-        },
-        404: {
-            "description": "User not found",
-            "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
-        },
-        409: {
-            "description": "User of email is already exists.",
-            "content": {"application/json": {"example": {"detail": "User or email is already exists: name"}}},
-        },
-    },
+    responses=UPDATE_USER_RESPONSES,
 )
 def update_user(
     user: UserUpdateInputData,
+    response: Response,
     id: int = Path(..., title="The ID of the user.", ge=settings.ID_MIN),
+    if_match: str | None = Header(None, description="ETag of the user to be updated."),
     user_update_interactor: UserUpdateInteractor = Depends(user_update_interactor_injector),
-) -> UserOutputData | Response:
+) -> UserOutputData:
     """
     update_user
     """
 
-    try:
-        content = user_update_interactor.handle(id, user)
-    except DuplicateError as e:
-        logger.info(f"DuplicateError: {e}")
-        raise HTTPException(status_code=409, detail=f"User or email is already exists: {user}")
-    except NoContentError as e:
-        if "404" in str(e):
-            logger.info(f"NoContentError: User not found: id={id}")
-            raise HTTPException(status_code=404, detail=f"User not found: id={id}")
-        else:
-            logger.warning(f"NoContentError: User({user}) is updated, but data fetch is failed.")
-            return Response(status_code=204)
-    except ValueError as e:
-        logger.info(f"ValueError: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.exception(e)
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    with http_errors(
+        not_found=f"User not found: id={id}",
+        duplicate=f"User or email is already exists: {user}",
+        modified=f"User has been modified: id={id}",
+    ):
+        content = user_update_interactor.handle(id, user, expected_updated_at(id, if_match))
+
+    response.headers["ETag"] = make_etag(content.id, content.updated_at)
 
     return content
 
@@ -198,12 +547,7 @@ def update_user(
 @router.delete(
     "/{id}",
     response_model=UserOutputData,
-    responses={
-        404: {
-            "description": "User not found",
-            "content": {"application/json": {"example": {"detail": "User not found: id=id"}}},
-        },
-    },
+    responses=DELETE_USER_RESPONSES,
 )
 def delete_user(
     id: int = Path(..., title="The ID of the user.", ge=settings.ID_MIN),
@@ -213,13 +557,55 @@ def delete_user(
     delete_user
     """
 
-    try:
+    with http_errors(not_found=f"User not found: id={id}"):
         content = user_delete_interactor.handle(id)
-    except NoContentError:
-        logger.info(f"NoContentError: User not found: id={id}")
-        raise HTTPException(status_code=404, detail=f"User not found: id={id}")
-    except Exception as e:
-        logger.exception(e)
-        raise HTTPException(status_code=500, detail="Internal Server Error")
 
     return content
+
+
+def _users_to_ndjson(users: Iterator[UserOutputData]) -> Iterator[str]:
+    """
+    ユーザを1行1JSONに変換し、USERS_EXPORT_BATCH_SIZE行ごとにまとめて返す。
+    """
+
+    lines = []
+
+    for user in users:
+        lines.append(user.model_dump_json() + "\n")
+
+        if len(lines) >= settings.USERS_EXPORT_BATCH_SIZE:
+            yield "".join(lines)
+            lines.clear()
+
+    if lines:
+        yield "".join(lines)
+
+
+def _users_to_csv(users: Iterator[UserOutputData]) -> Iterator[str]:
+    """
+    ユーザをCSVに変換し、ヘッダ行の後にUSERS_EXPORT_BATCH_SIZE行ごとにまとめて返す。
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(UserOutputData.model_fields)
+    # 最初のバイトをすぐに返すため、ヘッダ行は単独で返す
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    rows = 0
+
+    for user in users:
+        writer.writerow(user.model_dump(mode="json").values())
+        rows += 1
+
+        if rows >= settings.USERS_EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    if rows:
+        yield buffer.getvalue()
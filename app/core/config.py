@@ -30,6 +30,32 @@ class Settings(BaseSettings):
             raise ValueError("PASSWORD_MIN_LENGTH must be greater than 6.")
         return v
 
+    # ログ関連設定
+    # アプリケーション(FastAPIロガー)のログレベル
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # ロガーごとのログレベル。"sqlalchemy.engine=INFO,FastAPI=DEBUG"のように指定する
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    # ログの形式(text, json)
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    # DEBUGログのうち出力する割合(0.0〜1.0)。大量に出力されるDEBUGログを間引く
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+    # プロファイリング関連設定
+    # Trueの場合、リクエスト単位のプロファイリングを有効にする(Falseの場合はミドルウェア自体を登録しない)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    # プロファイリングするリクエストの割合(0.0〜1.0)
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.0"))
+    # X-Profile-Signatureヘッダの署名に使う鍵(空の場合はヘッダによるプロファイリングを受け付けない)
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")
+    # 署名を受け付ける期間(秒)。X-Profile-Timestampヘッダの時刻が現在時刻からこれ以上ずれた署名は受け付けない
+    PROFILING_SIGNATURE_MAX_AGE_SECONDS: float = float(os.getenv("PROFILING_SIGNATURE_MAX_AGE_SECONDS", "60"))
+    # プロファイリング結果を保存するディレクトリ
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "profiles")
+    # 保持するプロファイリング結果の件数。超えた場合は古いものから削除する
+    PROFILING_MAX_FILES: int = int(os.getenv("PROFILING_MAX_FILES", "100"))
+    # スタックを採取する間隔(秒)
+    PROFILING_INTERVAL: float = 0.001
+
     # データベース関連設定
     DATABASE_DIALECT: str = os.getenv("DATABASE_DIALECT", "sqlite")
     DATABASE_USER: str = os.getenv("DATABASE_USER", "admin")
@@ -40,10 +66,27 @@ class Settings(BaseSettings):
 
     if DATABASE_DIALECT == "sqlite":
         DATABASE_URL: str = "sqlite:///sample_db.sqlite3"
+        ASYNC_DATABASE_URL: str = "sqlite+aiosqlite:///sample_db.sqlite3"
     else:
         DATABASE_URL = (
             f"{DATABASE_DIALECT}://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
         )
+        ASYNC_DATABASE_URL = (
+            f"{DATABASE_DIALECT}+asyncpg://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
+        )
+
+    # Trueの場合、ユーザAPIはAsyncEngine上の非同期リポジトリを使う
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+    # Trueの場合、リクエスト内で発行したSQL文の件数とDBの処理時間をレスポンスヘッダに付与する(開発用)
+    DB_QUERY_STATS_HEADER: bool = os.getenv("DB_QUERY_STATS_HEADER", "false").lower() == "true"
+    # リクエスト内で発行したSQL文がこの件数を超えた場合に警告を出力する(0の場合は出力しない)
+    DB_QUERY_WARN_THRESHOLD: int = int(os.getenv("DB_QUERY_WARN_THRESHOLD", "0"))
+
+    # 起動時のウォームアップ関連設定
+    # Trueの場合、起動時に最初のリクエストで行われる初期化を済ませてから、/readyが成功を返すようにする
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    # 起動時に開いておくDBの接続数(pool_sizeを超える分は開かない)
+    WARMUP_DB_CONNECTIONS: int = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
 
     # JWT関連設定
     JWT_SECRET_KEY: str = os.getenv(
@@ -52,6 +95,42 @@ class Settings(BaseSettings):
     )
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    # 検証済みトークンのキャッシュ件数(0の場合はキャッシュしない)
+    JWT_CACHE_MAXSIZE: int = 10000
+    # Trueの場合、アクセストークンにユーザ情報を含め、認証時にDBを参照しない
+    JWT_CLAIMS_ONLY_AUTH: bool = False
+    # 失効させたトークンバージョンを保持する件数。
+    # 超えた場合は、保持しきれなかった失効情報が不要になるまでトークンのクレームのみによる認証を行わない
+    JWT_REVOCATION_MAXSIZE: int = 100000
+    # トークンのクレームのみで認証する場合に、ユーザの最新のトークンバージョンをDBで確認し直す間隔(秒)
+    JWT_CLAIMS_ONLY_RECHECK_SECONDS: float = 30
+
+    # ページネーション関連設定
+    USERS_PAGE_DEFAULT_LIMIT: int = 100
+    USERS_PAGE_MAX_LIMIT: int = 1000
+
+    # エクスポート関連設定
+    USERS_EXPORT_BATCH_SIZE: int = 1000
+
+    # 一括登録関連設定
+    USERS_BULK_MAX_SIZE: int = 10000
+    USERS_BULK_CHUNK_SIZE: int = 1000
+
+    # ユーザキャッシュ関連設定(USER_CACHE_MAXSIZEが0の場合はキャッシュしない)
+    # 更新・削除時は同一プロセス内のキャッシュのみ破棄されるため、他プロセスではTTLの間古い値が返りうる
+    USER_CACHE_MAXSIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 30
+
+    # HTTPキャッシュ関連設定
+    # ユーザの取得結果に付与するCache-Controlヘッダ(空の場合は付与しない)。
+    # no-cacheの場合、クライアントは毎回ETagで再検証し、変更がなければ304を受け取る
+    USERS_CACHE_CONTROL: str = os.getenv("USERS_CACHE_CONTROL", "private, no-cache")
+
+    # パスワードハッシュ関連設定
+    # 新たに保存するパスワードのハッシュ方式(scrypt, argon2)。argon2を使う場合はargon2-cffiが必要
+    PASSWORD_HASH_SCHEME: str = os.getenv("PASSWORD_HASH_SCHEME", "scrypt")
+    # ハッシュ計算を行うプロセス数(0の場合はプロセスプールを使わず、呼び出し元のスレッドで計算する)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
 
 
 settings = Settings()
@@ -1,12 +1,99 @@
-from logging import getLogger, StreamHandler, Formatter, INFO
+import atexit
+import json
+import random
+from datetime import datetime
+from logging import getLogger, Filter, Formatter, LogRecord, StreamHandler, DEBUG
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+from app.core.config import settings
+
+
+class JsonFormatter(Formatter):
+    """
+    ログを1行のJSONに整形する。
+    """
+
+    def format(self, record: LogRecord) -> str:
+        log = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+
+        if record.exc_info:
+            log["exc_info"] = self.formatException(record.exc_info)
+
+        return json.dumps(log, ensure_ascii=False)
+
+
+class SamplingFilter(Filter):
+    """
+    DEBUG以下のログをrateの割合のみ残す。INFO以上のログは常に残す。
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: LogRecord) -> bool:
+        return record.levelno > DEBUG or random.random() < self.rate
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    同一プロセス内のQueueListenerにログを渡すQueueHandler
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        # 同一プロセス内のキューのため、レコードを複製・整形せずに渡し、整形はリスナーのスレッドで行う。
+        # 引数のみ、呼び出し後に変更されても記録時の値となるよう、ここでメッセージに埋め込む
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+
+def parse_log_levels(log_levels: str) -> dict[str, str]:
+    """
+    "name=LEVEL,name=LEVEL"形式のロガーごとのログレベルを辞書に変換する。
+    """
+
+    levels = {}
+
+    for item in log_levels.split(","):
+        name, _, level = item.partition("=")
+
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+
+    return levels
 
 
 logger = getLogger("FastAPI")
-logger.setLevel(INFO)
+logger.setLevel(settings.LOG_LEVEL.upper())
+
+for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+    getLogger(name).setLevel(level)
 
+# ログの出力はリスナーのスレッドで行い、リクエストを処理するスレッドはキューへの追加のみ行う。
+# ルートロガーに設定し、LOG_LEVELSでレベルを指定した他のライブラリのログも同じ形式で出力する
 handler = StreamHandler()
 
-formatter = Formatter("%(asctime)s %(name)s(%(process)d):[%(levelname)s] %(message)s")
-handler.setFormatter(formatter)
+if settings.LOG_FORMAT.lower() == "json":
+    handler.setFormatter(JsonFormatter())
+else:
+    handler.setFormatter(Formatter("%(asctime)s %(name)s(%(process)d):[%(levelname)s] %(message)s"))
+
+queue: SimpleQueue = SimpleQueue()
+queue_handler = LocalQueueHandler(queue)
+queue_handler.addFilter(SamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+listener = QueueListener(queue, handler)
+listener.start()
+# 終了時にキューに残ったログを出力する
+atexit.register(listener.stop)
 
-logger.addHandler(handler)
+getLogger().addHandler(queue_handler)
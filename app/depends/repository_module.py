@@ -1,8 +1,13 @@
-from injector import Module, Binder
+from injector import Module, Binder, singleton
 
-from app.interfaces.gateways.user_repository import UserRepository, UserRepositoryImpl
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+from app.interfaces.gateways.cached_user_repository import CachedUserRepository, AsyncCachedUserRepository
 
 
 class RepositoryModule(Module):
     def configure(self, binder: Binder) -> None:
-        binder.bind(interface=UserRepository, to=UserRepositoryImpl)  # type: ignore
+        # リポジトリはリクエストごとのセッションをdb.session経由で参照するため、シングルトンで共有できる
+        # find_user_by_idの結果はキャッシュ付きのデコレータ経由で返す
+        binder.bind(interface=UserRepository, to=CachedUserRepository, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserRepository, to=AsyncCachedUserRepository, scope=singleton)  # type: ignore
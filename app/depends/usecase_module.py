@@ -1,33 +1,186 @@
-from injector import Injector
+from injector import Injector, Module, Binder, singleton
 
 from app.depends.repository_module import RepositoryModule
-from app.usecases.users.user_get_usercase import UserGetInteractor, UserGetInteractorImpl
-from app.usecases.users.user_create_usecase import UserCreateInteractor, UserCreateInteractorImpl
-from app.usecases.users.user_update_usecase import UserUpdateInteractor, UserUpdateInteractorImpl
-from app.usecases.users.user_delete_usecase import UserDeleteInteractor, UserDeleteInteractorImpl
-from app.usecases.auth.auth_usecase import AuthInteractor, AuthInteractorImpl
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.interfaces.gateways.async_user_repository import AsyncUserRepositoryImpl
+from app.usecases.users.user_get_usercase import (
+    UserGetInteractor,
+    UserGetInteractorImpl,
+    AsyncUserGetInteractor,
+    AsyncUserGetInteractorImpl,
+)
+from app.usecases.users.user_create_usecase import (
+    UserCreateInteractor,
+    UserCreateInteractorImpl,
+    AsyncUserCreateInteractor,
+    AsyncUserCreateInteractorImpl,
+)
+from app.usecases.users.user_bulk_create_usecase import (
+    UserBulkCreateInteractor,
+    UserBulkCreateInteractorImpl,
+    AsyncUserBulkCreateInteractor,
+    AsyncUserBulkCreateInteractorImpl,
+)
+from app.usecases.users.user_update_usecase import (
+    UserUpdateInteractor,
+    UserUpdateInteractorImpl,
+    AsyncUserUpdateInteractor,
+    AsyncUserUpdateInteractorImpl,
+)
+from app.usecases.users.user_bulk_update_usecase import (
+    UserBulkUpdateInteractor,
+    UserBulkUpdateInteractorImpl,
+    AsyncUserBulkUpdateInteractor,
+    AsyncUserBulkUpdateInteractorImpl,
+)
+from app.usecases.users.user_delete_usecase import (
+    UserDeleteInteractor,
+    UserDeleteInteractorImpl,
+    AsyncUserDeleteInteractor,
+    AsyncUserDeleteInteractorImpl,
+)
+from app.usecases.users.user_bulk_delete_usecase import (
+    UserBulkDeleteInteractor,
+    UserBulkDeleteInteractorImpl,
+    AsyncUserBulkDeleteInteractor,
+    AsyncUserBulkDeleteInteractorImpl,
+)
+from app.usecases.users.user_export_usecase import (
+    UserExportInteractor,
+    UserExportInteractorImpl,
+    AsyncUserExportInteractor,
+    AsyncUserExportInteractorImpl,
+)
+from app.usecases.users.user_search_usecase import (
+    UserSearchInteractor,
+    UserSearchInteractorImpl,
+    AsyncUserSearchInteractor,
+    AsyncUserSearchInteractorImpl,
+)
+from app.usecases.auth.auth_usecase import (
+    AuthInteractor,
+    AuthInteractorImpl,
+    AsyncAuthInteractor,
+    AsyncAuthInteractorImpl,
+)
+
+
+class UsecaseModule(Module):
+    def configure(self, binder: Binder) -> None:
+        # Interactorはリポジトリ以外の状態を持たないため、アプリケーション全体で1インスタンスを共有する
+        binder.bind(interface=UserGetInteractor, to=UserGetInteractorImpl, scope=singleton)
+        binder.bind(interface=UserCreateInteractor, to=UserCreateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserBulkCreateInteractor, to=UserBulkCreateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserUpdateInteractor, to=UserUpdateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserBulkUpdateInteractor, to=UserBulkUpdateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserDeleteInteractor, to=UserDeleteInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserBulkDeleteInteractor, to=UserBulkDeleteInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserExportInteractor, to=UserExportInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=UserSearchInteractor, to=UserSearchInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AuthInteractor, to=AuthInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserGetInteractor, to=AsyncUserGetInteractorImpl, scope=singleton)
+        binder.bind(interface=AsyncUserCreateInteractor, to=AsyncUserCreateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserBulkCreateInteractor, to=AsyncUserBulkCreateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserUpdateInteractor, to=AsyncUserUpdateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserBulkUpdateInteractor, to=AsyncUserBulkUpdateInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserDeleteInteractor, to=AsyncUserDeleteInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserBulkDeleteInteractor, to=AsyncUserBulkDeleteInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserExportInteractor, to=AsyncUserExportInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncUserSearchInteractor, to=AsyncUserSearchInteractorImpl, scope=singleton)  # type: ignore
+        binder.bind(interface=AsyncAuthInteractor, to=AsyncAuthInteractorImpl, scope=singleton)  # type: ignore
+
+
+# DIコンテナは起動時に一度だけ構築し、リクエストごとには解決済みのインスタンスを返すだけにする
+injector = Injector([RepositoryModule(), UsecaseModule()])
+
+# トークンのバージョンの照合では、キャッシュを経由せずDB上の最新の行を参照する
+uncached_user_get_interactor = UserGetInteractorImpl(injector.get(UserRepositoryImpl))
+async_uncached_user_get_interactor = AsyncUserGetInteractorImpl(injector.get(AsyncUserRepositoryImpl))
 
 
 def user_get_interactor_injector() -> UserGetInteractor:
-    injector = Injector([RepositoryModule])
-    return injector.get(UserGetInteractorImpl)
+    return injector.get(UserGetInteractor)
+
+
+def uncached_user_get_interactor_injector() -> UserGetInteractor:
+    return uncached_user_get_interactor
 
 
 def user_create_interactor_injector() -> UserCreateInteractor:
-    injector = Injector([RepositoryModule])
-    return injector.get(UserCreateInteractorImpl)
+    return injector.get(UserCreateInteractor)  # type: ignore
+
+
+def user_bulk_create_interactor_injector() -> UserBulkCreateInteractor:
+    return injector.get(UserBulkCreateInteractor)  # type: ignore
 
 
 def user_update_interactor_injector() -> UserUpdateInteractor:
-    injector = Injector([RepositoryModule])
-    return injector.get(UserUpdateInteractorImpl)
+    return injector.get(UserUpdateInteractor)  # type: ignore
+
+
+def user_bulk_update_interactor_injector() -> UserBulkUpdateInteractor:
+    return injector.get(UserBulkUpdateInteractor)  # type: ignore
 
 
 def user_delete_interactor_injector() -> UserDeleteInteractor:
-    injector = Injector([RepositoryModule])
-    return injector.get(UserDeleteInteractorImpl)
+    return injector.get(UserDeleteInteractor)  # type: ignore
+
+
+def user_bulk_delete_interactor_injector() -> UserBulkDeleteInteractor:
+    return injector.get(UserBulkDeleteInteractor)  # type: ignore
+
+
+def user_export_interactor_injector() -> UserExportInteractor:
+    return injector.get(UserExportInteractor)  # type: ignore
+
+
+def user_search_interactor_injector() -> UserSearchInteractor:
+    return injector.get(UserSearchInteractor)  # type: ignore
 
 
 def auth_interactor_injector() -> AuthInteractor:
-    injector = Injector([RepositoryModule])
-    return injector.get(AuthInteractorImpl)
+    return injector.get(AuthInteractor)  # type: ignore
+
+
+def async_user_get_interactor_injector() -> AsyncUserGetInteractor:
+    return injector.get(AsyncUserGetInteractor)
+
+
+def async_uncached_user_get_interactor_injector() -> AsyncUserGetInteractor:
+    return async_uncached_user_get_interactor
+
+
+def async_user_create_interactor_injector() -> AsyncUserCreateInteractor:
+    return injector.get(AsyncUserCreateInteractor)  # type: ignore
+
+
+def async_user_bulk_create_interactor_injector() -> AsyncUserBulkCreateInteractor:
+    return injector.get(AsyncUserBulkCreateInteractor)  # type: ignore
+
+
+def async_user_update_interactor_injector() -> AsyncUserUpdateInteractor:
+    return injector.get(AsyncUserUpdateInteractor)  # type: ignore
+
+
+def async_user_bulk_update_interactor_injector() -> AsyncUserBulkUpdateInteractor:
+    return injector.get(AsyncUserBulkUpdateInteractor)  # type: ignore
+
+
+def async_user_delete_interactor_injector() -> AsyncUserDeleteInteractor:
+    return injector.get(AsyncUserDeleteInteractor)  # type: ignore
+
+
+def async_user_bulk_delete_interactor_injector() -> AsyncUserBulkDeleteInteractor:
+    return injector.get(AsyncUserBulkDeleteInteractor)  # type: ignore
+
+
+def async_user_export_interactor_injector() -> AsyncUserExportInteractor:
+    return injector.get(AsyncUserExportInteractor)  # type: ignore
+
+
+def async_user_search_interactor_injector() -> AsyncUserSearchInteractor:
+    return injector.get(AsyncUserSearchInteractor)  # type: ignore
+
+
+def async_auth_interactor_injector() -> AsyncAuthInteractor:
+    return injector.get(AsyncAuthInteractor)  # type: ignore
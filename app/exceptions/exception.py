@@ -12,3 +12,11 @@ class NoContentError(Exception):
     """
 
     pass
+
+
+class PreconditionFailedError(Exception):
+    """
+    PreconditionFailedError
+    """
+
+    pass
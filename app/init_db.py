@@ -1,10 +1,11 @@
 from datetime import datetime
 
 from app.interfaces.gateways.db import Base, engine, session
-from app.interfaces.gateways.schema import User
+from app.interfaces.gateways.schema import User, create_users_fts
 
 if __name__ == "__main__":
     Base.metadata.create_all(engine)
+    create_users_fts(engine)
 
     now = datetime.now()
 
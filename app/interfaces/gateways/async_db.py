@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, async_scoped_session
+
+from app.core.config import settings
+from app.interfaces.gateways.db import current_scope
+
+engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=False)
+
+# 非同期セッションではコミット後の属性アクセスで暗黙のI/Oが発生しないようにする
+AsyncSession = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+# 同期のdb.sessionと同じくリクエスト単位のスコープで管理する
+session = async_scoped_session(AsyncSession, scopefunc=current_scope)
@@ -0,0 +1,405 @@
+import asyncio
+from abc import ABCMeta, abstractmethod
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+from app.interfaces.gateways import async_db
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_statements import (
+    bulk_insert_statement,
+    bulk_update_statement,
+    chunks,
+    delete_user_statement,
+    delete_users_statement,
+    hash_user_passwords,
+    new_user,
+    search_users_statement,
+    to_bulk_insert_row,
+    to_bulk_update_results,
+    to_bulk_update_row,
+    to_created_user_row,
+    to_deleted_user_row,
+    to_update_values,
+    to_updated_user_row,
+    to_user_row,
+    unique_user_indexes,
+    update_password_hash_statement,
+    update_user_statement,
+    user_by_id_statement,
+    user_by_name_statement,
+    user_exists_statement,
+    users_by_ids_statement,
+    users_export_statement,
+    users_page_statement,
+)
+from app.exceptions.exception import DuplicateError, NoContentError
+from app.core.logger import logger
+from app.lib.security import async_hash_password
+
+
+class AsyncUserRepository(metaclass=ABCMeta):
+    """
+    AsyncUserRepository
+    """
+
+    @abstractmethod
+    async def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
+        """
+        find_users_page
+        """
+        pass
+
+    @abstractmethod
+    def iter_users(self, batch_size: int) -> AsyncIterator[UserRow]:
+        """
+        iter_users
+        """
+        pass
+
+    @abstractmethod
+    async def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
+        """
+        find_user_by_id
+        """
+        pass
+
+    @abstractmethod
+    async def find_user_by_name(self, name: str) -> UserRow:
+        """
+        find_user_by_name
+        """
+        pass
+
+    @abstractmethod
+    async def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
+        """
+        search_users
+        """
+        pass
+
+    @abstractmethod
+    async def create_user(self, name: str, password: str, email: str) -> UserRow:
+        """
+        create_user
+        """
+        pass
+
+    @abstractmethod
+    async def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+        pass
+
+    @abstractmethod
+    async def delete_user(self, id: int) -> UserRow:
+        """
+        delete_user
+        """
+        pass
+
+    @abstractmethod
+    async def delete_users(self, ids: list[int]) -> list[UserRow | None]:
+        """
+        delete_users
+        """
+        pass
+
+    @abstractmethod
+    async def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
+        """
+        update_user
+        """
+        pass
+
+    @abstractmethod
+    async def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
+        pass
+
+    @abstractmethod
+    async def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
+        pass
+
+
+class AsyncUserRepositoryImpl(AsyncUserRepository):
+    """
+    AsyncUserRepositoryImpl
+    """
+
+    async def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
+        """
+        find_users_page
+        """
+
+        try:
+            rows = (await async_db.session.execute(users_page_statement(limit, after, fields))).all()
+        except SQLAlchemyError:
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return [to_user_row(row, fields) for row in rows]
+
+    async def iter_users(self, batch_size: int) -> AsyncIterator[UserRow]:
+        """
+        iter_users
+        """
+
+        # 同期版と同じく、読み終えるまで接続を保持するため専用のセッションを使う
+        async with async_db.AsyncSession() as session:
+            try:
+                async for row in await session.stream(users_export_statement(batch_size)):
+                    yield UserRow._make(row)
+            except SQLAlchemyError:
+                raise
+            finally:
+                logger.debug("db connection closed.")
+
+    async def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
+        """
+        find_user_by_id
+        """
+
+        try:
+            row = (await async_db.session.execute(user_by_id_statement(id, fields))).first()
+        except SQLAlchemyError:
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        if row is None:
+            raise NoContentError(f"User not found: id={id}")
+
+        return to_user_row(row, fields)
+
+    async def find_user_by_name(self, name: str) -> UserRow:
+        """
+        find_user_by_name
+        """
+
+        try:
+            row = (await async_db.session.execute(user_by_name_statement(name))).first()
+        except SQLAlchemyError:
+            raise
+        finally:
+            await async_db.session.close()
+
+        if row is None:
+            raise NoContentError(f"User not found: name={name}")
+
+        return UserRow._make(row)
+
+    async def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
+        """
+        search_users
+        """
+
+        statement = search_users_statement(conditions, limit, after, fields, async_db.engine.dialect.name)
+
+        try:
+            rows = (await async_db.session.execute(statement)).all()
+        except SQLAlchemyError:
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return [to_user_row(row, fields) for row in rows]
+
+    async def create_user(self, name: str, password: str, email: str) -> UserRow:
+        """
+        create_user
+        """
+
+        # 生成時にパスワードのハッシュを計算するため、イベントループを止めないようスレッド上で生成する
+        user = await asyncio.to_thread(new_user, name, password, email)
+
+        try:
+            async_db.session.add(user)
+            # flushでINSERT ... RETURNINGを発行し、採番されたidをコミット前に取得する
+            await async_db.session.flush()
+            created_user = to_created_user_row(user)
+            await async_db.session.commit()
+        except IntegrityError:
+            await async_db.session.rollback()
+
+            raise DuplicateError(f"name: {name} or email: {email} is already exists.")
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return created_user
+
+    async def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+
+        now = datetime.now()
+        statement = bulk_insert_statement(async_db.engine.dialect.name)
+        indexes = unique_user_indexes(users)
+        # 登録対象のユーザのパスワードハッシュは、トランザクションの開始前に並列に計算しておく
+        hashed_users = dict(zip(indexes, await asyncio.to_thread(hash_user_passwords, [users[i] for i in indexes])))
+
+        # 登録できなかった(nameまたはemailが重複した)ユーザはNoneのまま返す
+        created_users: list[UserRow | None] = [None] * len(users)
+
+        try:
+            for chunk in chunks(indexes):
+                rows = [to_bulk_insert_row(hashed_users[i], now) for i in chunk]
+                created = {row.name: UserRow._make(row) for row in await async_db.session.execute(statement, rows)}
+
+                for i in chunk:
+                    created_users[i] = created.get(users[i]["name"])
+
+            await async_db.session.commit()
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return created_users
+
+    async def delete_user(self, id: int) -> UserRow:
+        """
+        delete_user
+        """
+
+        try:
+            row = (await async_db.session.execute(delete_user_statement(id))).first()
+            await async_db.session.commit()
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return to_deleted_user_row(row)
+
+    async def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
+        """
+        update_user
+        """
+
+        id, values = to_update_values(data_to_be_updated)
+
+        # パスワード暗号化
+        if values.get("password") is not None:
+            values["password"] = await async_hash_password(values["password"])
+
+        exists = True
+
+        try:
+            row = (await async_db.session.execute(update_user_statement(id, values, expected_updated_at))).first()
+
+            if row is None:
+                exists = await async_db.session.scalar(user_exists_statement(id)) is not None
+
+            await async_db.session.commit()
+        except IntegrityError as e:
+            await async_db.session.rollback()
+            raise DuplicateError(e)
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return to_updated_user_row(id, row, exists)
+
+    async def delete_users(self, ids: list[int]) -> list[UserRow | None]:
+        """
+        delete_users
+        """
+
+        deleted: dict[int, UserRow] = {}
+
+        # chunkごとに削除し、全chunkを1トランザクションで削除する
+        try:
+            for chunk in chunks(ids):
+                result = await async_db.session.execute(delete_users_statement(chunk))
+                deleted.update((row.id, UserRow._make(row)) for row in result)
+
+            await async_db.session.commit()
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        # 存在しなかったユーザはNoneとして返す
+        return [deleted.get(id) for id in ids]
+
+    async def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
+
+        now = datetime.now()
+        statement = bulk_update_statement()
+        # パスワードハッシュは、トランザクションの開始前に並列に計算しておく
+        users = await asyncio.to_thread(hash_user_passwords, users)
+        rows: dict[int, UserRow] = {}
+
+        # chunkごとに、executemanyによるUPDATEと、更新後のユーザを取得するSELECT ... WHERE id IN (...)を発行し、
+        # 全chunkを1トランザクションで更新する
+        try:
+            for chunk in chunks(users):
+                await async_db.session.execute(statement, [to_bulk_update_row(user, now) for user in chunk])
+                result = await async_db.session.execute(users_by_ids_statement([user["id"] for user in chunk]))
+                rows.update((row.id, UserRow._make(row)) for row in result)
+
+            await async_db.session.commit()
+        except IntegrityError as e:
+            # 他のトランザクションと並行して重複する値に更新した場合
+            await async_db.session.rollback()
+            raise DuplicateError(e)
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
+
+        return to_bulk_update_results(users, rows, now)
+
+    async def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
+
+        try:
+            await async_db.session.execute(update_password_hash_statement(id, password_hash, new_password_hash))
+            await async_db.session.commit()
+        except SQLAlchemyError:
+            await async_db.session.rollback()
+            raise
+        finally:
+            await async_db.session.close()
+            logger.debug("db connection closed.")
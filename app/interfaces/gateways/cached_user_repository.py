@@ -0,0 +1,275 @@
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
+
+from injector import inject
+
+from app.core.config import settings
+from app.exceptions.exception import DuplicateError
+from app.lib.cache import LRUCache
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_repository import UserRepository, UserRepositoryImpl
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository, AsyncUserRepositoryImpl
+
+
+class CachedUserRepository(UserRepository):
+    """
+    find_user_by_idの結果をキャッシュするUserRepositoryのデコレータ
+    """
+
+    @inject
+    def __init__(self, repository: UserRepositoryImpl):
+        self.repository = repository
+        self.cache = LRUCache(settings.USER_CACHE_MAXSIZE, settings.USER_CACHE_TTL_SECONDS)
+
+    def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
+        """
+        find_users_page
+        """
+
+        return self.repository.find_users_page(limit, after, fields)
+
+    def iter_users(self, batch_size: int) -> Iterator[UserRow]:
+        """
+        iter_users
+        """
+
+        return self.repository.iter_users(batch_size)
+
+    def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
+        """
+        find_user_by_id
+        """
+
+        # 読み取り中に更新・削除された場合に古い行をキャッシュしないよう、読み取り前の無効化の回数を控えておく
+        generation = self.cache.generation(id)
+        user: UserRow | None = self.cache.get(id)
+
+        # キャッシュには全列を取得した行のみを格納する。
+        # キャッシュされていれば列を指定された場合でも全列の行を返し、されていなければ指定された列のみを取得する
+        if user is None and fields is not None:
+            return self.repository.find_user_by_id(id, fields)
+
+        if user is None:
+            user = self.repository.find_user_by_id(id)
+            self.cache.set(id, user, generation=generation)
+
+        # UserRowは不変のため、コピーせずにキャッシュした行をそのまま返す
+        return user
+
+    def find_user_by_name(self, name: str) -> UserRow:
+        """
+        find_user_by_name
+        """
+
+        return self.repository.find_user_by_name(name)
+
+    def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
+        """
+        search_users
+        """
+
+        return self.repository.search_users(conditions, limit, after, fields)
+
+    def create_user(self, name: str, password: str, email: str) -> UserRow:
+        """
+        create_user
+        """
+
+        return self.repository.create_user(name, password, email)
+
+    def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+
+        return self.repository.create_users(users)
+
+    def delete_user(self, id: int) -> UserRow:
+        """
+        delete_user
+        """
+
+        try:
+            return self.repository.delete_user(id)
+        finally:
+            self.cache.pop(id)
+
+    def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
+        """
+        update_user
+        """
+
+        id = data_to_be_updated["id"]
+
+        try:
+            return self.repository.update_user(data_to_be_updated, expected_updated_at)
+        finally:
+            self.cache.pop(id)
+
+    def delete_users(self, ids: list[int]) -> list[UserRow | None]:
+        """
+        delete_users
+        """
+
+        try:
+            return self.repository.delete_users(ids)
+        finally:
+            for id in ids:
+                self.cache.pop(id)
+
+    def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
+
+        try:
+            return self.repository.update_users(users)
+        finally:
+            for user in users:
+                self.cache.pop(user["id"])
+
+    def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
+
+        try:
+            self.repository.update_password_hash(id, password_hash, new_password_hash)
+        finally:
+            self.cache.pop(id)
+
+
+class AsyncCachedUserRepository(AsyncUserRepository):
+    """
+    find_user_by_idの結果をキャッシュするAsyncUserRepositoryのデコレータ
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepositoryImpl):
+        self.repository = repository
+        self.cache = LRUCache(settings.USER_CACHE_MAXSIZE, settings.USER_CACHE_TTL_SECONDS)
+
+    async def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
+        """
+        find_users_page
+        """
+
+        return await self.repository.find_users_page(limit, after, fields)
+
+    def iter_users(self, batch_size: int) -> AsyncIterator[UserRow]:
+        """
+        iter_users
+        """
+
+        return self.repository.iter_users(batch_size)
+
+    async def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
+        """
+        find_user_by_id
+        """
+
+        # 読み取り中に更新・削除された場合に古い行をキャッシュしないよう、読み取り前の無効化の回数を控えておく
+        generation = self.cache.generation(id)
+        user: UserRow | None = self.cache.get(id)
+
+        # キャッシュには全列を取得した行のみを格納する。
+        # キャッシュされていれば列を指定された場合でも全列の行を返し、されていなければ指定された列のみを取得する
+        if user is None and fields is not None:
+            return await self.repository.find_user_by_id(id, fields)
+
+        if user is None:
+            user = await self.repository.find_user_by_id(id)
+            self.cache.set(id, user, generation=generation)
+
+        # UserRowは不変のため、コピーせずにキャッシュした行をそのまま返す
+        return user
+
+    async def find_user_by_name(self, name: str) -> UserRow:
+        """
+        find_user_by_name
+        """
+
+        return await self.repository.find_user_by_name(name)
+
+    async def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
+        """
+        search_users
+        """
+
+        return await self.repository.search_users(conditions, limit, after, fields)
+
+    async def create_user(self, name: str, password: str, email: str) -> UserRow:
+        """
+        create_user
+        """
+
+        return await self.repository.create_user(name, password, email)
+
+    async def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+
+        return await self.repository.create_users(users)
+
+    async def delete_user(self, id: int) -> UserRow:
+        """
+        delete_user
+        """
+
+        try:
+            return await self.repository.delete_user(id)
+        finally:
+            self.cache.pop(id)
+
+    async def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
+        """
+        update_user
+        """
+
+        id = data_to_be_updated["id"]
+
+        try:
+            return await self.repository.update_user(data_to_be_updated, expected_updated_at)
+        finally:
+            self.cache.pop(id)
+
+    async def delete_users(self, ids: list[int]) -> list[UserRow | None]:
+        """
+        delete_users
+        """
+
+        try:
+            return await self.repository.delete_users(ids)
+        finally:
+            for id in ids:
+                self.cache.pop(id)
+
+    async def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
+
+        try:
+            return await self.repository.update_users(users)
+        finally:
+            for user in users:
+                self.cache.pop(user["id"])
+
+    async def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
+
+        try:
+            await self.repository.update_password_hash(id, password_hash, new_password_hash)
+        finally:
+            self.cache.pop(id)
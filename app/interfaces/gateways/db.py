@@ -1,12 +1,49 @@
+import threading
+from collections.abc import Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 
 from app.core.config import settings
 
 engine = create_engine(settings.DATABASE_URL, echo=False)
 
 Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-session = Session()
+
+# セッションのスコープを識別するキー。
+# session_scope()の内側ではリクエスト単位、それ以外(init_db等)ではスレッド単位となる。
+_session_scope: ContextVar[object | None] = ContextVar("session_scope", default=None)
+
+
+def current_scope() -> Hashable:
+    """
+    current_scope
+    """
+
+    scope = _session_scope.get()
+
+    return scope if scope is not None else threading.get_ident()
+
+
+session = scoped_session(Session, scopefunc=current_scope)
+
+
+@contextmanager
+def session_scope() -> Iterator[None]:
+    """
+    内側で参照するdb.sessionを専用のセッションにし、終了時に破棄する。
+    """
+
+    token = _session_scope.set(object())
+
+    try:
+        yield
+    finally:
+        session.remove()
+        _session_scope.reset(token)
+
 
 Base = declarative_base()
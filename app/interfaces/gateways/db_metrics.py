@@ -0,0 +1,182 @@
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext, ExecutionContext
+from sqlalchemy.pool import Pool, PoolProxiedConnection, QueuePool
+
+from app.lib.metrics import registry, Counter, Gauge, Histogram, Labels
+
+# DBの処理時間は数ms以下が大半のため、既定より細かいバケットとする
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Duration of SQL statements executed on the database.",
+        ("engine", "operation"),
+        DB_BUCKETS,
+    )
+)
+query_errors = registry.register(
+    Counter("db_query_errors_total", "SQL statements that raised an error.", ("engine", "operation"))
+)
+pool_checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting to check out a connection from the pool.",
+        ("engine",),
+        DB_BUCKETS,
+    )
+)
+pool_overflow_checkouts = registry.register(
+    Counter(
+        "db_pool_overflow_checkouts_total",
+        "Connections checked out beyond pool_size (overflow connections).",
+        ("engine",),
+    )
+)
+
+# engine名とEngineの組
+_engines: dict[str, Engine] = {}
+
+
+class QueryStats:
+    """
+    count_queries()の内側で発行したSQL文の件数と実行時間、コネクションの取得回数
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+        self.checkouts = 0
+
+
+# スレッドプールで実行される同期のエンドポイントにも引き継がれ、同じQueryStatsに記録される
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    内側で発行したSQL文を数える。
+    """
+
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def _pool_status(method: str) -> Iterable[tuple[Labels, float]]:
+    """
+    _pool_status
+    """
+
+    for name, engine in list(_engines.items()):
+        # SingletonThreadPool等のサイズを持たないプールは対象外とする
+        if isinstance(engine.pool, QueuePool):
+            yield (name,), getattr(engine.pool, method)()
+
+
+registry.register(
+    Gauge(
+        "db_pool_checked_out_connections",
+        "Connections currently checked out from the pool.",
+        lambda: _pool_status("checkedout"),
+        ("engine",),
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_overflow_connections",
+        "Overflow connections currently open (negative while the pool is not full).",
+        lambda: _pool_status("overflow"),
+        ("engine",),
+    )
+)
+registry.register(
+    Gauge("db_pool_size", "Configured pool_size.", lambda: _pool_status("size"), ("engine",))
+)
+
+
+def _operation(statement: str) -> str:
+    """
+    SQL文の先頭のキーワード(SELECT, INSERT等)を返す。
+    """
+
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def _instrument_pool(name: str, pool: Pool) -> None:
+    """
+    プールからの接続の取得にかかる時間を計測する。
+    """
+
+    connect = pool.connect
+
+    def timed_connect() -> PoolProxiedConnection:
+        start = time.perf_counter()
+
+        try:
+            return connect()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start, (name,))
+
+    pool.connect = timed_connect  # type: ignore[method-assign]
+
+
+def instrument_engine(name: str, engine: Engine) -> None:
+    """
+    engineにSQLの実行時間とコネクションプールの状態を記録するイベントを登録する。
+    非同期のエンジンはsync_engineを渡す。
+    """
+
+    if name in _engines:
+        return
+
+    _engines[name] = engine
+    _instrument_pool(name, engine.pool)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: ExecutionContext, executemany: bool
+    ) -> None:
+        context._query_started_at = time.perf_counter()  # type: ignore[attr-defined]
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: ExecutionContext, executemany: bool
+    ) -> None:
+        seconds = time.perf_counter() - context._query_started_at  # type: ignore[attr-defined]
+        query_duration.observe(seconds, (name, _operation(statement)))
+        stats = _query_stats.get()
+
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += seconds
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context: ExceptionContext) -> None:
+        query_errors.inc((name, _operation(context.statement or "")))
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        if isinstance(engine.pool, QueuePool) and engine.pool.overflow() > 0:
+            pool_overflow_checkouts.inc((name,))
+
+        stats = _query_stats.get()
+
+        if stats is not None:
+            stats.checkouts += 1
+
+    # dispose()でプールが作り直された場合は新しいプールを計測する
+    @event.listens_for(engine, "engine_disposed")
+    def engine_disposed(connection: Any) -> None:
+        _instrument_pool(name, engine.pool)
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import DDL, Index, Integer, String, DateTime, column, event, inspect, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
+from typing import NamedTuple
 
 from app.interfaces.gateways.db import Base
-from app.lib.security import encrypt_password_to_sha256
+from app.lib.security import hash_password
 
 
 class User(Base):  # type: ignore
@@ -11,12 +14,21 @@ class User(Base):  # type: ignore
     """
 
     __tablename__ = "users"
-    id = Column("id", Integer(), primary_key=True, autoincrement=True)
-    name = Column("name", String(256), nullable=False, unique=True, index=True)
-    password = Column("password", String(256), nullable=False)
-    email = Column("email", String(256), nullable=False, unique=True)
-    created_at = Column(DateTime, nullable=False)
-    updated_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        # PostgreSQLでは、nameとemailの部分一致・前方一致検索にpg_trgmのGINインデックスを用いる
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(
+            dialect="postgresql"
+        ),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}).ddl_if(
+            dialect="postgresql"
+        ),
+    )
+    id: Mapped[int] = mapped_column("id", Integer(), primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column("name", String(256), nullable=False, unique=True, index=True)
+    password: Mapped[str] = mapped_column("password", String(256), nullable=False)
+    email: Mapped[str] = mapped_column("email", String(256), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
     def __init__(
         self,
@@ -27,7 +39,77 @@ class User(Base):  # type: ignore
         updated_at: datetime,
     ):
         self.name = name
-        self.password = encrypt_password_to_sha256(password)
+        self.password = hash_password(password)
         self.email = email
         self.created_at = created_at
         self.updated_at = updated_at
+
+
+# SQLiteでは、nameとemailの部分一致検索にtrigramトークナイザのFTS5仮想テーブルを用いる。
+# usersを外部コンテンツとし、トリガーによりusersの変更に追従させる。
+users_fts = table("users_fts", column("rowid"))
+
+USERS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(name, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+]
+
+# DDLのコンストラクタには型注釈がないため、呼び出し箇所で型検査を除外する
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),  # type: ignore[no-untyped-call]
+)
+
+for statement in USERS_FTS_DDL:
+    event.listen(
+        User.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),  # type: ignore[no-untyped-call]
+    )
+
+event.listen(
+    User.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS users_fts").execute_if(dialect="sqlite"),  # type: ignore[no-untyped-call]
+)
+
+
+def create_users_fts(engine: Engine) -> None:
+    """
+    users_ftsの導入前に作成されたSQLiteのデータベースに、users_ftsとトリガーを作成し、既存の行を索引に追加する。
+    """
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        tables = inspect(connection).get_table_names()
+
+        if "users" not in tables or "users_fts" in tables:
+            return
+
+        for statement in USERS_FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+        connection.exec_driver_sql("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+class UserRow(NamedTuple):
+    """
+    usersテーブルの1行。ORMオブジェクトを生成せずに、Coreのselect()の結果から直接生成する。
+    取得する列を指定した場合、取得しなかった列はNoneとなる。
+    """
+
+    id: int
+    name: str
+    password: str
+    email: str
+    created_at: datetime
+    updated_at: datetime
@@ -1,11 +1,39 @@
 from abc import ABCMeta, abstractmethod
+from collections.abc import Iterator
 from datetime import datetime
 
 from app.interfaces.gateways import db
-from app.interfaces.gateways.schema import User
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_statements import (
+    bulk_insert_statement,
+    bulk_update_statement,
+    chunks,
+    delete_user_statement,
+    delete_users_statement,
+    hash_user_passwords,
+    new_user,
+    search_users_statement,
+    to_bulk_insert_row,
+    to_bulk_update_results,
+    to_bulk_update_row,
+    to_created_user_row,
+    to_deleted_user_row,
+    to_update_values,
+    to_updated_user_row,
+    to_user_row,
+    unique_user_indexes,
+    update_password_hash_statement,
+    update_user_statement,
+    user_by_id_statement,
+    user_by_name_statement,
+    user_exists_statement,
+    users_by_ids_statement,
+    users_export_statement,
+    users_page_statement,
+)
 from app.exceptions.exception import DuplicateError, NoContentError
 from app.core.logger import logger
-from app.lib.security import encrypt_password_to_sha256
+from app.lib.security import hash_password
 
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
@@ -16,237 +44,362 @@ class UserRepository(metaclass=ABCMeta):
     """
 
     @abstractmethod
-    def find_users(self) -> list[dict] | None:
+    def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
         """
-        find_users
+        find_users_page
         """
         pass
 
     @abstractmethod
-    def find_user_by_id(self, id: int) -> dict | None:
+    def iter_users(self, batch_size: int) -> Iterator[UserRow]:
+        """
+        iter_users
+        """
+        pass
+
+    @abstractmethod
+    def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
         """
         find_user_by_id
         """
         pass
 
-    def find_user_by_name(self, name: str) -> dict | None:
+    @abstractmethod
+    def find_user_by_name(self, name: str) -> UserRow:
         """
         find_user_by_name
         """
         pass
 
     @abstractmethod
-    def create_user(self, name: str, password: str, email: str) -> dict | None:
+    def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
+        """
+        search_users
+        """
+        pass
+
+    @abstractmethod
+    def create_user(self, name: str, password: str, email: str) -> UserRow:
         """
         create_user
         """
         pass
 
     @abstractmethod
-    def delete_user(self, id: int) -> dict | None:
+    def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+        pass
+
+    @abstractmethod
+    def delete_user(self, id: int) -> UserRow:
         """
         delete_user
         """
         pass
 
     @abstractmethod
-    def update_user(self, data_to_be_updated: dict) -> dict | None:
+    def delete_users(self, ids: list[int]) -> list[UserRow | None]:
+        """
+        delete_users
+        """
+        pass
+
+    @abstractmethod
+    def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
         """
         update_user
         """
         pass
 
+    @abstractmethod
+    def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
+        pass
+
+    @abstractmethod
+    def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
+        pass
+
 
 class UserRepositoryImpl(UserRepository):
     """
     UserRepositoryImpl
     """
 
-    def find_users(self) -> list[dict] | None:
+    def find_users_page(self, limit: int, after: int = 0, fields: list[str] | None = None) -> list[UserRow]:
         """
-        find_users
+        find_users_page
         """
 
-        user: User = None
-
         try:
-            user = db.session.query(User).all()
+            rows = db.session.execute(users_page_statement(limit, after, fields)).all()
         except SQLAlchemyError:
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
 
-        if not user:
-            raise NoContentError(("Users are not found."))
+        return [to_user_row(row, fields) for row in rows]
 
-        response = []
+    def iter_users(self, batch_size: int) -> Iterator[UserRow]:
+        """
+        iter_users
+        """
 
-        for u in user:
-            response.append(self.__convert_schema_obj_to_dict(u))
+        # 呼び出し元が全件を読み終えるまで接続を保持するため、専用のセッションを使う。
+        session = db.Session()
 
-        return response
+        try:
+            for row in session.execute(users_export_statement(batch_size)):
+                yield UserRow._make(row)
+        except SQLAlchemyError:
+            raise
+        finally:
+            session.close()
+            logger.debug("db connection closed.")
 
-    def find_user_by_id(self, id: int) -> dict | None:
+    def find_user_by_id(self, id: int, fields: list[str] | None = None) -> UserRow:
         """
         find_user_by_id
         """
 
         try:
-            user = db.session.query(User).filter(User.id == id).first()
+            row = db.session.execute(user_by_id_statement(id, fields)).first()
         except SQLAlchemyError:
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
 
-        if user is None:
+        if row is None:
             raise NoContentError(f"User not found: id={id}")
 
-        return self.__convert_schema_obj_to_dict(user)
+        return to_user_row(row, fields)
 
-    def find_user_by_name(self, name: str) -> dict | None:
+    def find_user_by_name(self, name: str) -> UserRow:
         """
         find_user_by_name
         """
 
         try:
-            user = db.session.query(User).filter(User.name == name).first()
+            row = db.session.execute(user_by_name_statement(name)).first()
         except SQLAlchemyError:
             raise
         finally:
             db.session.close()
 
-        if user is None:
+        if row is None:
             raise NoContentError(f"User not found: name={name}")
 
-        return self.__convert_schema_obj_to_dict(user)
+        return UserRow._make(row)
 
-    def create_user(self, name: str, password: str, email: str) -> dict | None:
+    def search_users(
+        self, conditions: dict, limit: int, after: int = 0, fields: list[str] | None = None
+    ) -> list[UserRow]:
         """
-        create_user
+        search_users
         """
 
-        now = datetime.now()
+        statement = search_users_statement(conditions, limit, after, fields, db.engine.dialect.name)
+
+        try:
+            rows = db.session.execute(statement).all()
+        except SQLAlchemyError:
+            raise
+        finally:
+            db.session.close()
+            logger.debug("db connection closed.")
 
-        user = User(
-            name=name,
-            password=password,
-            email=email,
-            created_at=now,
-            updated_at=now,
-        )
+        return [to_user_row(row, fields) for row in rows]
+
+    def create_user(self, name: str, password: str, email: str) -> UserRow:
+        """
+        create_user
+        """
+
+        user = new_user(name, password, email)
 
         try:
             db.session.add(user)
+            # flushでINSERT ... RETURNINGを発行し、採番されたidをコミット前に取得する
+            db.session.flush()
+            created_user = to_created_user_row(user)
             db.session.commit()
         except IntegrityError:
             db.session.rollback()
 
             raise DuplicateError(f"name: {name} or email: {email} is already exists.")
         except SQLAlchemyError:
+            db.session.rollback()
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
+
+        return created_user
+
+    def create_users(self, users: list[dict]) -> list[UserRow | None]:
+        """
+        create_users
+        """
+
+        now = datetime.now()
+        statement = bulk_insert_statement(db.engine.dialect.name)
+        indexes = unique_user_indexes(users)
+        # 登録対象のユーザのパスワードハッシュは、トランザクションの開始前に並列に計算しておく
+        hashed_users = dict(zip(indexes, hash_user_passwords([users[i] for i in indexes])))
+
+        # 登録できなかった(nameまたはemailが重複した)ユーザはNoneのまま返す
+        created_users: list[UserRow | None] = [None] * len(users)
 
         try:
-            created_user = db.session.query(User).filter(User.name == name).order_by(User.id.desc()).first()
+            for chunk in chunks(indexes):
+                rows = [to_bulk_insert_row(hashed_users[i], now) for i in chunk]
+                created = {row.name: UserRow._make(row) for row in db.session.execute(statement, rows)}
+
+                for i in chunk:
+                    created_users[i] = created.get(users[i]["name"])
+
+            db.session.commit()
         except SQLAlchemyError:
-            raise NoContentError
+            db.session.rollback()
+            raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
 
-        return self.__convert_schema_obj_to_dict(created_user)
+        return created_users
 
-    def delete_user(self, id: int) -> dict | None:
+    def delete_user(self, id: int) -> UserRow:
         """
         delete_user
         """
 
         try:
-            deleted_user = db.session.query(User).filter(User.id == id).first()
+            row = db.session.execute(delete_user_statement(id)).first()
+            db.session.commit()
         except SQLAlchemyError:
+            db.session.rollback()
             raise
         finally:
             db.session.close()
+            logger.debug("db connection closed.")
 
-        if deleted_user is None:
-            raise NoContentError
+        return to_deleted_user_row(row)
+
+    def update_user(
+        self, data_to_be_updated: dict, expected_updated_at: list[datetime] | None = None
+    ) -> UserRow:
+        """
+        update_user
+        """
+
+        id, values = to_update_values(data_to_be_updated)
+
+        # パスワード暗号化
+        if values.get("password") is not None:
+            values["password"] = hash_password(values["password"])
+
+        exists = True
 
         try:
-            db.session.query(User).filter(User.id == id).delete()
+            row = db.session.execute(update_user_statement(id, values, expected_updated_at)).first()
+
+            if row is None:
+                exists = db.session.scalar(user_exists_statement(id)) is not None
+
             db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise DuplicateError(e)
         except SQLAlchemyError:
             db.session.rollback()
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
 
-        return self.__convert_schema_obj_to_dict(deleted_user)
+        return to_updated_user_row(id, row, exists)
 
-    def update_user(self, data_to_be_updated: dict) -> dict | None:
+    def delete_users(self, ids: list[int]) -> list[UserRow | None]:
         """
-        update_user
+        delete_users
         """
 
-        # 事前に対象ユーザの存在確認
+        deleted: dict[int, UserRow] = {}
+
+        # chunkごとに削除し、全chunkを1トランザクションで削除する
         try:
-            user = db.session.query(User).filter(User.id == data_to_be_updated["id"]).first()
+            for chunk in chunks(ids):
+                result = db.session.execute(delete_users_statement(chunk))
+                deleted.update((row.id, UserRow._make(row)) for row in result)
+
+            db.session.commit()
         except SQLAlchemyError:
+            db.session.rollback()
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
 
-        if user is None:
-            raise NoContentError("status code will be 404")
+        # 存在しなかったユーザはNoneとして返す
+        return [deleted.get(id) for id in ids]
 
-        now = datetime.now()
-        data_to_be_updated["updated_at"] = now
+    def update_users(self, users: list[dict]) -> list[UserRow | DuplicateError | None]:
+        """
+        update_users
+        """
 
-        # パスワード暗号化
-        if data_to_be_updated.get("password") is not None:
-            data_to_be_updated["password"] = encrypt_password_to_sha256(data_to_be_updated["password"])
+        now = datetime.now()
+        statement = bulk_update_statement()
+        # パスワードハッシュは、トランザクションの開始前に並列に計算しておく
+        users = hash_user_passwords(users)
+        rows: dict[int, UserRow] = {}
 
-        # アップデート
+        # chunkごとに、executemanyによるUPDATEと、更新後のユーザを取得するSELECT ... WHERE id IN (...)を発行し、
+        # 全chunkを1トランザクションで更新する
         try:
-            db.session.query(User).filter(User.id == data_to_be_updated["id"]).update(data_to_be_updated)
+            for chunk in chunks(users):
+                db.session.execute(statement, [to_bulk_update_row(user, now) for user in chunk])
+                result = db.session.execute(users_by_ids_statement([user["id"] for user in chunk]))
+                rows.update((row.id, UserRow._make(row)) for row in result)
+
             db.session.commit()
         except IntegrityError as e:
+            # 他のトランザクションと並行して重複する値に更新した場合
             db.session.rollback()
             raise DuplicateError(e)
         except SQLAlchemyError:
+            db.session.rollback()
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
+            logger.debug("db connection closed.")
+
+        return to_bulk_update_results(users, rows, now)
+
+    def update_password_hash(self, id: int, password_hash: str, new_password_hash: str) -> None:
+        """
+        update_password_hash
+        """
 
         try:
-            updated_user = db.session.query(User).filter(User.id == data_to_be_updated["id"]).first()
+            db.session.execute(update_password_hash_statement(id, password_hash, new_password_hash))
+            db.session.commit()
         except SQLAlchemyError:
+            db.session.rollback()
             raise
         finally:
             db.session.close()
-            logger.info("db connection closed.")
-
-        if updated_user is None:
-            raise NoContentError("status code will be 204")
-
-        return self.__convert_schema_obj_to_dict(updated_user)
-
-    def __convert_schema_obj_to_dict(self, schema: User) -> dict:
-        """
-        行オブジェクトを辞書型に変換する。
-        """
-
-        return {
-            "id": schema.id,
-            "name": schema.name,
-            "password": schema.password,
-            "email": schema.email,
-            "created_at": schema.created_at,
-            "updated_at": schema.updated_at,
-        }
+            logger.debug("db connection closed.")
@@ -0,0 +1,388 @@
+from collections.abc import Iterator
+from datetime import datetime
+from typing import TypeVar
+
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Row,
+    Select,
+    String,
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert, ReturningDelete, Update
+
+from app.core.config import settings
+from app.exceptions.exception import DuplicateError, NoContentError, PreconditionFailedError
+from app.interfaces.gateways.schema import User, UserRow, users_fts
+from app.lib.security import hash_passwords
+
+# 同期版(UserRepositoryImpl)と非同期版(AsyncUserRepositoryImpl)で共通の、SQL文の組み立てと結果の変換。
+# リポジトリはここで組み立てた文をSession / AsyncSessionで実行するのみとし、実行方法のみが異なるようにする。
+
+T = TypeVar("T")
+
+
+def user_columns(fields: list[str] | None) -> list[Column]:
+    """
+    fieldsに指定された列を返す。fieldsがNoneの場合は全列を返す。
+    """
+
+    table = User.__table__
+
+    return list(table.c) if fields is None else [table.c[field] for field in fields]
+
+
+def to_user_row(row: Row, fields: list[str] | None) -> UserRow:
+    """
+    user_columns(fields)を選択した行をUserRowに変換する。取得しなかった列はNoneとする。
+    """
+
+    if fields is None:
+        return UserRow._make(row)
+
+    values = dict(zip(fields, row))
+
+    return UserRow._make(values.get(field) for field in UserRow._fields)
+
+
+def users_page_statement(limit: int, after: int, fields: list[str] | None) -> Select:
+    """
+    idをキーにしたキーセットページネーション。OFFSETを使わないため、
+    何ページ目であっても主キーインデックスの範囲スキャンのみで済む。
+    読み取りではORMオブジェクトを生成せず、Coreのselect()で取得した行をそのままUserRowにする。
+    """
+
+    return select(*user_columns(fields)).where(User.id > after).order_by(User.id).limit(limit)
+
+
+def users_export_statement(batch_size: int) -> Select:
+    """
+    yield_perによりサーバサイドカーソルからbatch_size件ずつ取得し、全件をメモリに載せない。
+    """
+
+    return select(*User.__table__.c).order_by(User.id).execution_options(yield_per=batch_size)
+
+
+def user_by_id_statement(id: int, fields: list[str] | None) -> Select:
+    """
+    user_by_id_statement
+    """
+
+    return select(*user_columns(fields)).where(User.id == id)
+
+
+def user_by_name_statement(name: str) -> Select:
+    """
+    user_by_name_statement
+    """
+
+    return select(*User.__table__.c).where(User.name == name)
+
+
+def search_users_statement(
+    conditions: dict, limit: int, after: int, fields: list[str] | None, dialect_name: str
+) -> Select:
+    """
+    一覧と同じくidをキーにしたキーセットページネーションとする。
+    """
+
+    return (
+        select(*user_columns(fields))
+        .where(User.id > after, *user_search_clauses(conditions, dialect_name))
+        .order_by(User.id)
+        .limit(limit)
+    )
+
+
+def user_search_clauses(conditions: dict, dialect_name: str) -> list[ColumnElement[bool]]:
+    """
+    ユーザの検索条件を、インデックスを利用できるWHERE句の条件に変換する。
+    name: 前方一致、email: 完全一致、created_from/created_to: 登録日時の範囲(created_toは含まない)、
+    q: nameまたはemailの部分一致(大文字・小文字を区別しない)
+    """
+
+    clauses: list[ColumnElement[bool]] = []
+
+    if conditions.get("name") is not None:
+        name = conditions["name"]
+
+        if dialect_name == "sqlite":
+            # SQLiteのLIKEは大文字・小文字を区別せずnameのインデックスを使えないため、範囲条件とする
+            clauses += [User.name >= name, User.name < name + "\U0010ffff"]
+        else:
+            clauses.append(User.name.startswith(name, autoescape=True))
+
+    if conditions.get("email") is not None:
+        clauses.append(User.email == conditions["email"])
+
+    if conditions.get("created_from") is not None:
+        clauses.append(User.created_at >= conditions["created_from"])
+
+    if conditions.get("created_to") is not None:
+        clauses.append(User.created_at < conditions["created_to"])
+
+    if conditions.get("q") is not None:
+        q = conditions["q"]
+
+        # trigramトークナイザは3文字未満の語を検索できないため、短い語はLIKEで検索する
+        if dialect_name == "sqlite" and len(q) >= 3:
+            phrase = '"' + q.replace('"', '""') + '"'
+            clauses.append(User.id.in_(select(users_fts.c.rowid).where(literal_column("users_fts").match(phrase))))
+        else:
+            clauses.append(or_(User.name.icontains(q, autoescape=True), User.email.icontains(q, autoescape=True)))
+
+    return clauses
+
+
+def new_user(name: str, password: str, email: str) -> User:
+    """
+    登録するユーザのORMオブジェクト。生成時にパスワードのハッシュを計算する。
+    """
+
+    now = datetime.now()
+
+    return User(name=name, password=password, email=email, created_at=now, updated_at=now)
+
+
+def to_created_user_row(user: User) -> UserRow:
+    """
+    ORMオブジェクトをUserRowに変換する。
+    """
+
+    return UserRow(
+        id=user.id,
+        name=user.name,
+        password=user.password,
+        email=user.email,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+
+
+def delete_user_statement(id: int) -> ReturningDelete:
+    """
+    DELETE ... RETURNINGにより、削除と削除したユーザの取得を1文で行う。
+    """
+
+    return delete(User).where(User.id == id).returning(*User.__table__.c)
+
+
+def to_deleted_user_row(row: Row | None) -> UserRow:
+    """
+    to_deleted_user_row
+    """
+
+    if row is None:
+        raise NoContentError
+
+    return UserRow._make(row)
+
+
+def to_update_values(data_to_be_updated: dict) -> tuple[int, dict]:
+    """
+    更新するユーザのidと、更新する列の値を返す。パスワードは呼び出し元でハッシュに置き換える。
+    """
+
+    id = data_to_be_updated["id"]
+    values = {k: v for k, v in data_to_be_updated.items() if k != "id"}
+    values["updated_at"] = datetime.now()
+
+    return id, values
+
+
+def update_user_statement(id: int, values: dict, expected_updated_at: list[datetime] | None) -> Update:
+    """
+    expected_updated_atが指定された場合は、その時点から更新されていない場合のみ更新する。
+    UPDATE ... RETURNINGにより、条件判定・更新・更新後のユーザの取得を1文で行う。
+    """
+
+    statement = update(User).where(User.id == id)
+
+    if expected_updated_at is not None:
+        statement = statement.where(User.updated_at.in_(expected_updated_at))
+
+    return statement.values(values).returning(*User.__table__.c)
+
+
+def user_exists_statement(id: int) -> Select:
+    """
+    更新できなかった場合のみ、存在しないのか条件に一致しなかったのかを確認する。
+    """
+
+    return select(User.id).where(User.id == id)
+
+
+def to_updated_user_row(id: int, row: Row | None, exists: bool) -> UserRow:
+    """
+    to_updated_user_row
+    """
+
+    if row is None and not exists:
+        raise NoContentError(f"User not found: id={id}")
+
+    if row is None:
+        raise PreconditionFailedError(f"User has been modified: id={id}")
+
+    return UserRow._make(row)
+
+
+def chunks(items: list[T]) -> Iterator[list[T]]:
+    """
+    一括処理の対象をUSERS_BULK_CHUNK_SIZE件ずつに分ける。
+    """
+
+    for start in range(0, len(items), settings.USERS_BULK_CHUNK_SIZE):
+        yield items[start : start + settings.USERS_BULK_CHUNK_SIZE]
+
+
+def bulk_insert_statement(dialect_name: str) -> Insert:
+    """
+    nameまたはemailが重複する行を無視して登録し、登録できた行を返すINSERT文。
+    複数行を渡して実行すると、chunkごとに1つの複数行INSERTにまとめられる。
+    """
+
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+    return insert(User).on_conflict_do_nothing().returning(*User.__table__.c)
+
+
+def unique_user_indexes(users: list[dict]) -> list[int]:
+    """
+    バッチ内でnameとemailが初出のユーザのインデックスを返す。
+    """
+
+    names: set[str] = set()
+    emails: set[str] = set()
+    indexes = []
+
+    for i, user in enumerate(users):
+        if user["name"] in names or user["email"] in emails:
+            continue
+
+        names.add(user["name"])
+        emails.add(user["email"])
+        indexes.append(i)
+
+    return indexes
+
+
+def to_bulk_insert_row(user: dict, now: datetime) -> dict:
+    """
+    to_bulk_insert_row
+    """
+
+    return {
+        "name": user["name"],
+        "password": user["password"],
+        "email": user["email"],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def delete_users_statement(ids: list[int]) -> ReturningDelete:
+    """
+    DELETE ... WHERE id IN (...) RETURNINGにより、chunk内のユーザを1文で削除する。
+    """
+
+    return delete(User).where(User.id.in_(ids)).returning(*User.__table__.c)
+
+
+def bulk_update_statement() -> Update:
+    """
+    idを指定してユーザを更新するUPDATE文。行のリストを渡してexecutemanyで実行する。
+    値がNoneの列は更新しない。nameまたはemailが他のユーザと重複する行は、一意制約違反とせずに更新しない。
+    """
+
+    table = User.__table__
+    other = table.alias("other")
+    name = bindparam("b_name", type_=String)
+    email = bindparam("b_email", type_=String)
+
+    # 1件の重複でバッチ全体が失敗しないよう、重複する行はUPDATEの条件で除外し、ユーザごとに結果を返す
+    duplicated = exists().where(other.c.id != table.c.id, or_(other.c.name == name, other.c.email == email))
+
+    return (
+        update(table)
+        .where(table.c.id == bindparam("b_id"), ~duplicated)
+        .values(
+            name=func.coalesce(name, table.c.name),
+            password=func.coalesce(bindparam("b_password"), table.c.password),
+            email=func.coalesce(email, table.c.email),
+            updated_at=bindparam("b_updated_at"),
+        )
+    )
+
+
+def to_bulk_update_row(user: dict, now: datetime) -> dict:
+    """
+    to_bulk_update_row
+    """
+
+    return {
+        "b_id": user["id"],
+        "b_name": user.get("name"),
+        "b_password": user.get("password"),
+        "b_email": user.get("email"),
+        "b_updated_at": now,
+    }
+
+
+def users_by_ids_statement(ids: list[int]) -> Select:
+    """
+    一括更新したchunk内のユーザを、更新後の値で取得する。
+    """
+
+    return select(*User.__table__.c).where(User.id.in_(ids))
+
+
+def to_bulk_update_results(
+    users: list[dict], rows: dict[int, UserRow], now: datetime
+) -> list[UserRow | DuplicateError | None]:
+    """
+    更新後のユーザを返す。存在しなかったユーザはNone、重複により更新しなかったユーザはDuplicateErrorとする。
+    """
+
+    results: list[UserRow | DuplicateError | None] = []
+
+    for user in users:
+        row = rows.get(user["id"])
+
+        if row is not None and row.updated_at != now:
+            results.append(DuplicateError(f"name: {user.get('name')} or email: {user.get('email')} is already exists."))
+        else:
+            results.append(row)
+
+    return results
+
+
+def hash_user_passwords(users: list[dict]) -> list[dict]:
+    """
+    パスワードをハッシュに置き換えたユーザのリストを返す。ハッシュはプロセスプール上で並列に計算する。
+    """
+
+    indexes = [i for i, user in enumerate(users) if user.get("password") is not None]
+    hashed_users = [dict(user) for user in users]
+
+    for i, password in zip(indexes, hash_passwords([users[i]["password"] for i in indexes])):
+        hashed_users[i]["password"] = password
+
+    return hashed_users
+
+
+def update_password_hash_statement(id: int, password_hash: str, new_password_hash: str) -> Update:
+    """
+    パスワード自体は変わらないため、updated_atは更新しない。
+    並行してパスワードが変更されていた場合に上書きしないよう、ハッシュが変わっていない場合のみ更新する。
+    """
+
+    return update(User).where(User.id == id, User.password == password_hash).values(password=new_password_hash)
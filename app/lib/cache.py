@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+# 無効化の回数を数えるスロット数
+GENERATION_SLOTS = 1024
+
+
+class LRUCache:
+    """
+    TTL付きのLRUキャッシュ。複数スレッドから安全に利用できる。
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        # key -> (有効期限, 値)。末尾ほど最近参照されたエントリ
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # キーごとの無効化(pop, clear)の回数。読み取り中に無効化されたかの判定に使う。
+        # キーのハッシュでスロットを共有するため、別のキーの無効化でもキャッシュしないことがある
+        self.__generations = [0] * GENERATION_SLOTS
+        self.__lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        get
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None or entry[0] <= self.timer():
+                if entry is not None:
+                    del self.__entries[key]
+                self.misses += 1
+                return default
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def generation(self, key: Hashable) -> int:
+        """
+        keyの無効化の回数を返す。読み取りの前に取得し、setに渡す。
+        """
+
+        return self.__generations[hash(key) % GENERATION_SLOTS]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None) -> None:
+        """
+        generationを指定した場合、その後にkeyが無効化されていればキャッシュしない。
+        """
+
+        # maxsizeが0以下の場合はキャッシュしない
+        if self.maxsize <= 0:
+            return
+
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+
+        with self.__lock:
+            # 読み取り中に更新・削除された場合、読み取った値は古い可能性がある
+            if generation is not None and self.__generations[hash(key) % GENERATION_SLOTS] != generation:
+                return
+
+            self.__entries[key] = (expires_at, value)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """
+        pop
+        """
+
+        with self.__lock:
+            self.__entries.pop(key, None)
+            self.__generations[hash(key) % GENERATION_SLOTS] += 1
+
+    def clear(self) -> None:
+        """
+        clear
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__generations = [generation + 1 for generation in self.__generations]
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class TTLStore:
+    """
+    有効期限付きのストア。LRUCacheと異なり有効期限前のエントリは追い出さず、
+    maxsizeに達している場合は追加に失敗する。複数スレッドから安全に利用できる。
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        # key -> (有効期限, 値)。全エントリのttlが同じため、先頭ほど早く期限切れになる
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        get
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None or entry[0] <= self.timer():
+                return default
+
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> bool:
+        """
+        追加できなかった場合はFalseを返す。
+        """
+
+        now = self.timer()
+
+        with self.__lock:
+            while self.__entries:
+                oldest = next(iter(self.__entries))
+
+                if self.__entries[oldest][0] > now:
+                    break
+
+                del self.__entries[oldest]
+
+            if key not in self.__entries and len(self.__entries) >= self.maxsize:
+                return False
+
+            self.__entries[key] = (now + self.ttl, value)
+            self.__entries.move_to_end(key)
+
+            return True
+
+    def clear(self) -> None:
+        """
+        clear
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,27 @@
+import base64
+import binascii
+
+
+def encode_cursor(id: int) -> str:
+    """
+    encode_cursor
+    """
+
+    return base64.urlsafe_b64encode(f"id:{id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    decode_cursor
+    """
+
+    # encode時に除去したパディングを復元する
+    padded = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        prefix, _, id = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime
+
+# ETagに含めるupdated_atの書式。マイクロ秒まで含め、DBの値を欠損なく復元できるようにする
+UPDATED_AT_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+def make_etag(id: int, updated_at: datetime, fields: list[str] | None = None) -> str:
+    """
+    fieldsで一部の列のみを返す場合は、レスポンスの内容が全体と異なるため、列の組み合わせをETagに含める。
+    列の組み合わせを含むETagはIf-Matchでは一致しないため、更新時は全体を取得したETagを使う。
+    """
+
+    etag = f"{id}-{updated_at.strftime(UPDATED_AT_FORMAT)}"
+
+    if fields is not None:
+        # 列の指定順によらずレスポンスの内容は同じになるため、並べ替えてから含める
+        projection = ",".join(sorted(set(fields)))
+        etag += "-" + hashlib.sha256(projection.encode()).hexdigest()[:16]
+
+    return f'"{etag}"'
+
+
+def parse_etags(header: str) -> list[tuple[int, datetime]]:
+    """
+    If-Match等のヘッダに列挙されたETagを(id, updated_at)に変換する。
+    弱いETagや本APIが発行していないETagは一致し得ないため無視する。
+    """
+
+    etags = []
+
+    for etag in header.split(","):
+        etag = etag.strip()
+
+        if len(etag) < 2 or not etag.startswith('"') or not etag.endswith('"'):
+            continue
+
+        id, _, updated_at = etag[1:-1].partition("-")
+
+        try:
+            etags.append((int(id), datetime.strptime(updated_at, UPDATED_AT_FORMAT)))
+        except ValueError:
+            continue
+
+    return etags
+
+
+def expected_updated_at(id: int, if_match: str | None) -> list[datetime] | None:
+    """
+    If-Matchヘッダから、更新を許可するupdated_atの一覧を得る。
+    条件なしで更新してよい場合(ヘッダなし・"*")はNoneを返す。
+    """
+
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    return [updated_at for etag_id, updated_at in parse_etags(if_match) if etag_id == id]
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """
+    If-None-Matchヘッダに列挙されたETagのいずれかがetagと一致する場合にTrueを返す。
+    If-None-Matchは弱い比較を行うため、W/の有無は区別しない。
+    """
+
+    if if_none_match is None:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -1,7 +1,27 @@
+import hashlib
+import time
+
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.lib.cache import LRUCache, TTLStore
+
+# 検証済みトークンのダイジェスト -> クレーム。各エントリはトークンのexpで失効する。
+verified_token_cache = LRUCache(settings.JWT_CACHE_MAXSIZE, settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# ユーザid -> 有効なトークンの最小バージョン。
+# 失効前に発行されたトークンも有効期限を過ぎれば無効になるため、トークンの有効期間だけ保持すればよい。
+# 失効情報を追い出すと失効したトークンが再び有効になるため、有効期限前のエントリは追い出さない。
+revoked_token_versions = TTLStore(settings.JWT_REVOCATION_MAXSIZE, settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# 失効情報を保持しきれなかった場合、その失効情報が不要になる時刻(time.monotonic)。
+# それまではトークンのクレームのみによる認証を行わない
+revocation_overflow_until = 0.0
+
+# ユーザid -> DBで確認した最新のトークンバージョン。
+# 失効情報はプロセスごとに保持されるため、他のプロセスで失効したトークンもこの期間が過ぎればDBで検証して拒否する
+confirmed_token_versions = LRUCache(settings.JWT_CACHE_MAXSIZE, settings.JWT_CLAIMS_ONLY_RECHECK_SECONDS)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -21,15 +41,93 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
-def get_id_from_token(token: str) -> str:
+def get_claims_from_token(token: str) -> dict:
     """
-    get_id_from_token
+    get_claims_from_token
     """
 
+    # 署名を含むトークン全体のダイジェストをキーにするため、改ざんされたトークンがヒットすることはない
+    key = hashlib.sha256(token.encode()).digest()
+
+    cached_claims: dict | None = verified_token_cache.get(key)
+
+    if cached_claims is not None:
+        return cached_claims
+
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        id: str = payload.get("sub")
+        claims: dict = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         raise
 
+    exp = claims.get("exp")
+
+    if exp is not None:
+        verified_token_cache.set(key, claims, ttl=exp - time.time())
+
+    return claims
+
+
+def get_id_from_token(token: str) -> str:
+    """
+    get_id_from_token
+    """
+
+    id: str = get_claims_from_token(token).get("sub")  # type: ignore
+
     return id
+
+
+def token_version(updated_at: datetime) -> float:
+    """
+    ユーザの最終更新日時をトークンバージョンとする。
+    """
+
+    return updated_at.timestamp()
+
+
+def revoke_tokens(id: int, version: float | None = None) -> None:
+    """
+    ユーザのトークンのうち、versionより前のバージョンのものを失効させる。
+    versionを省略した場合(ユーザの削除時)は、現時点までに発行されたトークンを失効させる。
+    削除されたユーザのidが再利用された場合に、新たなユーザのトークンまで失効させないよう、無期限にはしない。
+    """
+
+    global revocation_overflow_until
+
+    if version is None:
+        version = token_version(datetime.now())
+
+    if not revoked_token_versions.set(id, version):
+        revocation_overflow_until = time.monotonic() + revoked_token_versions.ttl
+
+
+def is_token_revoked(id: int, version: float) -> bool:
+    """
+    is_token_revoked
+    """
+
+    min_version: float | None = revoked_token_versions.get(id)
+
+    return min_version is not None and version < min_version
+
+
+def confirm_token_version(id: int, version: float) -> None:
+    """
+    DBで確認したユーザの最新のトークンバージョンを記録する。
+    """
+
+    confirmed_token_versions.set(id, version)
+
+
+def is_token_confirmed(id: int, version: float) -> bool:
+    """
+    DBを参照せず、トークンのクレームのみで認証してよいかを返す。
+    """
+
+    # 失効情報を保持しきれていない間は、失効したトークンを判別できない
+    if time.monotonic() < revocation_overflow_until:
+        return False
+
+    confirmed_version: float | None = confirmed_token_versions.get(id)
+
+    return confirmed_version is not None and version >= confirmed_version
@@ -0,0 +1,278 @@
+import threading
+import weakref
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+# Prometheusのテキスト形式のContent-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 既定のヒストグラムのバケット(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+
+class _Shard:
+    """
+    スレッドローカルに保持する値の入れ物。スレッドの終了とともに破棄される。
+    """
+
+    __slots__ = ("values", "__weakref__")
+
+    def __init__(self, values: dict) -> None:
+        self.values = values
+
+
+class _Shards:
+    """
+    スレッドごとの値を保持する。記録時はロックを取らずに自スレッドの値のみを更新し、
+    読み取り時に全スレッドの値を合算する。終了したスレッドの値はmergeでbaseに合算する。
+    """
+
+    def __init__(self, merge: Callable[[dict, dict], None]) -> None:
+        self.local = threading.local()
+        self.merge = merge
+        self.base: dict = {}
+        self.shards: list[dict] = []
+        self.lock = threading.Lock()
+
+    def get(self) -> dict:
+        """
+        get
+        """
+
+        shard: _Shard | None = getattr(self.local, "shard", None)
+
+        if shard is not None:
+            return shard.values
+
+        # スレッドごとに初回のみロックを取り、値を登録する。
+        # スレッドの終了時にthreading.localが破棄されると、値をbaseに移して登録を外す
+        values: dict = {}
+        shard = _Shard(values)
+
+        with self.lock:
+            self.shards.append(values)
+
+        weakref.finalize(shard, self.__release, values)
+        self.local.shard = shard
+
+        return values
+
+    def __release(self, values: dict) -> None:
+        """
+        __release
+        """
+
+        with self.lock:
+            self.shards = [shard for shard in self.shards if shard is not values]
+            self.merge(self.base, values)
+
+    def snapshot(self) -> list[dict]:
+        """
+        snapshot
+        """
+
+        with self.lock:
+            return [self.base.copy(), *(shard.copy() for shard in self.shards)]
+
+
+class Counter:
+    """
+    Counter
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.__shards = _Shards(_merge_counter)
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        """
+        inc
+        """
+
+        values = self.__shards.get()
+        values[labels] = values.get(labels, 0) + amount
+
+    def collect(self) -> Iterable[tuple[str, Labels, float]]:
+        """
+        collect
+        """
+
+        totals: dict[Labels, float] = {}
+
+        for shard in self.__shards.snapshot():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+
+        for labels, value in totals.items():
+            yield self.name, labels, value
+
+
+class Histogram:
+    """
+    Histogram
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Labels = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.__shards = _Shards(_merge_histogram)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        """
+        observe
+        """
+
+        values = self.__shards.get()
+        # バケットごとの件数(末尾は+Inf)と合計値
+        counts = values.get(labels)
+
+        if counts is None:
+            counts = values[labels] = [0] * (len(self.buckets) + 2)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self) -> Iterable[tuple[str, Labels, float]]:
+        """
+        collect
+        """
+
+        totals: dict[Labels, list[float]] = {}
+
+        for shard in self.__shards.snapshot():
+            for labels, counts in shard.items():
+                total = totals.setdefault(labels, [0] * len(counts))
+
+                for i, count in enumerate(list(counts)):
+                    total[i] += count
+
+        for labels, total in totals.items():
+            cumulative = 0.0
+
+            for bound, count in zip((*self.buckets, float("inf")), total):
+                cumulative += count
+                yield f"{self.name}_bucket", (*labels, _format_value(bound)), cumulative
+
+            yield f"{self.name}_sum", labels, total[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Gauge:
+    """
+    読み取り時にfuncを呼び出して値を求めるゲージ。funcは(ラベル, 値)を返す。
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self, name: str, help: str, func: Callable[[], Iterable[tuple[Labels, float]]], labelnames: Labels = ()
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.func = func
+
+    def collect(self) -> Iterable[tuple[str, Labels, float]]:
+        """
+        collect
+        """
+
+        for labels, value in self.func():
+            yield self.name, labels, value
+
+
+Metric = Counter | Histogram | Gauge
+M = TypeVar("M", Counter, Histogram, Gauge)
+
+
+class Registry:
+    """
+    Registry
+    """
+
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: M) -> M:
+        """
+        register
+        """
+
+        self.metrics.append(metric)
+
+        return metric
+
+    def render(self) -> str:
+        """
+        登録されたメトリクスをPrometheusのテキスト形式で出力する。
+        """
+
+        lines = []
+
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            labelnames = metric.labelnames
+
+            for name, labels, value in metric.collect():
+                # ヒストグラムのバケットはラベルの末尾にleを持つ
+                names = (*labelnames, "le") if len(labels) > len(labelnames) else labelnames
+                label = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(names, labels))
+                lines.append(f"{name}{{{label}}} {_format_value(value)}" if label else f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _merge_counter(base: dict, values: dict) -> None:
+    """
+    _merge_counter
+    """
+
+    for labels, value in values.items():
+        base[labels] = base.get(labels, 0) + value
+
+
+def _merge_histogram(base: dict, values: dict) -> None:
+    """
+    _merge_histogram
+    """
+
+    # 読み取り中のスナップショットと共有しないよう、baseのリストは置き換える
+    for labels, counts in values.items():
+        total = base.get(labels)
+        base[labels] = list(counts) if total is None else [a + b for a, b in zip(total, counts)]
+
+
+def _escape(value: str) -> str:
+    """
+    _escape
+    """
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """
+    _format_value
+    """
+
+    if value == float("inf"):
+        return "+Inf"
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
@@ -0,0 +1,178 @@
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime
+from types import FrameType
+
+# プロファイリング中のリクエストのSampler。リクエストのタスクで設定すると、
+# そこから生成されたタスクや、スレッドプールで実行される処理にもコンテキストのコピーとして引き継がれる
+profiled_sampler: ContextVar["Sampler | None"] = ContextVar("profiled_sampler", default=None)
+
+
+class Sampler:
+    """
+    一定間隔で対象スレッドのスタックを採取するサンプリングプロファイラ。
+    同期のエンドポイントはスレッドプールで実行されるため、呼び出し元のスレッドのみを計測するcProfileではなく、
+    イベントループのスレッドとワーカスレッドのスタックを採取する。
+    並行して処理されている他のリクエストのスタックが混ざらないよう、実行中のコンテキストで
+    profiled_samplerにこのSamplerが設定されているスレッドのみを対象とする。
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, name="profiling sampler", daemon=True)
+
+    def start(self) -> None:
+        """
+        start
+        """
+
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        stop
+        """
+
+        self.__stopped.set()
+        self.__thread.join()
+
+    def __run(self) -> None:
+        """
+        __run
+        """
+
+        while not self.__stopped.wait(self.interval):
+            for frame in sys._current_frames().values():
+                context = _running_context(frame)
+
+                if context is None or context.get(profiled_sampler) is not self:
+                    continue
+
+                stack = _collapse(frame)
+
+                if stack:
+                    self.stacks[stack] += 1
+
+    def collapsed(self) -> str:
+        """
+        flamegraph.pl等で読み込めるcollapsed stack形式で返す。
+        """
+
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _running_context(frame: FrameType) -> Context | None:
+    """
+    スレッドで実行中の処理のコンテキストを返す。イベントループのコールバック(Handle._run)と
+    anyioのワーカスレッド(WorkerThread.run)は、処理をContext.runで実行するため、その呼び出し元のフレームから求める。
+    """
+
+    current: FrameType | None = frame
+
+    while current is not None:
+        qualname = current.f_code.co_qualname
+
+        if qualname == "Handle._run":
+            context = getattr(current.f_locals.get("self"), "_context", None)
+            return context if isinstance(context, Context) else None
+
+        if qualname == "WorkerThread.run":
+            context = current.f_locals.get("context")
+            return context if isinstance(context, Context) else None
+
+        current = current.f_back
+
+    return None
+
+
+def _collapse(frame: FrameType) -> str:
+    """
+    呼び出し元から順に関数名を";"で連結する。待機中のワーカスレッドのスタックは空文字を返す。
+    """
+
+    names = []
+    current: FrameType | None = frame
+
+    while current is not None:
+        code = current.f_code
+        names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        current = current.f_back
+
+    names.reverse()
+
+    # ワーカスレッドがキューで次の処理を待っている場合
+    for i, name in enumerate(names[:-1]):
+        if name.startswith("WorkerThread.run ") and names[i + 1].startswith("Queue.get "):
+            return ""
+
+    return ";".join(names)
+
+
+def sign(secret: str, method: str, path: str, timestamp: int) -> str:
+    """
+    X-Profile-Signatureヘッダに指定する署名を返す。timestampはX-Profile-Timestampヘッダに指定するUNIX時刻(秒)。
+    """
+
+    return hmac.new(secret.encode(), f"{method} {path} {timestamp}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify_signature(
+    secret: str, method: str, path: str, timestamp: str | None, signature: str | None, max_age: float
+) -> bool:
+    """
+    署名を検証する。署名の再利用を防ぐため、timestampが現在時刻からmax_age秒を超えてずれている場合は受け付けない。
+    """
+
+    if not secret or not signature or timestamp is None:
+        return False
+
+    try:
+        issued_at = int(timestamp)
+    except ValueError:
+        return False
+
+    if abs(time.time() - issued_at) > max_age:
+        return False
+
+    return hmac.compare_digest(sign(secret, method, path, issued_at), signature)
+
+
+def list_profiles(directory: str) -> list[dict]:
+    """
+    保存されたプロファイリング結果を新しい順に返す。
+    """
+
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".collapsed"):
+                stat = entry.stat()
+                modified_at = datetime.fromtimestamp(stat.st_mtime)
+                profiles.append({"name": entry.name, "size": stat.st_size, "modified_at": modified_at})
+
+    return sorted(profiles, key=lambda p: p["modified_at"], reverse=True)
+
+
+def prune_profiles(directory: str, max_files: int) -> None:
+    """
+    保存されたプロファイリング結果のうち、新しいものからmax_files件を残して削除する。
+    """
+
+    for profile in list_profiles(directory)[max_files:]:
+        try:
+            os.remove(os.path.join(directory, profile["name"]))
+        except FileNotFoundError:
+            # 並行して保存したリクエストにより削除済みの場合
+            pass
@@ -1,4 +1,287 @@
+import asyncio
+import base64
 import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+try:
+    import argon2
+except ImportError:  # argon2-cffiはオプション依存
+    argon2 = None  # type: ignore
+
+
+class PasswordHasher(metaclass=ABCMeta):
+    """
+    PasswordHasher
+    """
+
+    # ハッシュの先頭に付与する方式名。"$<scheme>$..."の形式で保存する
+    scheme: str
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        """
+        hash
+        """
+        pass
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        verify
+        """
+        pass
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        needs_rehash
+        """
+
+        return False
+
+
+class Sha256Hasher(PasswordHasher):
+    """
+    方式名を持たない、ソルトなしのSHA-256によるハッシュ。
+    過去に保存されたハッシュの検証にのみ使う。
+    """
+
+    scheme = "sha256"
+
+    def hash(self, password: str) -> str:
+        """
+        hash
+        """
+
+        return encrypt_password_to_sha256(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        verify
+        """
+
+        return hmac.compare_digest(encrypt_password_to_sha256(password), hashed_password)
+
+
+class ScryptHasher(PasswordHasher):
+    """
+    ScryptHasher
+    """
+
+    scheme = "scrypt"
+
+    # 1回の計算に約16MiBのメモリを要するパラメータ
+    n = 2**14
+    r = 8
+    p = 1
+    salt_size = 16
+    key_size = 32
+
+    def hash(self, password: str) -> str:
+        """
+        hash
+        """
+
+        salt = os.urandom(self.salt_size)
+        key = self.__scrypt(password, salt, self.n, self.r, self.p, self.key_size)
+
+        return f"${self.scheme}$n={self.n},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        verify
+        """
+
+        n, r, p, salt, key = self.__parse(hashed_password)
+
+        return hmac.compare_digest(self.__scrypt(password, salt, n, r, p, len(key)), key)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        needs_rehash
+        """
+
+        n, r, p, _, _ = self.__parse(hashed_password)
+
+        return (n, r, p) != (self.n, self.r, self.p)
+
+    def __scrypt(self, password: str, salt: bytes, n: int, r: int, p: int, key_size: int) -> bytes:
+        """
+        __scrypt
+        """
+
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * r * n, dklen=key_size)
+
+    def __parse(self, hashed_password: str) -> tuple[int, int, int, bytes, bytes]:
+        """
+        __parse
+        """
+
+        _, _, params, salt, key = hashed_password.split("$")
+        values = dict(param.split("=") for param in params.split(","))
+
+        return int(values["n"]), int(values["r"]), int(values["p"]), _b64decode(salt), _b64decode(key)
+
+
+class Argon2Hasher(PasswordHasher):
+    """
+    Argon2Hasher
+    """
+
+    # argon2-cffiが出力するハッシュは"$argon2id$..."の形式で、方式名を含む
+    scheme = "argon2id"
+
+    def __init__(self) -> None:
+        if argon2 is None:
+            raise RuntimeError("argon2-cffi is required to use argon2: pip install argon2-cffi")
+
+        self.hasher = argon2.PasswordHasher()
+
+    def hash(self, password: str) -> str:
+        """
+        hash
+        """
+
+        return self.hasher.hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        verify
+        """
+
+        try:
+            return self.hasher.verify(hashed_password, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        needs_rehash
+        """
+
+        return self.hasher.check_needs_rehash(hashed_password)
+
+
+# PASSWORD_HASH_SCHEMEに指定できる方式
+HASHERS: dict[str, type[PasswordHasher]] = {
+    "scrypt": ScryptHasher,
+    "argon2": Argon2Hasher,
+}
+
+# 保存されたハッシュの方式名とハッシャの対応
+_SCHEMES: dict[str, type[PasswordHasher]] = {h.scheme: h for h in (Sha256Hasher, ScryptHasher, Argon2Hasher)}
+
+_hashers: dict[str, PasswordHasher] = {}
+
+# 方式名 -> 存在しないユーザのログイン時に検証に使うハッシュ
+_dummy_password_hashes: dict[str, str] = {}
+
+
+def get_hasher(hashed_password: str | None = None, scheme: str | None = None) -> PasswordHasher:
+    """
+    ハッシュの方式名に対応するハッシャを返す。
+    hashed_passwordを省略した場合は、新たなハッシュの計算に使うハッシャ(PASSWORD_HASH_SCHEME)を返す。
+    """
+
+    hasher_class: type[PasswordHasher] | None
+
+    if hashed_password is None:
+        hasher_class = HASHERS[scheme or settings.PASSWORD_HASH_SCHEME]
+    elif not hashed_password.startswith("$"):
+        hasher_class = Sha256Hasher
+    else:
+        scheme = hashed_password.split("$")[1]
+        hasher_class = _SCHEMES.get(scheme)
+
+        if hasher_class is None:
+            raise ValueError(f"Unknown password hash scheme: {scheme}")
+
+    if hasher_class.scheme not in _hashers:
+        _hashers[hasher_class.scheme] = hasher_class()
+
+    return _hashers[hasher_class.scheme]
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    ハッシュが現在の方式・パラメータで計算されたものでない場合はTrueを返す。
+    """
+
+    hasher = get_hasher(hashed_password)
+
+    return hasher is not get_hasher() or hasher.needs_rehash(hashed_password)
+
+
+def dummy_password_hash() -> str:
+    """
+    存在しないユーザのログイン時に、存在するユーザと同じ時間をかけて検証するためのハッシュを返す。
+    現在の方式・パラメータで一度だけ計算する。
+    """
+
+    scheme = settings.PASSWORD_HASH_SCHEME
+
+    if scheme not in _dummy_password_hashes:
+        _dummy_password_hashes[scheme] = _hash_password(os.urandom(16).hex(), scheme)
+
+    return _dummy_password_hashes[scheme]
+
+
+def hash_password(password: str) -> str:
+    """
+    hash_password
+    """
+
+    return _call(_hash_password, password, settings.PASSWORD_HASH_SCHEME)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    hash_passwords
+    """
+
+    executor = _get_executor()
+
+    if executor is None:
+        return [_hash_password(password, settings.PASSWORD_HASH_SCHEME) for password in passwords]
+
+    return list(
+        executor.map(
+            _hash_password, passwords, repeat(settings.PASSWORD_HASH_SCHEME), chunksize=_chunksize(passwords)
+        )
+    )
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """
+    verify_password
+    """
+
+    return _call(_verify_password, password, hashed_password)
+
+
+async def async_hash_password(password: str) -> str:
+    """
+    async_hash_password
+    """
+
+    return await _async_call(_hash_password, password, settings.PASSWORD_HASH_SCHEME)
+
+
+async def async_verify_password(password: str, hashed_password: str) -> bool:
+    """
+    async_verify_password
+    """
+
+    return await _async_call(_verify_password, password, hashed_password)
 
 
 def encrypt_password_to_sha256(password: str) -> str:
@@ -7,3 +290,96 @@ def encrypt_password_to_sha256(password: str) -> str:
     """
 
     return hashlib.sha256(password.encode()).hexdigest()
+
+
+T = TypeVar("T")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Executor | None:
+    """
+    ハッシュ計算用のプロセスプールを返す。初回呼び出し時に生成する。
+    PASSWORD_HASH_WORKERSが0の場合はNoneを返す。
+    """
+
+    global _executor
+
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            # スレッドを含むプロセスをforkするとデッドロックしうるため、spawnでワーカを起動する
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    return _executor
+
+
+def _call(func: Callable[..., T], *args: Any) -> T:
+    """
+    プロセスプール上でfuncを実行し、結果を待つ。
+    """
+
+    executor = _get_executor()
+
+    if executor is None:
+        return func(*args)
+
+    return executor.submit(func, *args).result()
+
+
+async def _async_call(func: Callable[..., T], *args: Any) -> T:
+    """
+    イベントループを止めないよう、プロセスプール(またはスレッド)上でfuncを実行する。
+    """
+
+    executor = _get_executor()
+
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def _hash_password(password: str, scheme: str) -> str:
+    """
+    ワーカプロセスの設定に依存しないよう、ハッシュ方式は呼び出し元から渡す。
+    """
+
+    return get_hasher(scheme=scheme).hash(password)
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    """
+    _verify_password
+    """
+
+    return get_hasher(hashed_password).verify(password, hashed_password)
+
+
+def _chunksize(passwords: list[str]) -> int:
+    """
+    _chunksize
+    """
+
+    return max(1, len(passwords) // (settings.PASSWORD_HASH_WORKERS * 4))
+
+
+def _b64encode(value: bytes) -> str:
+    """
+    _b64encode
+    """
+
+    return base64.b64encode(value).decode().rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    """
+    _b64decode
+    """
+
+    return base64.b64decode(value + "=" * (-len(value) % 4))
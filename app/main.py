@@ -1,12 +1,53 @@
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anyio
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.logger import logger
+from app.interfaces.gateways import db, async_db
+from app.interfaces.gateways.db_metrics import instrument_engine
+from app.interfaces.gateways.schema import create_users_fts
+from app.lib.metrics import registry, CONTENT_TYPE
+from app.lib.profiling import list_profiles, verify_signature
+from app.middlewares.db_session import DBSessionMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.profiling import ProfilingMiddleware, PROFILES_PATH
+from app.middlewares.query_stats import QueryStatsMiddleware
+from app.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    起動時に既存のデータベースを移行してウォームアップを行い、完了後に/readyが成功を返すようにする。
+    """
+
+    await anyio.to_thread.run_sync(create_users_fts, db.engine)
+
+    if settings.WARMUP_ENABLED:
+        # ウォームアップは最適化のため、失敗してもリクエストは受け付ける
+        try:
+            await warm_up()
+        except Exception:
+            logger.exception("warm-up failed.")
+
+    app.state.ready = True
+
+    yield
+
+    # 終了処理中は新たなリクエストが振り分けられないようにする
+    app.state.ready = False
+
 
 app = FastAPI(
-    title="FastAPI Sample RESTful API with Clean Architecture", version="0.1.0"
+    title="FastAPI Sample RESTful API with Clean Architecture", version="0.1.0", lifespan=lifespan
 )
+app.state.ready = False
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,8 +55,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link"],
 )
 
+app.add_middleware(DBSessionMiddleware)
+
+app.add_middleware(QueryStatsMiddleware)
+
+# 無効の場合はミドルウェアを登録せず、オーバーヘッドをなくす
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# 最後に追加したミドルウェアが最も外側となるため、他のミドルウェアの処理時間も含めて計測する
+app.add_middleware(MetricsMiddleware)
+
+instrument_engine("sync", db.engine)
+instrument_engine("async", async_db.engine.sync_engine)
+
 
 app.include_router(
     api_router,
@@ -29,3 +85,47 @@ app.include_router(
         }
     },
 )
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """
+    Prometheusのテキスト形式でメトリクスを返す。
+    """
+
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/ready", include_in_schema=False)
+async def ready() -> JSONResponse:
+    """
+    ウォームアップが完了している場合のみ200を返す。
+    """
+
+    if not app.state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+
+    return JSONResponse({"status": "ready"})
+
+
+if settings.PROFILING_ENABLED:
+
+    @app.get(PROFILES_PATH, include_in_schema=False)
+    def profiles(
+        x_profile_signature: str | None = Header(None), x_profile_timestamp: str | None = Header(None)
+    ) -> list[dict]:
+        """
+        保存されたプロファイリング結果の一覧を返す。X-Profile-Signature・X-Profile-Timestampヘッダによる署名が必要。
+        """
+
+        if not verify_signature(
+            settings.PROFILING_SECRET,
+            "GET",
+            PROFILES_PATH,
+            x_profile_timestamp,
+            x_profile_signature,
+            settings.PROFILING_SIGNATURE_MAX_AGE_SECONDS,
+        ):
+            raise HTTPException(status_code=404, detail="Not Found")
+
+        return list_profiles(settings.PROFILING_DIR)
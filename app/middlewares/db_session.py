@@ -0,0 +1,24 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.interfaces.gateways import db, async_db
+
+
+class DBSessionMiddleware:
+    """
+    リクエストごとに専用のdb.session / async_db.sessionを割り当てる。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # コンテキスト変数はスレッドプールで実行される同期エンドポイントにも引き継がれる
+        with db.session_scope():
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await async_db.session.remove()
@@ -0,0 +1,102 @@
+import time
+from collections.abc import Iterable
+
+import anyio.to_thread
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.lib.metrics import registry, Counter, Gauge, Histogram, Labels
+
+request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Duration of HTTP requests until the response is sent.",
+        ("method", "route", "status"),
+    )
+)
+threadpool_saturated = registry.register(
+    Counter(
+        "http_requests_threadpool_saturated_total",
+        "HTTP requests that arrived while every worker thread was busy.",
+    )
+)
+
+
+def _threadpool_status() -> Iterable[tuple[Labels, float]]:
+    """
+    _threadpool_status
+    """
+
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        # イベントループの外では取得できない
+        return
+
+    statistics = limiter.statistics()
+
+    yield ("busy",), statistics.borrowed_tokens
+    yield ("max",), statistics.total_tokens
+    yield ("waiting",), statistics.tasks_waiting
+
+
+registry.register(
+    Gauge(
+        "threadpool_workers",
+        "Worker threads running sync endpoints and dependencies.",
+        _threadpool_status,
+        ("state",),
+    )
+)
+
+
+class MetricsMiddleware:
+    """
+    リクエストの処理時間をメソッド、ルート、ステータスコードごとに記録する。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 同期のエンドポイントはスレッドプールで実行されるため、空きがなければ待たされる
+        limiter = anyio.to_thread.current_default_thread_limiter()
+
+        if limiter.borrowed_tokens >= limiter.total_tokens:
+            threadpool_saturated.inc()
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_duration.observe(time.perf_counter() - start, (scope["method"], _route(scope), str(status)))
+
+
+def _route(scope: Scope) -> str:
+    """
+    ラベルの種類が増えすぎないよう、パスではなくルートのテンプレート(/api/v1/users/{id}等)を返す。
+    """
+
+    # include_routerしたルートのscope["route"]はルータ内のパス(/{id}等)のみを持つため、
+    # FastAPIがscopeに記録するプレフィックスを含むパスを優先する
+    context = scope.get("fastapi", {}).get("effective_route_context")
+
+    if context is not None:
+        return str(context.path)
+
+    route = scope.get("route")
+
+    return getattr(route, "path", "unmatched")
@@ -0,0 +1,105 @@
+import os
+import random
+import re
+import time
+import uuid
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.lib.profiling import Sampler, profiled_sampler, prune_profiles, verify_signature
+
+# プロファイリング結果の一覧を返すエンドポイントのパス
+PROFILES_PATH = "/profiles"
+
+
+class ProfilingMiddleware:
+    """
+    X-Profile-Signatureヘッダで署名されたリクエスト、またはPROFILING_SAMPLE_RATEの割合のリクエストを
+    プロファイリングし、PROFILING_DIRにcollapsed stack形式で保存する。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # サンプリングの負荷を抑えるため、同時にプロファイリングするリクエストは1件のみとする
+        if scope["type"] != "http" or self.profiling or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.profiling = True
+        sampler = Sampler(settings.PROFILING_INTERVAL)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+            await send(message)
+
+        start = time.perf_counter()
+        # このリクエストの処理を実行しているスレッドのみをサンプリングの対象とする
+        token = profiled_sampler.set(sampler)
+        sampler.start()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            profiled_sampler.reset(token)
+            self.profiling = False
+            elapsed = time.perf_counter() - start
+            name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{_to_filename(scope['path'])}"
+            name += f"-{status}-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:8]}.collapsed"
+            await anyio.to_thread.run_sync(_save, name, sampler.collapsed())
+
+
+def _should_profile(scope: Scope) -> bool:
+    """
+    _should_profile
+    """
+
+    if scope["path"] == PROFILES_PATH:
+        return False
+
+    headers = Headers(scope=scope)
+    signature = headers.get("x-profile-signature")
+
+    if signature is not None:
+        return verify_signature(
+            settings.PROFILING_SECRET,
+            scope["method"],
+            scope["path"],
+            headers.get("x-profile-timestamp"),
+            signature,
+            settings.PROFILING_SIGNATURE_MAX_AGE_SECONDS,
+        )
+
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _to_filename(path: str) -> str:
+    """
+    _to_filename
+    """
+
+    return re.sub(r"[^0-9A-Za-z_-]+", "_", path).strip("_") or "root"
+
+
+def _save(name: str, content: str) -> None:
+    """
+    プロファイリング結果を保存し、PROFILING_MAX_FILES件を超えた古い結果を削除する。
+    """
+
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+
+    with open(os.path.join(settings.PROFILING_DIR, name), "w") as f:
+        f.write(content)
+
+    prune_profiles(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
@@ -0,0 +1,40 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.interfaces.gateways.db_metrics import count_queries
+
+
+class QueryStatsMiddleware:
+    """
+    リクエストごとにSQL文の件数とDBの処理時間を数え、DB_QUERY_STATS_HEADERが有効な場合はレスポンスヘッダに付与する。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                # レスポンスの送信開始までに発行したSQL文が対象となる(ストリーミング中のSQL文は含まない)
+                if message["type"] == "http.response.start" and settings.DB_QUERY_STATS_HEADER:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Query-Count", str(stats.queries))
+                    headers.append("X-DB-Checkout-Count", str(stats.checkouts))
+                    headers.append("Server-Timing", f"db;dur={stats.seconds * 1000:.3f}")
+
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+        if 0 < settings.DB_QUERY_WARN_THRESHOLD < stats.queries:
+            logger.warning(
+                f"{scope['method']} {scope['path']} executed {stats.queries} queries "
+                f"(threshold: {settings.DB_QUERY_WARN_THRESHOLD}, db time: {stats.seconds * 1000:.1f}ms)"
+            )
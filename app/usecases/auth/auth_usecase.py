@@ -4,10 +4,19 @@ from datetime import timedelta
 from injector import inject
 
 from app.core.config import settings
-from app.lib.security import encrypt_password_to_sha256
-from app.lib.jwt import create_access_token
+from app.lib.security import (
+    hash_password,
+    verify_password,
+    needs_rehash,
+    async_hash_password,
+    async_verify_password,
+    dummy_password_hash,
+)
+from app.lib.jwt import create_access_token, token_version, confirm_token_version
 from app.exceptions.exception import NoContentError
+from app.interfaces.gateways.schema import UserRow
 from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
 
 
 class Token(BaseModel):
@@ -49,14 +58,107 @@ class AuthInteractorImpl(AuthInteractor):
         try:
             user = self.repository.find_user_by_name(form_data["username"])
         except NoContentError:
+            # 応答時間からユーザ名の存在を推測されないよう、存在しない場合もパスワードを検証する
+            verify_password(form_data["password"], dummy_password_hash())
             raise ValueError("Incorrect username or password")
 
-        hashed_password = encrypt_password_to_sha256(form_data["password"])
+        try:
+            verified = verify_password(form_data["password"], user.password)
+        except ValueError:
+            # 未知の方式や壊れたハッシュの詳細は応答に含めない
+            verified = False
 
-        if user["password"] != str(hashed_password):
+        if not verified:
             raise ValueError("Incorrect username or password")
 
-        access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(data={"sub": str(user["id"])}, expires_delta=access_token_expires)
+        # 旧方式(SHA-256等)のハッシュは、平文のパスワードが得られるログイン時に現在の方式で計算し直す
+        if needs_rehash(user.password):
+            self.repository.update_password_hash(user.id, user.password, hash_password(form_data["password"]))
+
+        return _to_token(user)
+
+
+class AsyncAuthInteractor(metaclass=ABCMeta):
+    """
+    AsyncAuthInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, form_data: dict) -> Token:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncAuthInteractorImpl(AsyncAuthInteractor):
+    """
+    AsyncAuthInteractorImpl
+    """
+
+    async def handle(self, form_data: dict) -> Token:
+        """
+        handle
+        """
+
+        try:
+            user = await self.repository.find_user_by_name(form_data["username"])
+        except NoContentError:
+            # 応答時間からユーザ名の存在を推測されないよう、存在しない場合もパスワードを検証する
+            await async_verify_password(form_data["password"], dummy_password_hash())
+            raise ValueError("Incorrect username or password")
+
+        try:
+            verified = await async_verify_password(form_data["password"], user.password)
+        except ValueError:
+            # 未知の方式や壊れたハッシュの詳細は応答に含めない
+            verified = False
+
+        if not verified:
+            raise ValueError("Incorrect username or password")
+
+        # 旧方式(SHA-256等)のハッシュは、平文のパスワードが得られるログイン時に現在の方式で計算し直す
+        if needs_rehash(user.password):
+            new_password_hash = await async_hash_password(form_data["password"])
+            await self.repository.update_password_hash(user.id, user.password, new_password_hash)
+
+        return _to_token(user)
+
+
+def _to_token(user: UserRow) -> Token:
+    """
+    _to_token
+    """
+
+    access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(data=_to_claims(user), expires_delta=access_token_expires)
+
+    return Token(access_token=access_token, token_type="bearer")
+
+
+def _to_claims(user: UserRow) -> dict:
+    """
+    _to_claims
+    """
 
-        return Token(access_token=access_token, token_type="bearer")
+    claims: dict = {"sub": str(user.id)}
+
+    # 認証時にDBを参照せずにユーザを復元できるよう、パスワード以外の情報とトークンバージョンを含める
+    if settings.JWT_CLAIMS_ONLY_AUTH:
+        # ログイン時にDBで確認したバージョンであるため、次の確認まではクレームのみで認証できる
+        confirm_token_version(user.id, token_version(user.updated_at))
+        claims.update(
+            {
+                "name": user.name,
+                "email": user.email,
+                "created_at": user.created_at.isoformat(),
+                "updated_at": user.updated_at.isoformat(),
+                "ver": token_version(user.updated_at),
+            }
+        )
+
+    return claims
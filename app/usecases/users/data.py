@@ -1,6 +1,8 @@
 from pydantic import BaseModel, SecretStr, EmailStr
 from datetime import datetime
 
+from app.interfaces.gateways.schema import UserRow
+
 
 class UserOutputData(BaseModel):
     """
@@ -13,3 +15,63 @@ class UserOutputData(BaseModel):
     email: EmailStr
     created_at: datetime
     updated_at: datetime
+
+
+class UserPageOutputData(BaseModel):
+    """
+    UserPageOutputData
+    """
+
+    users: list[UserOutputData]
+    # 次ページが存在する場合、次ページの起点となるid
+    next_after: int | None = None
+
+
+class UserBulkOutputData(BaseModel):
+    """
+    UserBulkOutputData
+    """
+
+    # 一括操作における各ユーザの結果。
+    # 200: 更新・削除済み、201: 登録済み、400: 更新する項目がない、404: ユーザが存在しない、409: nameまたはemailが重複
+    status: int
+    user: UserOutputData | None = None
+    detail: str | None = None
+
+
+def to_user_output_data(user: UserRow, fields: list[str] | None = None) -> UserOutputData:
+    """
+    DBから取得したユーザを、バリデーションを行わずにUserOutputDataに変換する。
+    DBの値は登録時に検証済みのため、EmailStr等の検証を省略する。
+    fieldsを指定した場合、fields以外のフィールドは未設定として扱われ、
+    response_model_exclude_unsetを指定したエンドポイントのレスポンスには含まれない。
+    """
+
+    return UserOutputData.model_construct(
+        _fields_set=None if fields is None else set(fields),
+        id=user.id,
+        name=user.name,
+        password=None if user.password is None else SecretStr(user.password),
+        email=user.email,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+
+
+def to_user_fields(fields: list[str] | None) -> list[str] | None:
+    """
+    レスポンスに含めるフィールドをUserOutputDataのフィールドとして検証し、定義順に並べて返す。
+    """
+
+    if fields is None:
+        return None
+
+    unknown_fields = [field for field in fields if field not in UserOutputData.model_fields]
+
+    if not fields or unknown_fields:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown_fields)}. "
+            f"Specify some of the following: {', '.join(UserOutputData.model_fields)}"
+        )
+
+    return [field for field in UserOutputData.model_fields if field in fields]
@@ -0,0 +1,103 @@
+from abc import ABCMeta, abstractmethod
+from injector import inject
+
+from app.domains.user import User
+from app.usecases.users.data import UserBulkOutputData, to_user_output_data
+from app.usecases.users.user_create_usecase import UserCreateInputData
+from app.core.config import settings
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+
+
+class UserBulkCreateInteractor(metaclass=ABCMeta):
+    """
+    UserBulkCreateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(self, users: list[UserCreateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class UserBulkCreateInteractorImpl(UserBulkCreateInteractor):
+    """
+    UserBulkCreateInteractorImpl
+    """
+
+    def handle(self, users_input: list[UserCreateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        data = self.repository.create_users(_to_users(users_input))
+
+        return _to_results(data)
+
+
+class AsyncUserBulkCreateInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserBulkCreateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, users: list[UserCreateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserBulkCreateInteractorImpl(AsyncUserBulkCreateInteractor):
+    """
+    AsyncUserBulkCreateInteractorImpl
+    """
+
+    async def handle(self, users_input: list[UserCreateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        data = await self.repository.create_users(_to_users(users_input))
+
+        return _to_results(data)
+
+
+def _to_users(users_input: list[UserCreateInputData]) -> list[dict]:
+    """
+    _to_users
+    """
+
+    if len(users_input) > settings.USERS_BULK_MAX_SIZE:
+        raise ValueError(f"The number of users must be less than or equal to {settings.USERS_BULK_MAX_SIZE}.")
+
+    return [
+        User(name=user_input.name, password=user_input.password, email=user_input.email).dict(exclude={"id"})
+        for user_input in users_input
+    ]
+
+
+def _to_results(data: list[UserRow | None]) -> list[UserBulkOutputData]:
+    """
+    _to_results
+    """
+
+    return [
+        (
+            UserBulkOutputData(status=201, user=to_user_output_data(d))
+            if d is not None
+            else UserBulkOutputData(status=409, detail="User or email is already exists.")
+        )
+        for d in data
+    ]
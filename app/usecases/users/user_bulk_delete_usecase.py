@@ -0,0 +1,115 @@
+from abc import ABCMeta, abstractmethod
+from injector import inject
+
+from app.usecases.users.data import UserBulkOutputData, to_user_output_data
+from app.core.config import settings
+from app.lib.jwt import revoke_tokens
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+
+
+class UserBulkDeleteInteractor(metaclass=ABCMeta):
+    """
+    UserBulkDeleteInteractor
+    """
+
+    @inject
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(self, ids: list[int]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class UserBulkDeleteInteractorImpl(UserBulkDeleteInteractor):
+    """
+    UserBulkDeleteInteractorImpl
+    """
+
+    def handle(self, ids: list[int]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        data = self.repository.delete_users(_to_ids(ids))
+
+        _revoke_tokens(data)
+
+        return _to_results(data)
+
+
+class AsyncUserBulkDeleteInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserBulkDeleteInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, ids: list[int]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserBulkDeleteInteractorImpl(AsyncUserBulkDeleteInteractor):
+    """
+    AsyncUserBulkDeleteInteractorImpl
+    """
+
+    async def handle(self, ids: list[int]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        data = await self.repository.delete_users(_to_ids(ids))
+
+        _revoke_tokens(data)
+
+        return _to_results(data)
+
+
+def _to_ids(ids: list[int]) -> list[int]:
+    """
+    _to_ids
+    """
+
+    if len(ids) > settings.USERS_BULK_MAX_SIZE:
+        raise ValueError(f"The number of users must be less than or equal to {settings.USERS_BULK_MAX_SIZE}.")
+
+    return ids
+
+
+def _revoke_tokens(data: list[UserRow | None]) -> None:
+    """
+    削除したユーザのトークンを失効させる。
+    """
+
+    for d in data:
+        if d is not None:
+            revoke_tokens(d.id)
+
+
+def _to_results(data: list[UserRow | None]) -> list[UserBulkOutputData]:
+    """
+    _to_results
+    """
+
+    results = []
+
+    for d in data:
+        if d is None:
+            results.append(UserBulkOutputData(status=404, detail="User not found."))
+            continue
+
+        results.append(UserBulkOutputData(status=200, user=to_user_output_data(d)))
+
+    return results
@@ -0,0 +1,169 @@
+from abc import ABCMeta, abstractmethod
+from pydantic import EmailStr, Field
+from injector import inject
+
+from app.usecases.users.data import UserBulkOutputData, to_user_output_data
+from app.usecases.users.user_update_usecase import UserUpdateInputData
+from app.core.config import settings
+from app.exceptions.exception import DuplicateError
+from app.lib.jwt import revoke_tokens, token_version
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+
+
+class UserBulkUpdateInputData(UserUpdateInputData):
+    """
+    UserBulkUpdateInputData
+    """
+
+    id: int = Field(..., ge=settings.ID_MIN, examples=[1])
+    # 一括更新では指定された項目のみを更新するため、emailも省略できる
+    email: EmailStr | None = None  # type: ignore[assignment]
+
+
+class UserBulkUpdateInteractor(metaclass=ABCMeta):
+    """
+    UserBulkUpdateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(self, users: list[UserBulkUpdateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class UserBulkUpdateInteractorImpl(UserBulkUpdateInteractor):
+    """
+    UserBulkUpdateInteractorImpl
+    """
+
+    def handle(self, users_input: list[UserBulkUpdateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        users = _to_users(users_input)
+        data = _with_empty_results(users, self.repository.update_users(_without_empty(users)))
+
+        _revoke_tokens(data)
+
+        return _to_results(data)
+
+
+class AsyncUserBulkUpdateInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserBulkUpdateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, users: list[UserBulkUpdateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserBulkUpdateInteractorImpl(AsyncUserBulkUpdateInteractor):
+    """
+    AsyncUserBulkUpdateInteractorImpl
+    """
+
+    async def handle(self, users_input: list[UserBulkUpdateInputData]) -> list[UserBulkOutputData]:
+        """
+        handle
+        """
+
+        users = _to_users(users_input)
+        data = _with_empty_results(users, await self.repository.update_users(_without_empty(users)))
+
+        _revoke_tokens(data)
+
+        return _to_results(data)
+
+
+def _to_users(users_input: list[UserBulkUpdateInputData]) -> list[dict]:
+    """
+    _to_users
+    """
+
+    if len(users_input) > settings.USERS_BULK_MAX_SIZE:
+        raise ValueError(f"The number of users must be less than or equal to {settings.USERS_BULK_MAX_SIZE}.")
+
+    ids = [user_input.id for user_input in users_input]
+
+    # 同一ユーザへの更新が複数あると適用される値が定まらないため受け付けない
+    if len(set(ids)) != len(ids):
+        raise ValueError("Each user must be specified only once.")
+
+    # 入力の検証は済んでいるため、ドメインモデルを経由せず指定された項目のみを抽出する
+    return [user_input.model_dump(exclude_none=True) for user_input in users_input]
+
+
+def _without_empty(users: list[dict]) -> list[dict]:
+    """
+    更新する項目のない要素を除いたリストを返す。
+    """
+
+    return [user for user in users if len(user) > 1]
+
+
+def _with_empty_results(
+    users: list[dict], data: list[UserRow | DuplicateError | None]
+) -> list[UserRow | DuplicateError | ValueError | None]:
+    """
+    更新する項目のない要素の位置にValueErrorを挿入し、入力と同じ順序の結果を返す。
+    """
+
+    updated = iter(data)
+    fields = ", ".join(field for field in UserBulkUpdateInputData.model_fields if field != "id")
+
+    return [
+        next(updated) if len(user) > 1 else ValueError(f"Specify at least one field to be updated: {fields}")
+        for user in users
+    ]
+
+
+def _revoke_tokens(data: list[UserRow | DuplicateError | ValueError | None]) -> None:
+    """
+    更新前のユーザ情報を含むトークンを失効させる。
+    """
+
+    for d in data:
+        if isinstance(d, UserRow):
+            revoke_tokens(d.id, token_version(d.updated_at))
+
+
+def _to_results(data: list[UserRow | DuplicateError | ValueError | None]) -> list[UserBulkOutputData]:
+    """
+    _to_results
+    """
+
+    results = []
+
+    for d in data:
+        if d is None:
+            results.append(UserBulkOutputData(status=404, detail="User not found."))
+            continue
+
+        if isinstance(d, DuplicateError):
+            results.append(UserBulkOutputData(status=409, detail="User or email is already exists."))
+            continue
+
+        if isinstance(d, ValueError):
+            results.append(UserBulkOutputData(status=400, detail=str(d)))
+            continue
+
+        results.append(UserBulkOutputData(status=200, user=to_user_output_data(d)))
+
+    return results
@@ -1,11 +1,12 @@
 from abc import ABCMeta, abstractmethod
-from pydantic import BaseModel, Field, EmailStr, parse_obj_as
+from pydantic import BaseModel, Field, EmailStr
 from injector import inject
 
 from app.domains.user import User
-from app.usecases.users.data import UserOutputData
+from app.usecases.users.data import UserOutputData, to_user_output_data
 from app.core.config import settings
 from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
 
 
 class UserCreateInputData(BaseModel):
@@ -36,7 +37,7 @@ class UserCreateInteractor(metaclass=ABCMeta):
         self.repository = repository
 
     @abstractmethod
-    def handle(self, user: UserCreateInputData) -> UserOutputData | None:
+    def handle(self, user: UserCreateInputData) -> UserOutputData:
         """
         handle
         """
@@ -48,7 +49,7 @@ class UserCreateInteractorImpl(UserCreateInteractor):
     UserCreateInteractorImpl
     """
 
-    def handle(self, user_input: UserCreateInputData) -> UserOutputData | None:
+    def handle(self, user_input: UserCreateInputData) -> UserOutputData:
         """
         handle
         """
@@ -61,4 +62,42 @@ class UserCreateInteractorImpl(UserCreateInteractor):
 
         data = self.repository.create_user(user.name, user.password, user.email)
 
-        return parse_obj_as(UserOutputData, data)
+        return to_user_output_data(data)
+
+
+class AsyncUserCreateInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserCreateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, user: UserCreateInputData) -> UserOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserCreateInteractorImpl(AsyncUserCreateInteractor):
+    """
+    AsyncUserCreateInteractorImpl
+    """
+
+    async def handle(self, user_input: UserCreateInputData) -> UserOutputData:
+        """
+        handle
+        """
+
+        user = User(
+            name=user_input.name,
+            password=user_input.password,
+            email=user_input.email,
+        )
+
+        data = await self.repository.create_user(user.name, user.password, user.email)
+
+        return to_user_output_data(data)
@@ -1,10 +1,11 @@
 from abc import ABCMeta, abstractmethod
-from pydantic import parse_obj_as
 from injector import inject
 
 from app.domains.user import UserBase
-from app.usecases.users.data import UserOutputData
+from app.usecases.users.data import UserOutputData, to_user_output_data
+from app.lib.jwt import revoke_tokens
 from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
 
 
 class UserDeleteInteractor(metaclass=ABCMeta):
@@ -17,7 +18,7 @@ class UserDeleteInteractor(metaclass=ABCMeta):
         self.repository = repository
 
     @abstractmethod
-    def handle(self, id: int) -> UserOutputData | None:
+    def handle(self, id: int) -> UserOutputData:
         """
         handle
         """
@@ -29,7 +30,7 @@ class UserDeleteInteractorImpl(UserDeleteInteractor):
     UserDeleteInteractorImpl
     """
 
-    def handle(self, id: int) -> UserOutputData | None:
+    def handle(self, id: int) -> UserOutputData:
         """
         handle
         """
@@ -38,4 +39,42 @@ class UserDeleteInteractorImpl(UserDeleteInteractor):
 
         data = self.repository.delete_user(user.id)
 
-        return parse_obj_as(UserOutputData, data)
+        revoke_tokens(user.id)
+
+        return to_user_output_data(data)
+
+
+class AsyncUserDeleteInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserDeleteInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(self, id: int) -> UserOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserDeleteInteractorImpl(AsyncUserDeleteInteractor):
+    """
+    AsyncUserDeleteInteractorImpl
+    """
+
+    async def handle(self, id: int) -> UserOutputData:
+        """
+        handle
+        """
+
+        user = UserBase(id=id)
+
+        data = await self.repository.delete_user(user.id)
+
+        revoke_tokens(user.id)
+
+        return to_user_output_data(data)
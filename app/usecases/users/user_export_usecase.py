@@ -0,0 +1,70 @@
+from abc import ABCMeta, abstractmethod
+from collections.abc import AsyncIterator, Iterator
+from injector import inject
+
+from app.usecases.users.data import UserOutputData, to_user_output_data
+from app.core.config import settings
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+
+
+class UserExportInteractor(metaclass=ABCMeta):
+    """
+    UserExportInteractor
+    """
+
+    @inject
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(self) -> Iterator[UserOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class UserExportInteractorImpl(UserExportInteractor):
+    """
+    UserExportInteractorImpl
+    """
+
+    def handle(self) -> Iterator[UserOutputData]:
+        """
+        handle
+        """
+
+        for d in self.repository.iter_users(settings.USERS_EXPORT_BATCH_SIZE):
+            yield to_user_output_data(d)
+
+
+class AsyncUserExportInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserExportInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(self) -> AsyncIterator[UserOutputData]:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserExportInteractorImpl(AsyncUserExportInteractor):
+    """
+    AsyncUserExportInteractorImpl
+    """
+
+    async def handle(self) -> AsyncIterator[UserOutputData]:
+        """
+        handle
+        """
+
+        async for d in self.repository.iter_users(settings.USERS_EXPORT_BATCH_SIZE):
+            yield to_user_output_data(d)
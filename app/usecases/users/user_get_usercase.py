@@ -1,10 +1,15 @@
 from abc import ABCMeta, abstractmethod
-from pydantic import parse_obj_as
+from typing import overload
+
 from injector import inject
 
 from app.domains.user import UserBase
-from app.usecases.users.data import UserOutputData
+from app.usecases.users.data import UserOutputData, UserPageOutputData, to_user_output_data, to_user_fields
+from app.core.config import settings
+from app.exceptions.exception import NoContentError
+from app.interfaces.gateways.schema import UserRow
 from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
 
 
 class UserGetInteractor(metaclass=ABCMeta):
@@ -16,8 +21,25 @@ class UserGetInteractor(metaclass=ABCMeta):
     def __init__(self, repository: UserRepository):
         self.repository = repository
 
+    # idを指定した場合はそのユーザを、指定しない場合は一覧のページを返す
+    @overload
+    def handle(self, id: int, *, fields: list[str] | None = None) -> UserOutputData:
+        pass
+
+    @overload
+    def handle(
+        self, *, limit: int = settings.USERS_PAGE_DEFAULT_LIMIT, after: int = 0, fields: list[str] | None = None
+    ) -> UserPageOutputData:
+        pass
+
     @abstractmethod
-    def handle(self, id: int = 0) -> UserOutputData | list[UserOutputData] | None:
+    def handle(
+        self,
+        id: int = 0,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserOutputData | UserPageOutputData:
         """
         handle
         """
@@ -29,38 +51,170 @@ class UserGetInteractorImpl(UserGetInteractor):
     UserGetInteractorImpl
     """
 
-    def handle(self, id: int = 0) -> UserOutputData | list[UserOutputData] | None:
+    @overload
+    def handle(self, id: int, *, fields: list[str] | None = None) -> UserOutputData:
+        pass
+
+    @overload
+    def handle(
+        self, *, limit: int = settings.USERS_PAGE_DEFAULT_LIMIT, after: int = 0, fields: list[str] | None = None
+    ) -> UserPageOutputData:
+        pass
+
+    def handle(
+        self,
+        id: int = 0,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserOutputData | UserPageOutputData:
         """
         handle
         """
-        response: UserOutputData | list[UserOutputData] | None
+        response: UserOutputData | UserPageOutputData
+        fields = to_user_fields(fields)
 
         if id:
-            response = self.__find_user_by_id(id)
+            response = self.__find_user_by_id(id, fields)
         else:
-            response = self.__find_users()
+            response = self.__find_users(limit, after, fields)
 
         return response
 
-    def __find_users(self) -> list[UserOutputData] | None:
+    def __find_users(self, limit: int, after: int, fields: list[str] | None) -> UserPageOutputData:
         """
         __find_users
         """
-        data = self.repository.find_users()
 
-        response = []
+        validate_limit(limit)
 
-        for d in data:
-            response.append(parse_obj_as(UserOutputData, d))
+        # 次ページの有無を判定するため1件多く取得する
+        data = self.repository.find_users_page(limit + 1, after, to_columns(fields))
 
-        return response
+        return _to_page(data, limit, after, fields)
 
-    def __find_user_by_id(self, id: int) -> UserOutputData | None:
+    def __find_user_by_id(self, id: int, fields: list[str] | None) -> UserOutputData:
         """
         __find_user_by_id
         """
 
         user = UserBase(id=id)
-        data = self.repository.find_user_by_id(user.id)
+        data = self.repository.find_user_by_id(user.id, to_columns(fields))
+
+        return to_user_output_data(data, fields)
+
+
+class AsyncUserGetInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserGetInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @overload
+    async def handle(self, id: int, *, fields: list[str] | None = None) -> UserOutputData:
+        pass
+
+    @overload
+    async def handle(
+        self, *, limit: int = settings.USERS_PAGE_DEFAULT_LIMIT, after: int = 0, fields: list[str] | None = None
+    ) -> UserPageOutputData:
+        pass
+
+    @abstractmethod
+    async def handle(
+        self,
+        id: int = 0,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserOutputData | UserPageOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserGetInteractorImpl(AsyncUserGetInteractor):
+    """
+    AsyncUserGetInteractorImpl
+    """
+
+    # idを指定した場合はそのユーザを、指定しない場合は一覧のページを返す
+    @overload
+    async def handle(self, id: int, *, fields: list[str] | None = None) -> UserOutputData:
+        pass
+
+    @overload
+    async def handle(
+        self, *, limit: int = settings.USERS_PAGE_DEFAULT_LIMIT, after: int = 0, fields: list[str] | None = None
+    ) -> UserPageOutputData:
+        pass
+
+    async def handle(
+        self,
+        id: int = 0,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserOutputData | UserPageOutputData:
+        """
+        handle
+        """
+        response: UserOutputData | UserPageOutputData
+        fields = to_user_fields(fields)
+
+        if id:
+            user = UserBase(id=id)
+            response = to_user_output_data(await self.repository.find_user_by_id(user.id, to_columns(fields)), fields)
+        else:
+            validate_limit(limit)
+            data = await self.repository.find_users_page(limit + 1, after, to_columns(fields))
+            response = _to_page(data, limit, after, fields)
+
+        return response
+
+
+def validate_limit(limit: int) -> None:
+    """
+    validate_limit
+    """
+
+    if not 1 <= limit <= settings.USERS_PAGE_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {settings.USERS_PAGE_MAX_LIMIT}.")
+
+
+def to_columns(fields: list[str] | None) -> list[str] | None:
+    """
+    レスポンスに含めるフィールドから、DBから取得する列を求める。
+    idは次ページの起点に、updated_atはETagの生成に用いるため、常に取得する。
+    """
+
+    if fields is None:
+        return None
+
+    return [column for column in UserRow._fields if column in fields or column in ("id", "updated_at")]
+
+
+def _to_page(data: list[UserRow], limit: int, after: int, fields: list[str] | None = None) -> UserPageOutputData:
+    """
+    _to_page
+    """
+
+    if not data and not after:
+        raise NoContentError("Users are not found.")
+
+    return to_page(data, limit, fields)
+
+
+def to_page(data: list[UserRow], limit: int, fields: list[str] | None = None) -> UserPageOutputData:
+    """
+    limit+1件取得した結果をページに変換する。
+    """
+
+    users = [to_user_output_data(d, fields) for d in data[:limit]]
+    next_after = users[-1].id if len(data) > limit else None
 
-        return parse_obj_as(UserOutputData, data)
+    return UserPageOutputData(users=users, next_after=next_after)
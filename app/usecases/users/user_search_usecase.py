@@ -0,0 +1,136 @@
+from abc import ABCMeta, abstractmethod
+from datetime import datetime
+from pydantic import BaseModel, Field
+from injector import inject
+
+from app.usecases.users.data import UserPageOutputData, to_user_fields
+from app.usecases.users.user_get_usercase import validate_limit, to_columns, to_page
+from app.core.config import settings
+from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
+
+
+class UserSearchInputData(BaseModel):
+    """
+    UserSearchInputData
+    """
+
+    # nameは前方一致、emailは完全一致、qはnameまたはemailの部分一致で検索する。
+    # created_fromは指定日時を含み、created_toは指定日時を含まない
+    name: str | None = Field(default=None, min_length=1, examples=["squ"])
+    email: str | None = Field(default=None, min_length=1, examples=["squid@example.com"])
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    q: str | None = Field(default=None, min_length=1, examples=["quid"])
+
+
+class UserSearchInteractor(metaclass=ABCMeta):
+    """
+    UserSearchInteractor
+    """
+
+    @inject
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    def handle(
+        self,
+        conditions: UserSearchInputData,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserPageOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class UserSearchInteractorImpl(UserSearchInteractor):
+    """
+    UserSearchInteractorImpl
+    """
+
+    def handle(
+        self,
+        conditions: UserSearchInputData,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserPageOutputData:
+        """
+        handle
+        """
+
+        validate_limit(limit)
+        fields = to_user_fields(fields)
+
+        # 次ページの有無を判定するため1件多く取得する
+        data = self.repository.search_users(_to_conditions(conditions), limit + 1, after, to_columns(fields))
+
+        return to_page(data, limit, fields)
+
+
+class AsyncUserSearchInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserSearchInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(
+        self,
+        conditions: UserSearchInputData,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserPageOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserSearchInteractorImpl(AsyncUserSearchInteractor):
+    """
+    AsyncUserSearchInteractorImpl
+    """
+
+    async def handle(
+        self,
+        conditions: UserSearchInputData,
+        limit: int = settings.USERS_PAGE_DEFAULT_LIMIT,
+        after: int = 0,
+        fields: list[str] | None = None,
+    ) -> UserPageOutputData:
+        """
+        handle
+        """
+
+        validate_limit(limit)
+        fields = to_user_fields(fields)
+
+        data = await self.repository.search_users(_to_conditions(conditions), limit + 1, after, to_columns(fields))
+
+        return to_page(data, limit, fields)
+
+
+def _to_conditions(conditions: UserSearchInputData) -> dict:
+    """
+    _to_conditions
+    """
+
+    data = conditions.model_dump(exclude_none=True)
+
+    # 条件なしの検索は一覧と変わらないため受け付けない
+    if not data:
+        raise ValueError(f"Specify at least one condition: {', '.join(UserSearchInputData.model_fields)}")
+
+    if conditions.created_from and conditions.created_to and conditions.created_from >= conditions.created_to:
+        raise ValueError("created_from must be earlier than created_to.")
+
+    return data
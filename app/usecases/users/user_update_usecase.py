@@ -1,11 +1,14 @@
 from abc import ABCMeta, abstractmethod
-from pydantic import BaseModel, Field, EmailStr, parse_obj_as
+from datetime import datetime
+from pydantic import BaseModel, Field, EmailStr
 from injector import inject
 
 from app.domains.user import User
-from app.usecases.users.data import UserOutputData
+from app.usecases.users.data import UserOutputData, to_user_output_data
 from app.core.config import settings
+from app.lib.jwt import revoke_tokens, token_version
 from app.interfaces.gateways.user_repository import UserRepository
+from app.interfaces.gateways.async_user_repository import AsyncUserRepository
 
 
 class UserUpdateInputData(BaseModel):
@@ -36,7 +39,9 @@ class UserUpdateInteractor(metaclass=ABCMeta):
         self.repository = repository
 
     @abstractmethod
-    def handle(self, id: int, user: UserUpdateInputData) -> UserOutputData | None:
+    def handle(
+        self, id: int, user: UserUpdateInputData, expected_updated_at: list[datetime] | None = None
+    ) -> UserOutputData:
         """
         handle
         """
@@ -48,25 +53,77 @@ class UserUpdateInteractorImpl(UserUpdateInteractor):
     UserUpdateInteractorImpl
     """
 
-    def handle(self, id: int, user_input: UserUpdateInputData) -> UserOutputData | None:
+    def handle(
+        self, id: int, user_input: UserUpdateInputData, expected_updated_at: list[datetime] | None = None
+    ) -> UserOutputData:
         """
         handle
         """
 
-        user = User(
-            id=id,
-            name=user_input.name,
-            password=user_input.password,
-            email=user_input.email,
-        )
+        data = self.repository.update_user(to_data_to_be_updated(id, user_input), expected_updated_at)
 
-        # Valueが存在する要素のみアップデート対象として抽出する
-        data_to_be_updated = user.dict(exclude_none=True)
+        # 更新前のユーザ情報を含むトークンを失効させる
+        revoke_tokens(id, token_version(data.updated_at))
 
-        # idしかない場合はバリデーションエラー
-        if len(data_to_be_updated) == 1:
-            raise ValueError(f"Specify at least one field to be updated: {', '.join(user_input.dict().keys())}")
+        return to_user_output_data(data)
 
-        data = self.repository.update_user(data_to_be_updated)
 
-        return parse_obj_as(UserOutputData, data)
+class AsyncUserUpdateInteractor(metaclass=ABCMeta):
+    """
+    AsyncUserUpdateInteractor
+    """
+
+    @inject
+    def __init__(self, repository: AsyncUserRepository):
+        self.repository = repository
+
+    @abstractmethod
+    async def handle(
+        self, id: int, user: UserUpdateInputData, expected_updated_at: list[datetime] | None = None
+    ) -> UserOutputData:
+        """
+        handle
+        """
+        pass
+
+
+class AsyncUserUpdateInteractorImpl(AsyncUserUpdateInteractor):
+    """
+    AsyncUserUpdateInteractorImpl
+    """
+
+    async def handle(
+        self, id: int, user_input: UserUpdateInputData, expected_updated_at: list[datetime] | None = None
+    ) -> UserOutputData:
+        """
+        handle
+        """
+
+        data = await self.repository.update_user(to_data_to_be_updated(id, user_input), expected_updated_at)
+
+        # 更新前のユーザ情報を含むトークンを失効させる
+        revoke_tokens(id, token_version(data.updated_at))
+
+        return to_user_output_data(data)
+
+
+def to_data_to_be_updated(id: int, user_input: UserUpdateInputData) -> dict:
+    """
+    to_data_to_be_updated
+    """
+
+    user = User(
+        id=id,
+        name=user_input.name,
+        password=user_input.password,
+        email=user_input.email,
+    )
+
+    # Valueが存在する要素のみアップデート対象として抽出する
+    data_to_be_updated = user.dict(exclude_none=True)
+
+    # idしかない場合はバリデーションエラー
+    if len(data_to_be_updated) == 1:
+        raise ValueError(f"Specify at least one field to be updated: {', '.join(user_input.dict().keys())}")
+
+    return data_to_be_updated
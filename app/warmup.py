@@ -0,0 +1,130 @@
+import time
+from datetime import datetime
+
+import anyio.to_thread
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.depends import usecase_module
+from app.exceptions.exception import NoContentError
+from app.interfaces.gateways import db, async_db
+from app.interfaces.gateways.schema import UserRow
+from app.lib.jwt import create_access_token, get_claims_from_token
+from app.lib.security import hash_passwords, dummy_password_hash
+from app.usecases.users.data import UserBulkOutputData, UserPageOutputData, to_user_output_data
+from app.usecases.users.user_create_usecase import UserCreateInputData
+from app.usecases.users.user_search_usecase import UserSearchInputData
+from app.usecases.users.user_update_usecase import UserUpdateInputData
+
+
+async def warm_up() -> None:
+    """
+    最初のリクエストで行われる初期化(DBへの接続、バリデータ・シリアライザの初回実行、DIコンテナの解決、
+    ハッシュ計算用のプロセスの起動、SQLのコンパイル)を起動時に済ませておく。
+    """
+
+    start = time.perf_counter()
+
+    # DBへの接続やハッシュ計算はブロッキング処理のため、スレッドプールで実行し、
+    # その間もイベントループがシグナル等を処理できるようにする
+    if settings.DATABASE_ASYNC:
+        await _warm_up_async_pool(async_db.engine, settings.WARMUP_DB_CONNECTIONS)
+    else:
+        await anyio.to_thread.run_sync(_warm_up_pool, db.engine, settings.WARMUP_DB_CONNECTIONS)
+
+    _warm_up_models()
+    _warm_up_injectors()
+    await anyio.to_thread.run_sync(_warm_up_password_hash)
+    await _warm_up_queries()
+
+    logger.info(f"warm-up finished in {time.perf_counter() - start:.3f}s")
+
+
+def _pool_size(engine: Engine, size: int) -> int:
+    """
+    プールに保持できない接続は返却時に閉じられるため、pool_sizeまでとする。
+    """
+
+    return min(size, engine.pool.size()) if isinstance(engine.pool, QueuePool) else size
+
+
+def _warm_up_pool(engine: Engine, size: int) -> None:
+    """
+    接続を同時にsize件開き、プールに返却しておく。
+    """
+
+    connections = [engine.connect() for _ in range(_pool_size(engine, size))]
+
+    for connection in connections:
+        connection.close()
+
+
+async def _warm_up_async_pool(engine: AsyncEngine, size: int) -> None:
+    """
+    接続を同時にsize件開き、プールに返却しておく。
+    """
+
+    connections = [await engine.connect() for _ in range(_pool_size(engine.sync_engine, size))]
+
+    for connection in connections:
+        await connection.close()
+
+
+def _warm_up_models() -> None:
+    """
+    入出力データのバリデーションとシリアライズを一度ずつ行う。
+    """
+
+    now = datetime.now()
+    user = {"name": "warmup", "password": "password", "email": "warmup@example.com"}
+
+    UserCreateInputData(**user)
+    UserUpdateInputData(**user)
+    UserSearchInputData.model_validate({"name": "warmup", "created_from": now})
+
+    output = to_user_output_data(UserRow(1, created_at=now, updated_at=now, **user))
+    UserPageOutputData(users=[output]).model_dump_json()
+    UserBulkOutputData(status=200, user=output).model_dump_json()
+
+    get_claims_from_token(create_access_token({"sub": "0"}))
+
+
+def _warm_up_injectors() -> None:
+    """
+    DIコンテナから全てのInteractorを解決し、シングルトンを生成しておく。
+    """
+
+    for name, func in vars(usecase_module).items():
+        if name.endswith("_interactor_injector"):
+            func()
+
+
+def _warm_up_password_hash() -> None:
+    """
+    ハッシュ計算用のプロセスプールのワーカを起動し、存在しないユーザのログイン時に使うハッシュを計算しておく。
+    """
+
+    hash_passwords(["password"] * max(1, settings.PASSWORD_HASH_WORKERS))
+    dummy_password_hash()
+
+
+async def _warm_up_queries() -> None:
+    """
+    一覧の取得を一度行い、SQLのコンパイル結果をキャッシュしておく。
+    """
+
+    # リクエストと同じく、専用のdb.session / async_db.sessionを使い、終了時に破棄する
+    with db.session_scope():
+        try:
+            if settings.DATABASE_ASYNC:
+                await usecase_module.async_user_get_interactor_injector().handle(limit=1)
+            else:
+                interactor = usecase_module.user_get_interactor_injector()
+                await anyio.to_thread.run_sync(lambda: interactor.handle(limit=1))
+        except NoContentError:
+            pass
+        finally:
+            await async_db.session.remove()
@@ -0,0 +1,43 @@
+# DIコンテナによるInteractor解決の、リクエストあたりのオーバーヘッドを計測する。
+#
+#   $ python -m benchmarks.bench_injector
+import timeit
+
+from injector import Injector
+
+from app.depends.repository_module import RepositoryModule
+from app.depends.usecase_module import user_get_interactor_injector
+from app.usecases.users.user_get_usercase import UserGetInteractorImpl
+
+NUMBER = 10000
+REPEAT = 5
+
+
+def injector_per_request() -> None:
+    """
+    リクエストごとにInjectorを構築していた変更前の解決方法
+    """
+
+    Injector([RepositoryModule]).get(UserGetInteractorImpl)
+
+
+def shared_injector() -> None:
+    """
+    起動時に構築したInjectorから解決する変更後の解決方法
+    """
+
+    user_get_interactor_injector()
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    for func in (injector_per_request, shared_injector):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER
+        print(f"{func.__name__:<24} {seconds * 1_000_000:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# 検証済みトークンのキャッシュにより、jwt.decodeの呼び出しをどれだけ削減できるかを計測する。
+# ACTIVE_USERS人のユーザがそれぞれ1つのトークンを使い回し、REQUESTS件のリクエストを送る状況を想定する。
+#
+#   $ python -m benchmarks.bench_jwt
+import random
+import time
+from datetime import timedelta
+
+from jose import jwt
+
+from app.core.config import settings
+from app.lib.jwt import create_access_token, get_id_from_token, verified_token_cache
+
+ACTIVE_USERS = 1000
+REQUESTS = 100000
+
+
+def decode_every_time(token: str) -> str:
+    """
+    キャッシュを使わない変更前の検証方法
+    """
+
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    id: str = payload.get("sub")
+
+    return id
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    expires_delta = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    tokens = [create_access_token({"sub": str(id)}, expires_delta) for id in range(1, ACTIVE_USERS + 1)]
+
+    rng = random.Random(0)
+    requests = [rng.choice(tokens) for _ in range(REQUESTS)]
+
+    verified_token_cache.clear()
+
+    for func in (decode_every_time, get_id_from_token):
+        start = time.perf_counter()
+
+        for token in requests:
+            func(token)
+
+        seconds = time.perf_counter() - start
+        print(f"{func.__name__:<20} {REQUESTS / seconds:12,.0f} requests/s")
+
+    decoded = verified_token_cache.misses
+    print(f"jwt.decode calls: {REQUESTS:,} -> {decoded:,} ({REQUESTS - decoded:,} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# リクエストを処理するスレッドがログ出力に費やす時間を、1リクエストあたりで計測する。
+# 1リクエストでINFOログ1行と"db connection closed."のログLINES_PER_REQUEST行を出力する状況を想定し、
+# 出力先が遅い場合(コンテナのstdoutが詰まっている等)はWRITE_LATENCY秒ずつ書き込みが待たされるものとする。
+#
+#   $ python -m benchmarks.bench_logging
+import io
+import os
+import time
+from logging import Formatter, Logger, Handler, StreamHandler, DEBUG, INFO
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+
+from app.core.logger import JsonFormatter, SamplingFilter, LocalQueueHandler
+
+REQUESTS = 5000
+LINES_PER_REQUEST = 2
+WRITE_LATENCY = 0.00005
+
+
+class SlowStream(io.TextIOBase):
+    """
+    書き込みのたびにWRITE_LATENCY秒待たされる出力先
+    """
+
+    def __init__(self) -> None:
+        self.devnull = open(os.devnull, "w")
+
+    def write(self, s: str) -> int:
+        time.sleep(WRITE_LATENCY)
+        return self.devnull.write(s)
+
+
+def make_logger(handler: Handler, level: int) -> Logger:
+    """
+    make_logger
+    """
+
+    logger = Logger("bench", level)
+    logger.addHandler(handler)
+
+    return logger
+
+
+def request(logger: Logger, db_level: int) -> None:
+    """
+    1リクエスト分のログを出力する
+    """
+
+    for _ in range(LINES_PER_REQUEST):
+        logger.log(db_level, "db connection closed.")
+
+    logger.info("GET /api/v1/users/%d 200", 1)
+
+
+def measure(name: str, logger: Logger, db_level: int, listener: QueueListener | None = None) -> None:
+    """
+    measure
+    """
+
+    start = time.perf_counter()
+
+    for _ in range(REQUESTS):
+        request(logger, db_level)
+
+    seconds = time.perf_counter() - start
+
+    # キューに残ったログの出力を待つ(リクエストを処理するスレッドの時間には含めない)
+    if listener is not None:
+        listener.stop()
+
+    print(f"{name:<44} {seconds / REQUESTS * 1_000_000:8.1f} us/request")
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    text = Formatter("%(asctime)s %(name)s(%(process)d):[%(levelname)s] %(message)s")
+
+    for stream_name, make_stream in (("devnull", lambda: open(os.devnull, "w")), ("slow stream", SlowStream)):
+        print(f"# {stream_name}")
+
+        # 変更前: StreamHandlerで同期的に出力し、"db connection closed."もINFOで出力する
+        handler = StreamHandler(make_stream())
+        handler.setFormatter(text)
+        measure("StreamHandler, db lines at INFO", make_logger(handler, INFO), INFO)
+
+        for formatter_name, formatter in (("text", text), ("json", JsonFormatter())):
+            handler = StreamHandler(make_stream())
+            handler.setFormatter(formatter)
+            queue: SimpleQueue = SimpleQueue()
+            listener = QueueListener(queue, handler)
+            listener.start()
+            measure(f"QueueHandler({formatter_name}), db lines at INFO", make_logger(LocalQueueHandler(queue), INFO), INFO, listener)
+
+        # 変更後: "db connection closed."はDEBUGとし、通常は出力しない
+        handler = StreamHandler(make_stream())
+        handler.setFormatter(JsonFormatter())
+        queue = SimpleQueue()
+        listener = QueueListener(queue, handler)
+        listener.start()
+        measure("QueueHandler(json), db lines at DEBUG (off)", make_logger(LocalQueueHandler(queue), INFO), DEBUG, listener)
+
+        # DEBUGログを有効にし、1%のみ出力する
+        queue = SimpleQueue()
+        queue_handler = LocalQueueHandler(queue)
+        queue_handler.addFilter(SamplingFilter(0.01))
+        listener = QueueListener(queue, handler)
+        listener.start()
+        measure("QueueHandler(json), db lines sampled 1%", make_logger(queue_handler, DEBUG), DEBUG, listener)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# 同時ログイン時のパスワード検証のスループットと、その間のイベントループの遅延を計測する。
+# CONCURRENCY件のログインを並行に処理し続け、LOGINS件を処理するまでの時間を測る。
+#
+#   $ python -m benchmarks.bench_password_hash
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.lib.security import async_verify_password, encrypt_password_to_sha256, get_hasher, hash_password
+
+CONCURRENCY = 32
+LOGINS = 200
+PASSWORD = "password"
+
+
+async def verify_on_event_loop(password: str, hashed_password: str) -> bool:
+    """
+    オフロードせず、イベントループ上で検証する
+    """
+
+    return get_hasher(hashed_password).verify(password, hashed_password)
+
+
+async def measure(verify: Callable[[str, str], Awaitable[bool]], hashed_password: str) -> tuple[float, float]:
+    """
+    measure
+    """
+
+    lags = [0.0]
+    done = asyncio.Event()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def login() -> None:
+        async with semaphore:
+            assert await verify(PASSWORD, hashed_password)
+
+    async def logins() -> None:
+        try:
+            await asyncio.gather(*(login() for _ in range(LOGINS)))
+        finally:
+            done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(ticker(), logins())
+
+    return LOGINS / (time.perf_counter() - start), max(lags)
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    scrypt_hash = hash_password(PASSWORD)
+    cases = [
+        ("sha256 (legacy)", verify_on_event_loop, encrypt_password_to_sha256(PASSWORD)),
+        ("scrypt on event loop", verify_on_event_loop, scrypt_hash),
+        (f"scrypt on {settings.PASSWORD_HASH_WORKERS} processes", async_verify_password, scrypt_hash),
+    ]
+
+    for name, verify, hashed_password in cases:
+        logins_per_second, lag = asyncio.run(measure(verify, hashed_password))
+        print(f"{name:<28} {logins_per_second:10,.1f} logins/s  max event loop lag {lag * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# ユーザの読み取りにかかる時間を、ORMオブジェクトを生成する場合とCoreのselect()で行を取得する場合とで比較する。
+# benchmarks.datasetの一時ファイルのSQLiteにユーザを登録し、一覧(find_users_page)と全件の読み出し(iter_users)を計測する。
+#
+#   $ python -m benchmarks.bench_repository
+import time
+from collections.abc import Callable
+
+from app.interfaces.gateways import db
+from app.interfaces.gateways.schema import User
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from benchmarks.dataset import temp_database
+
+ROWS = 10000
+PAGE_LIMIT = 1000
+BATCH_SIZE = 1000
+REPEAT = 5
+
+
+def to_dict(user: User) -> dict:
+    """
+    変更前: ORMオブジェクトを辞書に変換する
+    """
+
+    return {
+        "id": user.id,
+        "name": user.name,
+        "password": user.password,
+        "email": user.email,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
+
+
+def orm_page() -> int:
+    """
+    変更前: ORMオブジェクトを生成して1ページ分を取得する
+    """
+
+    try:
+        users = db.session.query(User).filter(User.id > 0).order_by(User.id).limit(PAGE_LIMIT).all()
+    finally:
+        db.session.close()
+
+    return len([to_dict(u) for u in users])
+
+
+def orm_export() -> int:
+    """
+    変更前: ORMオブジェクトを生成して全件を取得する
+    """
+
+    session = db.Session()
+
+    try:
+        return sum(1 for u in session.query(User).order_by(User.id).yield_per(BATCH_SIZE) if to_dict(u))
+    finally:
+        session.close()
+
+
+def core_page() -> int:
+    """
+    変更後: Coreのselect()で1ページ分のUserRowを取得する
+    """
+
+    return len(UserRepositoryImpl().find_users_page(PAGE_LIMIT))
+
+
+def core_export() -> int:
+    """
+    変更後: Coreのselect()で全件のUserRowを取得する
+    """
+
+    return sum(1 for _ in UserRepositoryImpl().iter_users(BATCH_SIZE))
+
+
+def measure(func: Callable[[], int]) -> None:
+    """
+    measure
+    """
+
+    func()
+    start = time.perf_counter()
+
+    for _ in range(REPEAT):
+        rows = func()
+
+    seconds = (time.perf_counter() - start) / REPEAT
+    print(f"{func.__name__:<12} {rows:>6,} rows {seconds * 1000:8.1f} ms  {rows / seconds:12,.0f} rows/s")
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    with temp_database(ROWS):
+        for func in (orm_page, core_page, orm_export, core_export):
+            measure(func)
+
+
+if __name__ == "__main__":
+    main()
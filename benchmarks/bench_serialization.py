@@ -0,0 +1,73 @@
+# ユーザ一覧のレスポンスを生成するまでの時間を、DBから取得した行数ごとに計測する。
+# FastAPIはresponse_modelが指定されたエンドポイントの戻り値を、TypeAdapterで検証した上でJSONにシリアライズする。
+#
+#   $ python -m benchmarks.bench_serialization
+import time
+from datetime import datetime
+
+from pydantic import TypeAdapter, parse_obj_as
+
+from app.interfaces.gateways.schema import UserRow
+from app.usecases.users.data import UserOutputData, to_user_output_data
+
+ROWS = [1000, 10000]
+REPEAT = 5
+
+# FastAPIがresponse_model=list[UserOutputData]に対して行う検証とシリアライズ
+response_adapter = TypeAdapter(list[UserOutputData])
+
+
+def validate_each_row(rows: list[UserRow]) -> bytes:
+    """
+    変更前: 各行をparse_obj_asで検証してからレスポンスを生成する
+    """
+
+    users = [parse_obj_as(UserOutputData, row._asdict()) for row in rows]
+
+    return response_adapter.dump_json(response_adapter.validate_python(users))
+
+
+def trust_db_rows(rows: list[UserRow]) -> bytes:
+    """
+    変更後: DBの行は検証せずに変換し、レスポンスの生成時のみ検証・シリアライズする
+    """
+
+    users = [to_user_output_data(row) for row in rows]
+
+    return response_adapter.dump_json(response_adapter.validate_python(users))
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    now = datetime.now()
+
+    for n in ROWS:
+        rows = [
+            UserRow(
+                id=i,
+                name=f"user{i}",
+                password="0" * 64,
+                email=f"user{i}@example.com",
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(1, n + 1)
+        ]
+
+        assert validate_each_row(rows) == trust_db_rows(rows)
+
+        for func in (validate_each_row, trust_db_rows):
+            start = time.perf_counter()
+
+            for _ in range(REPEAT):
+                func(rows)
+
+            seconds = (time.perf_counter() - start) / REPEAT
+            print(f"{n:>6,} rows  {func.__name__:<18} {seconds * 1000:8.1f} ms  {n / seconds:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
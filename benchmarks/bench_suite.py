@@ -0,0 +1,336 @@
+# リポジトリ、ユースケース、エンドポイントの処理時間を計測し、スループットとp50/p99のレイテンシを出力する。
+# benchmarks.datasetの一時ファイルのSQLiteに--rows件のユーザを登録して計測する。
+# --outputに結果をJSONで保存し、--baselineに保存済みの結果を指定すると、p50が--thresholdの割合を超えて
+# 遅くなったケースを報告して終了コード1で終了する。
+#
+#   $ python -m benchmarks.bench_suite --rows 100000 --output bench.json
+#   $ python -m benchmarks.bench_suite --rows 100000 --baseline bench.json
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Any, NamedTuple
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.lib.cursor import encode_cursor
+from app.usecases.auth.auth_usecase import AuthInteractorImpl
+from app.usecases.users.user_bulk_create_usecase import UserBulkCreateInteractorImpl
+from app.usecases.users.user_bulk_delete_usecase import UserBulkDeleteInteractorImpl
+from app.usecases.users.user_bulk_update_usecase import UserBulkUpdateInteractorImpl, UserBulkUpdateInputData
+from app.usecases.users.user_create_usecase import UserCreateInteractorImpl, UserCreateInputData
+from app.usecases.users.user_delete_usecase import UserDeleteInteractorImpl
+from app.usecases.users.user_export_usecase import UserExportInteractorImpl
+from app.usecases.users.user_get_usercase import UserGetInteractorImpl
+from app.usecases.users.user_search_usecase import UserSearchInteractorImpl, UserSearchInputData
+from app.usecases.users.user_update_usecase import UserUpdateInteractorImpl, UserUpdateInputData
+from benchmarks.dataset import PASSWORD, temp_database
+
+PAGE_LIMIT = 100
+BULK_SIZE = 10
+WARMUP = 5
+
+
+class Case(NamedTuple):
+    """
+    計測するケース。funcには何回目の呼び出しかを渡す。
+    """
+
+    name: str
+    func: Callable[[int], Any]
+    # パスワードのハッシュ計算や全件の読み出しを伴うケースは、回数を1/10とする
+    slow: bool = False
+
+
+class Ids:
+    """
+    ケースが対象とするユーザのID。
+    読み取りは前半、更新は中央から、削除は末尾から順に対象とし、互いに影響しないようにする。
+    """
+
+    def __init__(self, rows: int) -> None:
+        self.rows = rows
+        self.updates = itertools.count(rows // 2 + 1)
+        self.deletes = itertools.count(rows, -1)
+
+    def read(self, i: int) -> int:
+        """
+        read
+        """
+
+        return i % (self.rows // 2) + 1
+
+    def update(self) -> int:
+        """
+        update
+        """
+
+        return next(self.updates)
+
+    def delete(self) -> int:
+        """
+        delete
+        """
+
+        return next(self.deletes)
+
+
+def new_user(prefix: str, i: int) -> dict:
+    """
+    new_user
+    """
+
+    return {"name": f"{prefix}{i}", "password": PASSWORD, "email": f"{prefix}{i}@example.com"}
+
+
+def updated_user(id: int, i: int) -> dict:
+    """
+    emailのみを変更したユーザ。更新ではname, passwordも必須となる
+    """
+
+    return {"name": f"user{id}", "password": PASSWORD, "email": f"user{id}.{i}@example.com"}
+
+
+def repository_cases(ids: Ids) -> list[Case]:
+    """
+    repository_cases
+    """
+
+    repository = UserRepositoryImpl()
+
+    return [
+        Case("repository.find_users_page", lambda i: repository.find_users_page(PAGE_LIMIT, ids.read(i))),
+        Case("repository.find_user_by_id", lambda i: repository.find_user_by_id(ids.read(i))),
+        Case("repository.find_user_by_name", lambda i: repository.find_user_by_name(f"user{ids.read(i)}")),
+        Case(
+            "repository.search_users.name",
+            lambda i: repository.search_users({"name": f"user{ids.read(i)}"}, PAGE_LIMIT),
+        ),
+        Case("repository.search_users.q", lambda i: repository.search_users({"q": f"ser{ids.read(i)}"}, PAGE_LIMIT)),
+        Case("repository.iter_users", lambda i: sum(1 for _ in repository.iter_users(1000)), slow=True),
+        Case("repository.create_user", lambda i: repository.create_user(**new_user("repository", i)), slow=True),
+        Case(
+            "repository.update_user",
+            lambda i: repository.update_user({"id": (id := ids.update()), "email": f"user{id}.{i}@example.com"}),
+        ),
+        Case("repository.delete_user", lambda i: repository.delete_user(ids.delete())),
+    ]
+
+
+def usecase_cases(ids: Ids) -> list[Case]:
+    """
+    ユースケース単体の処理時間を計測するため、キャッシュを介さないリポジトリを使う。
+    """
+
+    repository = UserRepositoryImpl()
+    get = UserGetInteractorImpl(repository)
+    search = UserSearchInteractorImpl(repository)
+    export = UserExportInteractorImpl(repository)
+    create = UserCreateInteractorImpl(repository)
+    bulk_create = UserBulkCreateInteractorImpl(repository)
+    update = UserUpdateInteractorImpl(repository)
+    bulk_update = UserBulkUpdateInteractorImpl(repository)
+    delete = UserDeleteInteractorImpl(repository)
+    bulk_delete = UserBulkDeleteInteractorImpl(repository)
+    auth = AuthInteractorImpl(repository)
+
+    return [
+        Case("usecase.get.page", lambda i: get.handle(limit=PAGE_LIMIT, after=ids.read(i))),
+        Case("usecase.get.id", lambda i: get.handle(ids.read(i))),
+        Case("usecase.search", lambda i: search.handle(UserSearchInputData(name=f"user{ids.read(i)}"), PAGE_LIMIT)),
+        Case("usecase.export", lambda i: sum(1 for _ in export.handle()), slow=True),
+        Case("usecase.create", lambda i: create.handle(UserCreateInputData(**new_user("usecase", i))), slow=True),
+        Case(
+            "usecase.bulk_create",
+            lambda i: bulk_create.handle(
+                [UserCreateInputData(**new_user("usecasebulk", i * BULK_SIZE + j)) for j in range(BULK_SIZE)]
+            ),
+            slow=True,
+        ),
+        Case(
+            "usecase.update",
+            lambda i: update.handle(id := ids.update(), UserUpdateInputData(**updated_user(id, i))),
+            slow=True,
+        ),
+        Case(
+            "usecase.bulk_update",
+            lambda i: bulk_update.handle(
+                [
+                    UserBulkUpdateInputData(id=id, **updated_user(id, i))
+                    for id in (ids.update() for _ in range(BULK_SIZE))
+                ]
+            ),
+            slow=True,
+        ),
+        Case("usecase.delete", lambda i: delete.handle(ids.delete())),
+        Case("usecase.bulk_delete", lambda i: bulk_delete.handle([ids.delete() for _ in range(BULK_SIZE)])),
+        Case(
+            "usecase.auth",
+            lambda i: auth.handle({"username": f"user{ids.read(i)}", "password": PASSWORD}),
+            slow=True,
+        ),
+    ]
+
+
+def endpoint_cases(ids: Ids, client: TestClient) -> list[Case]:
+    """
+    DIコンテナ、ミドルウェア、キャッシュを含めたエンドポイント全体の処理時間を計測する。
+    """
+
+    token = client.post("/api/v1/token/login", data={"username": "user1", "password": PASSWORD}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    def request(method: str, url: str, **kwargs: Any) -> Any:
+        response = client.request(method, url, **kwargs)
+
+        # 失敗したリクエストを計測しないよう、エラーの場合は中断する
+        response.raise_for_status()
+
+        return response
+
+    return [
+        Case(
+            "endpoint.GET /users",
+            lambda i: request("GET", "/api/v1/users/", params={"limit": PAGE_LIMIT, "after": encode_cursor(ids.read(i))}),
+        ),
+        Case("endpoint.GET /users/{id}", lambda i: request("GET", f"/api/v1/users/{ids.read(i)}")),
+        Case("endpoint.GET /users/search", lambda i: request("GET", f"/api/v1/users/search?name=user{ids.read(i)}")),
+        Case("endpoint.GET /users/me", lambda i: request("GET", "/api/v1/users/me", headers=headers)),
+        Case("endpoint.GET /users/export", lambda i: request("GET", "/api/v1/users/export"), slow=True),
+        Case("endpoint.POST /users", lambda i: request("POST", "/api/v1/users/", json=new_user("endpoint", i)), slow=True),
+        Case(
+            "endpoint.PUT /users/{id}",
+            lambda i: request("PUT", f"/api/v1/users/{(id := ids.update())}", json=updated_user(id, i)),
+            slow=True,
+        ),
+        Case("endpoint.DELETE /users/{id}", lambda i: request("DELETE", f"/api/v1/users/{ids.delete()}")),
+        Case(
+            "endpoint.POST /token/login",
+            lambda i: request("POST", "/api/v1/token/login", data={"username": "user2", "password": PASSWORD}),
+            slow=True,
+        ),
+    ]
+
+
+def measure(case: Case, iterations: int) -> dict:
+    """
+    caseをiterations回呼び出し、スループットとレイテンシのパーセンタイルを求める。
+    """
+
+    if case.slow:
+        iterations = max(2, iterations // 10)
+
+    # 一意な値を登録するケースのため、呼び出しごとに異なる番号を渡す
+    for i in range(WARMUP):
+        case.func(i)
+
+    latencies = []
+    start = time.perf_counter()
+
+    for i in range(WARMUP, WARMUP + iterations):
+        t = time.perf_counter()
+        case.func(i)
+        latencies.append(time.perf_counter() - t)
+
+    seconds = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / seconds,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    baselineよりp50がthresholdの割合を超えて遅くなったケースを返す。
+    """
+
+    if results["rows"] != baseline["rows"]:
+        print(f"warning: baseline was measured with {baseline['rows']:,} rows", file=sys.stderr)
+
+    regressions = []
+
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+
+        if base is None:
+            continue
+
+        ratio = result["p50_ms"] / base["p50_ms"]
+        print(f"{name:<36} p50 {base['p50_ms']:9.3f} -> {result['p50_ms']:9.3f} ms ({ratio - 1:+7.1%})")
+
+        if ratio > 1 + threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def main() -> None:
+    """
+    main
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000, help="number of seeded users (default: 10000)")
+    parser.add_argument("--iterations", type=int, default=100, help="iterations per case (default: 100)")
+    parser.add_argument("--cases", default="*", help="glob pattern of case names to run (default: *)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown ratio (default: 0.2)")
+    args = parser.parse_args()
+
+    # 読み取りは前半、更新は中央から、削除は末尾から順に対象とするため、互いに重ならない件数が必要となる
+    min_rows = (BULK_SIZE + 3) * (args.iterations + WARMUP) * 4
+
+    if args.rows < min_rows:
+        parser.error(f"--rows must be at least {min_rows:,} for {args.iterations} iterations")
+
+    results: dict = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "database_async": settings.DATABASE_ASYNC,
+        "rows": args.rows,
+        "results": {},
+    }
+
+    # 起動時のウォームアップは設定上のDBに接続するため行わない(各ケースは計測前にWARMUP回呼び出す)
+    settings.WARMUP_ENABLED = False
+
+    with temp_database(args.rows), TestClient(app) as client:
+        ids = Ids(args.rows)
+        cases = repository_cases(ids) + usecase_cases(ids) + endpoint_cases(ids, client)
+
+        for case in (c for c in cases if fnmatch(c.name, args.cases)):
+            result = results["results"][case.name] = measure(case, args.iterations)
+            print(
+                f"{case.name:<36} {result['ops_per_sec']:10,.1f} ops/s"
+                f"  p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+        if regressions:
+            print(f"regressions (p50 slower than +{args.threshold:.0%}): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# ベンチマーク用のデータセット。一時ファイルのSQLiteにユーザを登録し、db.Session / async_db.AsyncSessionの接続先とする。
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.interfaces.gateways import db, async_db
+from app.interfaces.gateways.schema import User
+from app.lib.security import hash_password
+
+# 登録するユーザ共通のパスワード
+PASSWORD = "password"
+
+BATCH_SIZE = 10000
+
+
+def seed_users(engine: Engine, rows: int) -> None:
+    """
+    user1〜user{rows}のユーザを登録する。
+    """
+
+    # 全件で同じハッシュを使い、登録にかかる時間をハッシュの計算に費やさないようにする
+    hashed_password = hash_password(PASSWORD)
+    created_at = datetime(2024, 1, 1)
+
+    with engine.begin() as connection:
+        for start in range(1, rows + 1, BATCH_SIZE):
+            connection.execute(
+                insert(User),
+                [
+                    {
+                        "name": f"user{i}",
+                        "password": hashed_password,
+                        "email": f"user{i}@example.com",
+                        "created_at": created_at + timedelta(seconds=i),
+                        "updated_at": created_at + timedelta(seconds=i),
+                    }
+                    for i in range(start, min(start + BATCH_SIZE, rows + 1))
+                ],
+            )
+
+
+@contextmanager
+def temp_database(rows: int) -> Iterator[Engine]:
+    """
+    rows件のユーザを登録した一時ファイルのSQLiteを作成し、終了時に削除する。
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.sqlite3")
+        engine = create_engine(f"sqlite:///{path}")
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+        db.Base.metadata.create_all(engine)
+        seed_users(engine, rows)
+
+        db.Session.configure(bind=engine)
+        async_db.AsyncSession.configure(bind=async_engine)
+
+        try:
+            yield engine
+        finally:
+            db.session.remove()
+            db.Session.configure(bind=db.engine)
+            async_db.AsyncSession.configure(bind=async_db.engine)
+            engine.dispose()
+            # 非同期の接続は終了済みのイベントループに属するため、閉じずにプールから切り離す
+            async_engine.sync_engine.dispose(close=False)
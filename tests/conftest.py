@@ -0,0 +1,24 @@
+from collections.abc import Callable
+
+import pytest
+from httpx import Response
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def assert_max_queries(monkeypatch: pytest.MonkeyPatch) -> Callable[[Response, int], Response]:
+    """
+    リクエスト内で発行したSQL文の件数が上限以内であることを、X-DB-Query-Countヘッダから確認する。
+    """
+
+    monkeypatch.setattr(settings, "DB_QUERY_STATS_HEADER", True)
+
+    def check(response: Response, max_queries: int) -> Response:
+        queries = int(response.headers["X-DB-Query-Count"])
+        request = response.request
+        assert queries <= max_queries, f"{request.method} {request.url.path} executed {queries} queries (max: {max_queries})"
+
+        return response
+
+    return check
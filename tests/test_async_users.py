@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import async_users
+from app.middlewares.db_session import DBSessionMiddleware
+
+# DATABASE_ASYNCの設定に関わらず非同期版のルータを検証する
+app = FastAPI()
+app.add_middleware(DBSessionMiddleware)
+app.include_router(async_users.router, prefix="/api/v1/users")
+
+client = TestClient(app)
+
+
+def test_async_read_users():
+    response = client.get("/api/v1/users/", params={"limit": 1})
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [1]
+    assert "next" in response.links
+
+
+def test_async_read_users_1():
+    response = client.get("/api/v1/users/1")
+    assert response.status_code == 200
+    assert response.json()["name"] == "squid"
+
+
+def test_async_read_users_100():
+    response = client.get("/api/v1/users/100")
+    assert response.status_code == 404
+
+
+def test_async_export_users():
+    response = client.get("/api/v1/users/export")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) >= 2
+
+
+def test_async_create_update_delete_user():
+    response = client.post(
+        "/api/v1/users/",
+        json={"name": "async_testdata", "password": "password", "email": "async_testdata@example.com"},
+    )
+    assert response.status_code == 201
+    id = response.json()["id"]
+
+    response = client.put(f"/api/v1/users/{id}", json={"name": "async_testdata", "password": "password", "email": "async_testdata_updated@example.com"})
+    assert response.status_code == 200
+    assert response.json()["email"] == "async_testdata_updated@example.com"
+
+    response = client.delete(f"/api/v1/users/{id}")
+    assert response.status_code == 200
+
+    response = client.delete(f"/api/v1/users/{id}")
+    assert response.status_code == 404
@@ -0,0 +1,105 @@
+from app.lib.cache import LRUCache, TTLStore
+from app.interfaces.gateways.cached_user_repository import CachedUserRepository
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingUserRepository:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def find_user_by_id(self, id: int) -> dict:
+        self.calls += 1
+        return {"id": id, "name": "squid"}
+
+    def update_user(self, data_to_be_updated: dict, expected_updated_at: list | None = None) -> dict:
+        return data_to_be_updated
+
+    def delete_user(self, id: int) -> dict:
+        return {"id": id}
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_expires_entries():
+    timer = FakeTimer()
+    cache = LRUCache(maxsize=2, ttl=10, timer=timer)
+    cache.set(1, "a")
+    cache.set(2, "b", ttl=20)
+
+    timer.now = 10
+    assert cache.get(1) is None
+    assert cache.get(2) == "b"
+    assert len(cache) == 1
+
+
+def test_cached_user_repository_does_not_cache_row_read_before_write(monkeypatch):
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner)  # type: ignore[arg-type]
+    find_user_by_id = inner.find_user_by_id
+
+    # 読み取りとキャッシュへの格納の間に更新が完了した場合
+    def find_user_by_id_during_update(id):
+        user = find_user_by_id(id)
+        repository.update_user({"id": id, "name": "octopus"})
+        return user
+
+    monkeypatch.setattr(inner, "find_user_by_id", find_user_by_id_during_update)
+    repository.find_user_by_id(1)
+    assert len(repository.cache) == 0
+
+    monkeypatch.setattr(inner, "find_user_by_id", find_user_by_id)
+    repository.find_user_by_id(1)
+    repository.find_user_by_id(1)
+    assert inner.calls == 2
+
+
+def test_ttl_store_does_not_evict_live_entries():
+    timer = FakeTimer()
+    store = TTLStore(maxsize=2, ttl=10, timer=timer)
+    assert store.set(1, "a")
+    assert store.set(2, "b")
+
+    # 有効期限前のエントリは追い出さず、追加に失敗する
+    assert not store.set(3, "c")
+    assert store.set(1, "a2")
+    assert (store.get(1), store.get(2), store.get(3)) == ("a2", "b", None)
+
+    timer.now = 10
+    assert store.set(3, "c")
+    assert (store.get(1), store.get(2), store.get(3)) == (None, None, "c")
+
+
+def test_cached_user_repository_invalidates_on_write():
+    inner = CountingUserRepository()
+    repository = CachedUserRepository(inner)  # type: ignore[arg-type]
+
+    repository.find_user_by_id(1)
+    repository.find_user_by_id(1)
+    assert inner.calls == 1
+
+    repository.update_user({"id": 1, "name": "octopus"})
+    repository.find_user_by_id(1)
+    assert inner.calls == 2
+
+    repository.delete_user(1)
+    repository.find_user_by_id(1)
+    assert inner.calls == 3
+    assert (repository.cache.hits, repository.cache.misses) == (1, 3)
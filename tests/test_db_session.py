@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+
+CONCURRENCY = 200
+
+
+async def _request_concurrently(paths: list[str]) -> list[httpx.Response]:
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        return await asyncio.gather(*(client.get(path) for path in paths))
+
+
+def test_concurrent_requests_use_isolated_sessions():
+    # 同期エンドポイントはスレッドプール上で並行に実行されるため、
+    # セッションを共有しているとトランザクションが混ざりエラーになる。
+    paths = ["/api/v1/users/1", "/api/v1/users/2", "/api/v1/users/?limit=1"] * (CONCURRENCY // 3)
+
+    responses = asyncio.run(_request_concurrently(paths))
+
+    assert [response.status_code for response in responses] == [200] * len(paths)
+
+    for path, response in zip(paths, responses):
+        if path == "/api/v1/users/1":
+            assert response.json()["name"] == "squid"
+        elif path == "/api/v1/users/2":
+            assert response.json()["name"] == "octopus"
+        else:
+            assert [user["id"] for user in response.json()] == [1]
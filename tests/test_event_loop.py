@@ -0,0 +1,84 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import auth, async_auth
+from app.interfaces.gateways.async_user_repository import AsyncUserRepositoryImpl
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.middlewares.db_session import DBSessionMiddleware
+
+CONCURRENCY = 10
+# DBの応答待ちを模擬するブロッキング時間
+DB_LATENCY = 0.5
+
+
+async def _measure_lag_during(requests: list[Awaitable[httpx.Response]]) -> tuple[float, list[httpx.Response]]:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def send() -> list[httpx.Response]:
+        try:
+            return await asyncio.gather(*requests)
+        finally:
+            done.set()
+
+    _, responses = await asyncio.gather(ticker(), send())
+
+    return max(lags), responses
+
+
+def _slow_sync_find_user_by_name(monkeypatch: pytest.MonkeyPatch) -> None:
+    find_user_by_name = UserRepositoryImpl.find_user_by_name
+
+    def slow_find_user_by_name(self, name):
+        time.sleep(DB_LATENCY)
+        return find_user_by_name(self, name)
+
+    monkeypatch.setattr(UserRepositoryImpl, "find_user_by_name", slow_find_user_by_name)
+
+
+def _slow_async_find_user_by_name(monkeypatch: pytest.MonkeyPatch) -> None:
+    find_user_by_name = AsyncUserRepositoryImpl.find_user_by_name
+
+    async def slow_find_user_by_name(self, name):
+        await asyncio.sleep(DB_LATENCY)
+        return await find_user_by_name(self, name)
+
+    monkeypatch.setattr(AsyncUserRepositoryImpl, "find_user_by_name", slow_find_user_by_name)
+
+
+@pytest.mark.parametrize(
+    "router, slow_down",
+    [(auth.router, _slow_sync_find_user_by_name), (async_auth.router, _slow_async_find_user_by_name)],
+    ids=["sync", "async"],
+)
+def test_concurrent_logins_do_not_block_event_loop(monkeypatch, router, slow_down):
+    # DATABASE_ASYNCの設定によらず同期版・非同期版の両方を検証するため、ルータごとにアプリケーションを組み立てる
+    app = FastAPI()
+    app.add_middleware(DBSessionMiddleware)
+    app.include_router(router, prefix="/api/v1/token")
+
+    slow_down(monkeypatch)
+
+    async def login_concurrently() -> tuple[float, list[httpx.Response]]:
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            data = {"username": "squid", "password": "password"}
+            return await _measure_lag_during([client.post("/api/v1/token/login", data=data) for _ in range(CONCURRENCY)])
+
+    lag, responses = asyncio.run(login_concurrently())
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENCY
+    # ブロッキング処理がイベントループ上で実行されると、その間ループ全体が停止する
+    assert lag < DB_LATENCY / 2
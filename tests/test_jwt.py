@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import JWTError
+
+from app.lib import jwt
+from app.lib.cache import TTLStore
+from app.lib.jwt import (
+    create_access_token,
+    get_id_from_token,
+    verified_token_cache,
+    revoke_tokens,
+    is_token_revoked,
+    confirm_token_version,
+    is_token_confirmed,
+    token_version,
+)
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    decode = jwt.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    verified_token_cache.clear()
+    monkeypatch.setattr(jwt.jwt, "decode", counting_decode)
+
+    return calls
+
+
+def test_get_id_from_token_decodes_once(decode_calls):
+    token = create_access_token({"sub": "1"}, timedelta(minutes=30))
+
+    assert get_id_from_token(token) == "1"
+    assert get_id_from_token(token) == "1"
+    assert len(decode_calls) == 1
+
+
+def test_get_id_from_token_does_not_cache_invalid_token(decode_calls):
+    token = create_access_token({"sub": "1"}, timedelta(minutes=30))
+    tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            get_id_from_token(tampered)
+
+    assert len(decode_calls) == 2
+
+
+def test_get_id_from_token_does_not_cache_expired_token(decode_calls):
+    token = create_access_token({"sub": "1"}, timedelta(minutes=-1))
+
+    with pytest.raises(JWTError):
+        get_id_from_token(token)
+
+    assert len(verified_token_cache) == 0
+
+
+def test_revoke_tokens_disables_claims_only_auth_when_full(monkeypatch):
+    monkeypatch.setattr(jwt, "revoked_token_versions", TTLStore(maxsize=1, ttl=60))
+    monkeypatch.setattr(jwt, "revocation_overflow_until", 0.0)
+    confirm_token_version(1, 1.0)
+    confirm_token_version(2, 1.0)
+
+    revoke_tokens(1)
+    assert is_token_revoked(1, 1.0)
+    assert is_token_confirmed(2, 1.0)
+
+    # 失効情報を保持しきれない場合は、失効情報を捨てずにDBでの確認を必須にする
+    revoke_tokens(2)
+    assert is_token_revoked(1, 1.0)
+    assert not is_token_confirmed(2, 1.0)
+
+
+def test_revoke_tokens_of_deleted_user_only_until_now(monkeypatch):
+    monkeypatch.setattr(jwt, "revoked_token_versions", TTLStore(maxsize=10, ttl=60))
+    issued = token_version(datetime.now())
+
+    revoke_tokens(3)
+    assert is_token_revoked(3, issued)
+
+    # 削除後に同じidで登録されたユーザのトークンは失効させない
+    assert not is_token_revoked(3, token_version(datetime.now() + timedelta(seconds=1)))
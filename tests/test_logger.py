@@ -0,0 +1,38 @@
+import json
+import logging
+from queue import SimpleQueue
+
+from app.core.logger import JsonFormatter, LocalQueueHandler, SamplingFilter, parse_log_levels
+
+
+def test_parse_log_levels():
+    assert parse_log_levels("sqlalchemy.engine=info, FastAPI=DEBUG,invalid") == {
+        "sqlalchemy.engine": "INFO",
+        "FastAPI": "DEBUG",
+    }
+    assert parse_log_levels("") == {}
+
+
+def test_queue_handler_with_sampling_and_json():
+    queue: SimpleQueue = SimpleQueue()
+    handler = LocalQueueHandler(queue)
+    handler.addFilter(SamplingFilter(0.0))
+
+    logger = logging.Logger("test", logging.DEBUG)
+    logger.addHandler(handler)
+
+    args = ["squid"]
+    logger.debug("db connection closed.")
+    logger.info("user %s", args)
+    args.append("octopus")
+
+    # DEBUGログは間引かれ、INFOログは記録時の引数で整形される
+    record = queue.get_nowait()
+    assert queue.empty()
+    assert json.loads(JsonFormatter().format(record)) | {"time": None, "process": None} == {
+        "time": None,
+        "level": "INFO",
+        "logger": "test",
+        "process": None,
+        "message": "user ['squid']",
+    }
@@ -1,6 +1,14 @@
+import uuid
+
 from fastapi.testclient import TestClient
+from sqlalchemy import func, select
 
 from app.main import app
+from app.core.config import settings
+from app.interfaces.gateways import db
+from app.interfaces.gateways.schema import User
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.lib.jwt import revoked_token_versions, confirmed_token_versions
 
 client = TestClient(app)
 
@@ -13,6 +21,9 @@ def test_read_users():
 def test_read_users_1():
     response = client.get("/api/v1/users/1")
     assert response.status_code == 200
+    assert response.json()["name"] == "squid"
+    # パスワードのハッシュはマスクして返す
+    assert response.json()["password"] == "**********"
 
 
 def test_read_users_2():
@@ -59,3 +70,266 @@ def test_post_users_testdata1_duplicate_email():
         },
     )
     assert response.status_code == 409
+
+
+def test_read_users_paginated():
+    response = client.get("/api/v1/users/", params={"limit": 1})
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [1]
+
+    next_page = response.links["next"]["url"]
+    response = client.get(next_page)
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [2]
+
+
+def test_read_users_invalid_cursor():
+    response = client.get("/api/v1/users/", params={"after": "invalid"})
+    assert response.status_code == 400
+
+
+def test_read_users_limit_exceeded():
+    response = client.get("/api/v1/users/", params={"limit": 100000})
+    assert response.status_code == 422
+
+
+def test_export_users_ndjson():
+    response = client.get("/api/v1/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    # 一覧はページ単位で返されるため、件数はDBから直接数える
+    with db.session_scope():
+        count = db.session.scalar(select(func.count()).select_from(User))
+    assert len(response.text.splitlines()) == count
+
+
+def test_export_users_csv():
+    response = client.get("/api/v1/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0] == "id,name,password,email,created_at,updated_at"
+
+
+def test_read_users_me_claims_only(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_CLAIMS_ONLY_AUTH", True)
+
+    # 繰り返し実行しても重複しないよう、ユーザ名に一意な接尾辞を付ける
+    name = f"claimsdata_{uuid.uuid4().hex[:8]}"
+    user = {"name": name, "password": "password", "email": f"{name}@example.com"}
+    id = client.post("/api/v1/users/", json=user).json()["id"]
+    token = client.post("/api/v1/token/login", data={"username": name, "password": "password"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    # トークンのクレームのみから復元され、DBは参照されない
+    with monkeypatch.context() as m:
+        m.setattr(UserRepositoryImpl, "find_user_by_id", None)
+        response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == f"{name}@example.com"
+
+    # 更新前に発行されたトークンは失効する
+    client.put(f"/api/v1/users/{id}", json={**user, "email": f"{name}_updated@example.com"})
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+    # 他のプロセスで更新された場合も、DBで確認し直した時点で失効する
+    token = client.post("/api/v1/token/login", data={"username": name, "password": "password"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    client.put(f"/api/v1/users/{id}", json=user)
+    revoked_token_versions.clear()
+    confirmed_token_versions.clear()
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+
+def test_read_users_me_claims_only_ignores_cached_row(monkeypatch):
+    monkeypatch.setattr(settings, "JWT_CLAIMS_ONLY_AUTH", True)
+
+    name = f"claimscache_{uuid.uuid4().hex[:8]}"
+    user = {"name": name, "password": "password", "email": f"{name}@example.com"}
+    id = client.post("/api/v1/users/", json=user).json()["id"]
+    token = client.post("/api/v1/token/login", data={"username": name, "password": "password"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    # 行がキャッシュされたまま、他のプロセスがキャッシュを経由せずに更新する
+    assert client.get(f"/api/v1/users/{id}").status_code == 200
+    UserRepositoryImpl().update_user({"id": id, "email": f"{name}_updated@example.com"})
+    confirmed_token_versions.clear()
+
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+
+def test_post_users_bulk():
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post(
+        "/api/v1/users/bulk",
+        json=[
+            {"name": f"bulkdata1_{suffix}", "password": "password", "email": f"bulkdata1_{suffix}@example.com"},
+            {"name": "squid", "password": "password", "email": f"bulkdata2_{suffix}@example.com"},
+            {"name": f"bulkdata3_{suffix}", "password": "password", "email": f"bulkdata1_{suffix}@example.com"},
+            {"name": f"bulkdata4_{suffix}", "password": "password", "email": f"bulkdata4_{suffix}@example.com"},
+        ],
+    )
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == [201, 409, 409, 201]
+    assert response.json()[3]["user"]["name"] == f"bulkdata4_{suffix}"
+
+
+def test_put_users_if_match():
+    name = f"etagdata_{uuid.uuid4().hex[:8]}"
+    user = {"name": name, "password": "password", "email": f"{name}@example.com"}
+    response = client.post("/api/v1/users/", json=user)
+    id = response.json()["id"]
+    etag = client.get(f"/api/v1/users/{id}").headers["ETag"]
+    assert etag == response.headers["ETag"]
+
+    response = client.put(
+        f"/api/v1/users/{id}", json={**user, "email": f"{name}_updated@example.com"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # 取得後に更新されているため、古いETagでは更新できない
+    response = client.put(f"/api/v1/users/{id}", json=user, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/api/v1/users/{id}").json()["email"] == f"{name}_updated@example.com"
+
+    response = client.put("/api/v1/users/99999", json=user, headers={"If-Match": etag})
+    assert response.status_code == 404
+
+
+def test_patch_and_delete_users_bulk():
+    users = client.post(
+        "/api/v1/users/bulk",
+        json=[{"name": f"bulkdata{i}", "password": "password", "email": f"bulkdata{i}@example.com"} for i in (5, 6, 8)],
+    ).json()
+    ids = [result["user"]["id"] for result in users]
+
+    response = client.patch(
+        "/api/v1/users/bulk",
+        json=[
+            {"id": ids[0], "name": "bulkdata5", "password": "password", "email": "bulkdata5_updated@example.com"},
+            {"id": ids[1], "name": "bulkdata6_updated", "password": "password", "email": "bulkdata6@example.com"},
+            {"id": 99999, "name": "bulkdata7", "password": "password", "email": "bulkdata7@example.com"},
+            {"id": ids[2], "name": "squid", "password": "password", "email": "bulkdata8@example.com"},
+        ],
+    )
+    assert response.status_code == 200
+    # 重複したユーザのみ409となり、他のユーザは更新される
+    assert [result["status"] for result in response.json()] == [200, 200, 404, 409]
+    assert client.get(f"/api/v1/users/{ids[0]}").json()["email"] == "bulkdata5_updated@example.com"
+    assert client.get(f"/api/v1/users/{ids[1]}").json()["name"] == "bulkdata6_updated"
+
+    response = client.request("DELETE", "/api/v1/users/bulk", json=[ids[0], 99999, ids[1], ids[2]])
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == [200, 404, 200, 200]
+    assert client.get(f"/api/v1/users/{ids[0]}").status_code == 404
+
+
+def test_patch_users_bulk_partial():
+    suffix = uuid.uuid4().hex[:8]
+    users = client.post(
+        "/api/v1/users/bulk",
+        json=[
+            {"name": f"partial{i}_{suffix}", "password": "password", "email": f"partial{i}_{suffix}@example.com"}
+            for i in (1, 2)
+        ],
+    ).json()
+    ids = [result["user"]["id"] for result in users]
+
+    # 指定された項目のみが更新され、更新する項目のない要素のみ400となる
+    response = client.patch(
+        "/api/v1/users/bulk",
+        json=[{"id": ids[0], "email": f"partial1_{suffix}_updated@example.com"}, {"id": ids[1]}],
+    )
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == [200, 400]
+    user = client.get(f"/api/v1/users/{ids[0]}").json()
+    assert user["name"] == f"partial1_{suffix}"
+    assert user["email"] == f"partial1_{suffix}_updated@example.com"
+
+
+def test_read_users_fields():
+    response = client.get("/api/v1/users/1?fields=name,id")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "squid"}
+    assert "ETag" in response.headers
+
+    response = client.get("/api/v1/users/?limit=1&fields=name")
+    assert response.status_code == 200
+    assert response.json() == [{"name": "squid"}]
+    assert "fields=name" in response.headers["Link"]
+
+    response = client.get("/api/v1/users/1?fields=name,unknown")
+    assert response.status_code == 400
+
+
+def test_search_users():
+    client.post(
+        "/api/v1/users/bulk",
+        json=[{"name": f"searchdata{i}", "password": "password", "email": f"searchdata{i}@example.com"} for i in (1, 2)],
+    )
+
+    response = client.get("/api/v1/users/search", params={"name": "searchdata", "limit": 1, "fields": "name"})
+    assert response.status_code == 200
+    assert response.json() == [{"name": "searchdata1"}]
+
+    response = client.get(response.links["next"]["url"])
+    assert response.json() == [{"name": "searchdata2"}]
+    assert "next" not in response.links
+
+    response = client.get("/api/v1/users/search", params={"q": "RCHDATA2@EXAMPLE"})
+    assert [user["name"] for user in response.json()] == ["searchdata2"]
+
+    response = client.get("/api/v1/users/search", params={"email": "searchdata1@example.com", "q": "data2"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = client.get("/api/v1/users/search")
+    assert response.status_code == 400
+
+
+def test_read_user_if_none_match():
+    response = client.get("/api/v1/users/2")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == settings.USERS_CACHE_CONTROL
+
+    for if_none_match in (etag, f'"1-0", W/{etag}', "*"):
+        response = client.get("/api/v1/users/2", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    response = client.get("/api/v1/users/2", headers={"If-None-Match": '"2-0"'})
+    assert response.status_code == 200
+    assert response.json()["name"] == "octopus"
+
+    # 一部の列のみのレスポンスは全体と内容が異なるため、ETagも異なる
+    response = client.get("/api/v1/users/2", params={"fields": "name,email"}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    projected_etag = response.headers["ETag"]
+    assert projected_etag != etag
+
+    response = client.get("/api/v1/users/2", params={"fields": "email,name"}, headers={"If-None-Match": projected_etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/v1/users/99999", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+    token = client.post("/api/v1/token/login", data={"username": "octopus", "password": "password"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}", "If-None-Match": etag}
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 304
+
+
+def test_ready():
+    # ウォームアップ(lifespan)の完了前は準備未完了を返す
+    assert client.get("/ready").status_code == 503
+
+    with TestClient(app) as started_client:
+        response = started_client.get("/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+
+    assert client.get("/ready").status_code == 503
@@ -0,0 +1,94 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.lib.metrics import Counter, Histogram, Registry, _merge_counter, _Shards
+
+client = TestClient(app)
+
+
+def test_render_sums_threads():
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests.", ("method",)))
+    histogram = registry.register(Histogram("duration_seconds", "Duration.", ("method",), (0.1, 1.0)))
+
+    def record():
+        for _ in range(1000):
+            counter.inc(("GET",))
+            histogram.observe(0.5, ("GET",))
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    histogram.observe(0.05, ('"q"',))
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{method="GET"} 4000',
+        "# HELP duration_seconds Duration.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{method="GET",le="0.1"} 0',
+        'duration_seconds_bucket{method="GET",le="1"} 4000',
+        'duration_seconds_bucket{method="GET",le="+Inf"} 4000',
+        'duration_seconds_sum{method="GET"} 2000',
+        'duration_seconds_count{method="GET"} 4000',
+        'duration_seconds_bucket{method="\\"q\\"",le="0.1"} 1',
+        'duration_seconds_bucket{method="\\"q\\"",le="1"} 1',
+        'duration_seconds_bucket{method="\\"q\\"",le="+Inf"} 1',
+        'duration_seconds_sum{method="\\"q\\""} 0.05',
+        'duration_seconds_count{method="\\"q\\""} 1',
+    ]
+
+
+def test_shards_merge_finished_threads():
+    shards = _Shards(_merge_counter)
+
+    def record():
+        values = shards.get()
+        values[("GET",)] = values.get(("GET",), 0) + 1
+
+    # 短命なスレッドが終了しても、スレッドごとの値は残らずbaseに合算される
+    for _ in range(500):
+        t = threading.Thread(target=record)
+        t.start()
+        t.join()
+
+    assert len(shards.shards) == 0
+    assert shards.snapshot() == [{("GET",): 500}]
+
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests.", ("method",)))
+    threads = [threading.Thread(target=counter.inc, args=(("GET",),)) for _ in range(100)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    assert 'requests_total{method="GET"} 100' in registry.render().splitlines()
+
+
+def test_metrics():
+    client.get("/api/v1/users/1")
+    client.get("/not-found")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    # パスではなくルートのテンプレートで集計される
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/users/{id}",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in text
+    engine = "async" if settings.DATABASE_ASYNC else "sync"
+    assert f'db_query_duration_seconds_count{{engine="{engine}",operation="SELECT"}}' in text
+    assert 'threadpool_workers{state="max"} 40' in text
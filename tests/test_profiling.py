@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.lib.profiling import list_profiles, sign
+from app.middlewares.profiling import ProfilingMiddleware
+
+app = FastAPI()
+app.add_middleware(ProfilingMiddleware)
+
+
+@app.get("/slow")
+def slow() -> dict:
+    # スレッドプールで実行される同期のエンドポイント
+    end = time.perf_counter() + 0.05
+
+    while time.perf_counter() < end:
+        pass
+
+    return {}
+
+
+@app.get("/unprofiled")
+def unprofiled() -> dict:
+    end = time.perf_counter() + 0.2
+
+    while time.perf_counter() < end:
+        pass
+
+    return {}
+
+
+client = TestClient(app)
+
+
+def signed_headers(path: str, timestamp: int | None = None) -> dict:
+    timestamp = int(time.time()) if timestamp is None else timestamp
+
+    return {"X-Profile-Signature": sign("secret", "GET", path, timestamp), "X-Profile-Timestamp": str(timestamp)}
+
+
+def test_profile_signed_request(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "secret")
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+
+    # 署名がない、または不正な場合はプロファイリングしない
+    client.get("/slow")
+    client.get("/slow", headers=signed_headers("/other"))
+    assert list_profiles(str(tmp_path)) == []
+
+    # 受け付ける期間を過ぎた署名は再利用できない
+    client.get("/slow", headers=signed_headers("/slow", int(time.time()) - 61))
+    headers = signed_headers("/slow")
+    client.get("/slow", headers={**headers, "X-Profile-Timestamp": str(int(time.time()) - 61)})
+    assert list_profiles(str(tmp_path)) == []
+
+    client.get("/slow", headers=signed_headers("/slow"))
+    profiles = list_profiles(str(tmp_path))
+    assert len(profiles) == 1
+    assert "-GET-slow-200-" in profiles[0]["name"]
+
+    # ワーカスレッドで実行されたエンドポイントのスタックが採取される
+    stacks = (tmp_path / profiles[0]["name"]).read_text()
+    assert "slow (test_profiling.py:" in stacks
+
+
+def test_profile_sampled_request(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+
+    client.get("/slow")
+    assert len(list_profiles(str(tmp_path))) == 1
+
+
+def test_profile_excludes_concurrent_requests(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "secret")
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+
+    async def request_concurrently() -> None:
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as async_client:
+            headers = signed_headers("/slow")
+            await asyncio.gather(async_client.get("/unprofiled"), async_client.get("/slow", headers=headers))
+
+    asyncio.run(request_concurrently())
+
+    # 並行して処理された、プロファイリング対象外のリクエストのスタックは含まれない
+    stacks = (tmp_path / list_profiles(str(tmp_path))[0]["name"]).read_text()
+    assert "slow (test_profiling.py:" in stacks
+    assert "unprofiled (test_profiling.py:" not in stacks
+
+
+def test_profile_keeps_latest_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILING_MAX_FILES", 2)
+
+    for _ in range(3):
+        client.get("/slow")
+
+    assert len(list_profiles(str(tmp_path))) == 2
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_users_query_budget(assert_max_queries):
+    user = {"name": "budgetdata1", "password": "password", "email": "budgetdata1@example.com"}
+
+    # ルートごとのSQL文の上限。更新後の再取得等で往復が増えた場合に失敗する
+    response = assert_max_queries(client.post("/api/v1/users/", json=user), 1)
+    id = response.json()["id"]
+    assert_max_queries(client.get("/api/v1/users/?limit=10"), 1)
+    assert_max_queries(client.get(f"/api/v1/users/{id}"), 1)
+    assert_max_queries(client.get("/api/v1/users/search?name=budget"), 1)
+    assert_max_queries(client.put(f"/api/v1/users/{id}", json={**user, "email": "budgetdata1_updated@example.com"}), 1)
+
+    token = assert_max_queries(
+        client.post("/api/v1/token/login", data={"username": "budgetdata1", "password": "password"}), 1
+    ).json()
+    assert_max_queries(client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token['access_token']}"}), 1)
+
+    users = [{"name": f"budgetdata{i}", "password": "password", "email": f"budgetdata{i}@example.com"} for i in (2, 3)]
+    ids = [r["user"]["id"] for r in assert_max_queries(client.post("/api/v1/users/bulk", json=users), 1).json()]
+    # 一括更新はchunkごとにUPDATEと更新後のSELECTを発行する
+    assert_max_queries(client.patch("/api/v1/users/bulk", json=[{"id": ids[0], **users[0]}]), 2)
+    assert_max_queries(client.request("DELETE", "/api/v1/users/bulk", json=ids), 1)
+    assert_max_queries(client.delete(f"/api/v1/users/{id}"), 1)
+
+
+def test_query_stats_header():
+    # DB_QUERY_STATS_HEADERが無効の場合は付与しない
+    response = client.get("/api/v1/users/1")
+    assert "X-DB-Query-Count" not in response.headers
+    assert "Server-Timing" not in response.headers
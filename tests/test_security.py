@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.lib.security import (
+    encrypt_password_to_sha256,
+    hash_password,
+    hash_passwords,
+    verify_password,
+    needs_rehash,
+    async_hash_password,
+    async_verify_password,
+    dummy_password_hash,
+)
+from app.exceptions.exception import NoContentError
+from app.interfaces.gateways.schema import UserRow
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.usecases.auth import auth_usecase
+from app.usecases.auth.auth_usecase import AuthInteractorImpl
+
+client = TestClient(app)
+
+
+def test_hash_password_with_scheme_prefix():
+    hashed_password = hash_password("password")
+
+    assert hashed_password.startswith("$scrypt$")
+    assert hashed_password != hash_password("password")
+    assert verify_password("password", hashed_password)
+    assert not verify_password("wrong_password", hashed_password)
+    assert not needs_rehash(hashed_password)
+    assert [verify_password("password", h) for h in hash_passwords(["password", "password"])] == [True, True]
+
+
+def test_async_hash_password():
+    async def hash_and_verify() -> bool:
+        return await async_verify_password("password", await async_hash_password("password"))
+
+    assert asyncio.run(hash_and_verify())
+
+
+def test_legacy_sha256_password_needs_rehash():
+    hashed_password = encrypt_password_to_sha256("password")
+
+    assert verify_password("password", hashed_password)
+    assert not verify_password("wrong_password", hashed_password)
+    assert needs_rehash(hashed_password)
+
+
+def test_argon2_password(monkeypatch):
+    pytest.importorskip("argon2")
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "argon2")
+
+    hashed_password = hash_password("password")
+
+    assert hashed_password.startswith("$argon2id$")
+    assert verify_password("password", hashed_password)
+    assert not needs_rehash(hashed_password)
+    assert not verify_password("password", "$argon2id$corrupted")
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "scrypt")
+    assert needs_rehash(hashed_password)
+
+
+def test_login_rehashes_legacy_password():
+    repository = UserRepositoryImpl()
+    name = f"hashdata_{uuid.uuid4().hex[:8]}"
+    user = {"name": name, "password": "password", "email": f"{name}@example.com"}
+    id = client.post("/api/v1/users/", json=user).json()["id"]
+
+    # 変更前の方式で保存されたパスワードを再現する
+    repository.update_password_hash(
+        id, repository.find_user_by_id(id).password, encrypt_password_to_sha256("password")
+    )
+
+    response = client.post("/api/v1/token/login", data={"username": name, "password": "password"})
+    assert response.status_code == 200
+
+    password_hash = repository.find_user_by_id(id).password
+    assert password_hash.startswith("$scrypt$")
+    assert verify_password("password", password_hash)
+
+
+def test_login_verifies_password_for_unknown_user(monkeypatch):
+    class UnknownUserRepository:
+        def find_user_by_name(self, name):
+            raise NoContentError("user not found.")
+
+    verified = []
+
+    def verify_password(*args):
+        verified.append(args)
+        return False
+
+    monkeypatch.setattr(auth_usecase, "verify_password", verify_password)
+
+    with pytest.raises(ValueError, match="Incorrect username or password"):
+        AuthInteractorImpl(UnknownUserRepository()).handle({"username": "unknown", "password": "password"})  # type: ignore[arg-type]
+
+    assert verified == [("password", dummy_password_hash())]
+
+
+def test_login_hides_unknown_password_hash_scheme():
+    class UnknownSchemeUserRepository:
+        def find_user_by_name(self, name):
+            now = datetime.now()
+            return UserRow(1, name, "$unknown$hash", "unknown@example.com", now, now)
+
+    with pytest.raises(ValueError, match="^Incorrect username or password$"):
+        AuthInteractorImpl(UnknownSchemeUserRepository()).handle({"username": "unknown", "password": "password"})  # type: ignore[arg-type]
@@ -0,0 +1,144 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event, select, text
+
+from app.exceptions.exception import DuplicateError, NoContentError, PreconditionFailedError
+from app.core.config import settings
+from app.interfaces.gateways import db
+from app.interfaces.gateways.schema import User, UserRow, create_users_fts
+from app.interfaces.gateways.user_repository import UserRepositoryImpl
+from app.interfaces.gateways.user_statements import user_search_clauses
+
+repository = UserRepositoryImpl()
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_create_and_delete_user_in_one_statement():
+    with count_statements() as statements:
+        created_user = repository.create_user("repositorydata1", "password", "repositorydata1@example.com")
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+    assert created_user.name == "repositorydata1"
+
+    with count_statements() as statements:
+        deleted_user = repository.delete_user(created_user.id)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE")
+    assert deleted_user == created_user
+
+    with pytest.raises(NoContentError):
+        repository.delete_user(created_user.id)
+
+
+def test_update_user_in_one_statement():
+    name = f"repositorydata_{uuid.uuid4().hex[:8]}"
+    created_user = repository.create_user(name, "password", f"{name}@example.com")
+    data = {"id": created_user.id, "email": f"{name}_updated@example.com"}
+
+    with count_statements() as statements:
+        updated_user = repository.update_user(dict(data), [created_user.updated_at])
+
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE")
+    assert updated_user.email == f"{name}_updated@example.com"
+
+    with pytest.raises(PreconditionFailedError):
+        repository.update_user(dict(data), [created_user.updated_at])
+
+    with pytest.raises(NoContentError):
+        repository.update_user({**data, "id": 99999})
+
+
+def test_update_and_delete_users_per_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "USERS_BULK_CHUNK_SIZE", 2)
+
+    users = [
+        repository.create_user(f"repositorydata{i}", "password", f"repositorydata{i}@example.com") for i in range(3, 6)
+    ]
+    data = [{"id": u.id, "email": f"updated_{u.email}"} for u in users] + [{"id": 99999, "name": "nobody"}]
+
+    with count_statements() as statements:
+        updated_users = repository.update_users(data)
+
+    assert [s.split()[0] for s in statements] == ["UPDATE", "SELECT", "UPDATE", "SELECT"]
+    assert [u.email if isinstance(u, UserRow) else u for u in updated_users] == [d.get("email") for d in data[:3]] + [None]
+    assert [u.name if isinstance(u, UserRow) else u for u in updated_users][:3] == [u.name for u in users]
+
+    # バッチ内で重複する値に更新したユーザのみ更新しない
+    updated_users = repository.update_users([{"id": u.id, "name": "repositorydata_same"} for u in users[:2]])
+    assert isinstance(updated_users[0], UserRow) and updated_users[0].name == "repositorydata_same"
+    assert isinstance(updated_users[1], DuplicateError)
+
+    with count_statements() as statements:
+        deleted_users = repository.delete_users([u.id for u in users] + [99999])
+
+    assert [s.split()[0] for s in statements] == ["DELETE", "DELETE"]
+    assert [u and u.id for u in deleted_users] == [u.id for u in users] + [None]
+
+
+def test_find_user_by_id_selects_only_fields():
+    with count_statements() as statements:
+        user = repository.find_user_by_id(1, ["id", "name"])
+
+    assert "password" not in statements[0]
+    assert (user.id, user.name) == (1, "squid")
+    assert user.password is None
+
+
+def test_search_users_follows_updates():
+    user = repository.create_user("repositorydata6", "password", "repositorydata6@example.com")
+    repository.update_user({"id": user.id, "name": "repositorydata6_renamed"})
+
+    assert [u.id for u in repository.search_users({"q": "_renamed"}, 10)] == [user.id]
+    assert repository.search_users({"name": "repositorydata6_renamed", "q": "repositorydata6@"}, 10)[0].id == user.id
+
+    repository.delete_user(user.id)
+    assert repository.search_users({"q": "_renamed"}, 10) == []
+
+    # 前方一致検索はnameのインデックスを使う
+    statement = select(User.id).where(*user_search_clauses({"name": "repositorydata"}, "sqlite"))
+    sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    db.session.close()
+    assert "ix_users_name" in str(plan)
+
+
+def test_create_users_fts_on_existing_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'existing.sqlite3'}")
+    User.__table__.create(engine)
+
+    # users_ftsの導入前に作成されたデータベースを再現する
+    with engine.begin() as connection:
+        for name in ("users_fts_insert", "users_fts_delete", "users_fts_update"):
+            connection.exec_driver_sql(f"DROP TRIGGER {name}")
+        connection.exec_driver_sql("DROP TABLE users_fts")
+        connection.exec_driver_sql(
+            "INSERT INTO users(name, password, email, created_at, updated_at) "
+            "VALUES ('squid', 'x', 'squid@example.com', '2026-01-01', '2026-01-01')"
+        )
+
+    create_users_fts(engine)
+    create_users_fts(engine)
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT rowid FROM users_fts WHERE users_fts MATCH 'qui'").all() == [(1,)]
+
+    engine.dispose()